@@ -0,0 +1,65 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Допустимые затраты на импорт сверх самого numpy: миллисекунды и мегабайты.
+BUDGETS = {
+    "dss.core": (40, 10),
+    "dss.ahpproject": (40, 10),
+    "dss.expertproject": (40, 10),
+    "dss.cli": (80, 15),
+}
+FORBIDDEN = ("wx", "matplotlib")
+REPEAT = 7
+
+PROBE = """
+import json, sys, time
+try:
+    import resource
+    rss = lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+except ImportError:
+    rss = lambda: 0
+m0, t0 = rss(), time.perf_counter()
+import {module}
+t1, m1 = time.perf_counter(), rss()
+print(json.dumps([(t1 - t0) * 1000, m1 - m0, [m for m in {forbidden!r} if m in sys.modules]]))
+"""
+
+
+def measure(module: str) -> tuple:
+    # Минимум по нескольким запускам в свежем интерпретаторе.
+    runs = []
+    for _ in range(REPEAT):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(module=module, forbidden=FORBIDDEN)], cwd=ROOT,
+                             check=True, capture_output=True, text=True).stdout
+        runs.append(json.loads(out))
+
+    return min(r[0] for r in runs), min(r[1] for r in runs), runs[0][2]
+
+
+def main() -> int:
+    base_ms, base_mb, _ = measure("numpy")
+    print("{:<20}{:>10}{:>10}".format("numpy", "%.1f ms" % base_ms, "%.1f MB" % base_mb))
+
+    failed = False
+    for module, (ms_budget, mb_budget) in BUDGETS.items():
+        ms, mb, loaded = measure(module)
+        errors = []
+        if ms - base_ms > ms_budget:
+            errors.append("+{:.1f} ms > {} ms".format(ms - base_ms, ms_budget))
+        if mb - base_mb > mb_budget:
+            errors.append("+{:.1f} MB > {} MB".format(mb - base_mb, mb_budget))
+        if loaded:
+            errors.append("imports {}".format(", ".join(loaded)))
+
+        failed = failed or bool(errors)
+        print("{:<20}{:>10}{:>10}  {}".format(module, "%.1f ms" % ms, "%.1f MB" % mb, "; ".join(errors) or "ok"))
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dss.core.cache import CACHE_DIR_ENV  # noqa: E402
+
+# Наборы правил, на которых сеть должна компилироваться в кэш и загружаться из него.
+# "chain": альфа-память условия каждого правила общая с соседним правилом - длинная цепочка связанных узлов.
+RULE_SETS = {
+    "shared": ["rule r{0}: s{1} ?x & s{2} ?x ?y => s{3} ?x ?y".format(i, i % 200, (i * 7 + 3) % 200,
+                                                                     (i * 13 + 5) % 200) for i in range(1000)],
+    "chain": ["rule r{0}: s{0} ?x & s{1} ?x => t{0} ?x".format(i, i + 1) for i in range(3000)],
+    "diagnosis": ["rule d{0}: symptom ?p s{1} & symptom ?p s{2} & not excluded ?p d{0} => diagnosis ?p d{0}".format(
+        i, i % 500, (i * 7 + 1) % 500) for i in range(3000)],
+}
+FACTS = ["s3 a", "s10 a b", "s0 a", "s1 a", "symptom p1 s1", "symptom p1 s8"]
+
+
+def check(name: str, lines: list, directory: str) -> list:
+    from dss.core.knowledge import KnowledgeBase, compile_rules, parse_rules
+
+    path = os.path.join(directory, name + ".rules")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+    t0 = time.perf_counter()
+    compile_rules(path)
+    t1 = time.perf_counter()
+    kb = compile_rules(path)
+    t2 = time.perf_counter()
+
+    errors = []
+    if not any(it.startswith("rules-") for it in os.listdir(os.environ[CACHE_DIR_ENV])):
+        errors.append("not cached")
+
+    expected = KnowledgeBase(name)
+    expected.add_rules(parse_rules(lines))
+    expected.assert_facts(FACTS)
+    kb.assert_facts(FACTS)
+    if kb.get_facts() != expected.get_facts():
+        errors.append("cached network derives different facts")
+
+    print("{:<12}{:>8}{:>12}{:>12}  {}".format(name, len(lines), "%.1f ms" % ((t1 - t0) * 1000),
+                                               "%.1f ms" % ((t2 - t1) * 1000), "; ".join(errors) or "ok"))
+    return errors
+
+
+def main() -> int:
+    print("{:<12}{:>8}{:>12}{:>12}".format("rules", "count", "compile", "cached"))
+
+    failed = False
+    for name, lines in RULE_SETS.items():
+        with tempfile.TemporaryDirectory() as directory:
+            os.environ[CACHE_DIR_ENV] = directory
+            failed = bool(check(name, lines, directory)) or failed
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
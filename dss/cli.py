@@ -0,0 +1,167 @@
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+
+from dss.core.ahp import AHPProject
+from dss.core.expert import ExpertProject
+from dss.core.knowledge import KnowledgeBase
+from dss.core.storage import convert_pickle, load_project
+from dss.core.tree import DecisionTree, NodeKind
+from dss.core.uncertainty import UncertaintyProject
+
+CSV_FIELDS = ("file", "type", "name", "alternative", "score", "rank", "error")
+
+
+def evaluate(proj) -> dict:
+    if isinstance(proj, AHPProject):
+        return {"type": "ahp", "name": proj.name, "target": proj.target, "scores": proj.get_global_vector(),
+                "consistency": {n.name: n.matrix.get_coherence_relation() for n in proj.get_nodes()}}
+    elif isinstance(proj, ExpertProject):
+        result = {"type": "expert", "name": proj.name, "target": proj.target, "scores": proj.get_result()}
+        try:
+            res = proj.get_concordance()
+            result["concordance"] = {"w": res["w"], "p_value": res["p_value"],
+                                     "outliers": [exp.name for exp in res["outliers"]]}
+        except ValueError:
+            # Меньше двух проголосовавших экспертов или двух альтернатив.
+            pass
+        return result
+    elif isinstance(proj, UncertaintyProject):
+        # Оценка альтернатив - критерий Гурвица с коэффициентом проекта, остальные критерии - отдельно.
+        result = proj.evaluate()
+        return {"type": "uncertainty", "name": proj.name, "alpha": proj.alpha,
+                "scores": dict(zip(proj.alternatives, result["hurwicz"].tolist())),
+                "criteria": {k: dict(zip(proj.alternatives, v.tolist())) for k, v in result.items()},
+                "best": proj.best()}
+    elif isinstance(proj, DecisionTree):
+        # Альтернативы - ветви корневого решения.
+        value = proj.rollback()
+        scores = {proj.root.name: value}
+        if proj.root.kind == NodeKind.DECISION:
+            scores = dict(zip(proj.root.labels, proj.get_branch_values(proj.root)))
+        return {"type": "tree", "name": proj.name, "value": value, "scores": scores,
+                "policy": [[node.name, label] for node, label in proj.get_policy()]}
+    elif isinstance(proj, KnowledgeBase):
+        # Оценка - число выведенных фактов каждого отношения (первого слова факта).
+        derived = proj.get_derived()
+        scores = {}
+        for it in derived:
+            scores[it[0]] = scores.get(it[0], 0) + 1
+        return {"type": "knowledge", "name": proj.name, "scores": scores, "derived": [" ".join(it) for it in derived]}
+
+    from dss.core.markov import MarkovProject
+    from dss.core.mdp import MarkovDecisionProject
+
+    if isinstance(proj, MarkovProject):
+        return {"type": "markov", "name": proj.name,
+                "scores": dict(zip(proj.states, proj.stationary_distribution().tolist()))}
+    elif isinstance(proj, MarkovDecisionProject):
+        res = proj.modified_policy_iteration()
+        return {"type": "mdp", "name": proj.name, "scores": dict(zip(proj.states, res["values"].tolist())),
+                "policy": dict(zip(proj.states, res["policy"])), "iterations": res["iterations"]}
+
+    raise TypeError("Unsupported project type: {0}".format(proj.__class__.__name__))
+
+
+def evaluate_file(path: str) -> dict:
+    result = {"file": path}
+    try:
+        result.update(evaluate(load_project(path)))
+    except Exception as e:
+        result["error"] = "{}: {}".format(e.__class__.__name__, e)
+
+    return result
+
+
+def find_projects(path: str, pattern: str, recursive: bool) -> list:
+    if os.path.isfile(path):
+        return [path]
+
+    if recursive:
+        return sorted(glob.glob(os.path.join(path, "**", pattern), recursive=True))
+    return sorted(glob.glob(os.path.join(path, pattern)))
+
+
+def evaluate_all(paths: list, workers: int = None) -> list:
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths)))
+    if workers == 1:
+        return [evaluate_file(p) for p in paths]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(evaluate_file, paths, chunksize=max(1, len(paths) // (workers * 4))))
+
+
+def convert_all(paths: list) -> int:
+    failed = False
+    for path in paths:
+        try:
+            if convert_pickle(path):
+                print("{}: converted".format(path), file=sys.stderr)
+        except Exception as e:
+            print("{}: {}: {}".format(path, e.__class__.__name__, e), file=sys.stderr)
+            failed = True
+
+    return 1 if failed else 0
+
+
+def write_json(results: list, f) -> None:
+    json.dump(results, f, ensure_ascii=False, indent=1)
+    f.write("\n")
+
+
+def write_csv(results: list, f) -> None:
+    writer = csv.DictWriter(f, CSV_FIELDS, lineterminator="\n")
+    writer.writeheader()
+
+    for res in results:
+        if "error" in res:
+            writer.writerow({"file": res["file"], "error": res["error"]})
+            continue
+
+        ranking = sorted(res["scores"], key=res["scores"].get, reverse=True)
+        for alt in res["scores"]:
+            writer.writerow({"file": res["file"], "type": res["type"], "name": res["name"], "alternative": alt,
+                             "score": res["scores"][alt], "rank": ranking.index(alt) + 1})
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m dss", description="Пакетный расчет проектов без интерфейса.")
+    parser.add_argument("path", help="каталог с проектами или файл проекта")
+    parser.add_argument("-o", "--output", default="-", help="файл результатов (по умолчанию stdout)")
+    parser.add_argument("-f", "--format", choices=("csv", "json"),
+                        help="формат результатов (по умолчанию по расширению файла, иначе csv)")
+    parser.add_argument("-p", "--pattern", default="*.ds", help="шаблон имен файлов проектов")
+    parser.add_argument("-r", "--recursive", action="store_true", help="искать проекты во вложенных каталогах")
+    parser.add_argument("-j", "--workers", type=int, help="число процессов (по умолчанию число ядер)")
+    parser.add_argument("--convert", action="store_true",
+                        help="перевести файлы старого формата (pickle) в новый формат вместо расчета")
+    args = parser.parse_args(argv)
+
+    paths = find_projects(args.path, args.pattern, args.recursive)
+    if not paths:
+        parser.error("no projects found in {0}".format(args.path))
+
+    if args.convert:
+        return convert_all(paths)
+
+    fmt = args.format or ("json" if args.output.lower().endswith(".json") else "csv")
+    write = write_json if fmt == "json" else write_csv
+
+    results = evaluate_all(paths, args.workers)
+
+    if args.output == "-":
+        write(results, sys.stdout)
+    else:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            write(results, f)
+
+    for res in results:
+        if "error" in res:
+            print("{}: {}".format(res["file"], res["error"]), file=sys.stderr)
+
+    return 1 if any("error" in res for res in results) else 0
@@ -0,0 +1,16 @@
+from dss.core.ahp import AHPProject, ComparisonMatrix, CriterionNode, PriorityMethod
+from dss.core.expert import Degree, Expert, ExpertProject, Position
+from dss.core.knowledge import KnowledgeBase
+from dss.core.tree import DecisionTree, NodeKind, TreeNode
+from dss.core.uncertainty import UncertaintyProject
+
+# Модули со scipy загружаются по требованию, чтобы импорт модели оставался дешевым.
+_LAZY_NAMES = {"MarkovProject": "dss.core.markov", "MarkovDecisionProject": "dss.core.mdp"}
+
+
+def __getattr__(name):
+    if name in _LAZY_NAMES:
+        import importlib
+        return getattr(importlib.import_module(_LAZY_NAMES[name]), name)
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -0,0 +1,589 @@
+import copy
+from enum import Enum
+from fractions import Fraction
+from typing import Union
+
+import numpy as np
+
+from dss.core.consistency import SAATY_SCALE, random_index
+
+
+class PriorityMethod(Enum):
+    GEOMETRIC_MEAN = 0
+    EIGENVECTOR = 1
+
+
+class ComparisonMatrix(object):
+    # Кэш: суммы логарифмов строк (для геометрических средних), суммы столбцов,
+    # нормализованный вектор и lambda max. set() обновляет суммы за O(1).
+    _CACHE_FIELDS = ("_row_logs", "_col_sums", "_weights", "_lmax", "_edits", "_eigenvector", "iterations")
+    _REBUILD_EVERY = 1024
+
+    def __init__(self, items, method: PriorityMethod = PriorityMethod.GEOMETRIC_MEAN, tolerance: float = 1e-12,
+                 max_iterations: int = 1000):
+        super().__init__()
+        self.method = method
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.size = len(items)
+
+        if self.size < 3:
+            raise ValueError("There should be more than 2 items, given {0}".format(self.size))
+
+        for it in items:
+            if not isinstance(it, str):
+                raise TypeError("Only str items allowed.")
+
+        self.items = list(items)
+        self._index = {it: i for i, it in enumerate(self.items)}
+
+        self._matrix = np.ones((self.size, self.size))
+        self.version = 0
+        self._listeners = []
+        self._reset_cache()
+
+    @classmethod
+    def from_array(cls, items, matrix: np.ndarray, method: PriorityMethod = PriorityMethod.GEOMETRIC_MEAN,
+                   tolerance: float = 1e-12, max_iterations: int = 1000) -> "ComparisonMatrix":
+        # Массив используется как есть (в том числе np.memmap из файла проекта), без копирования.
+        items = list(items)
+        if matrix.shape != (len(items), len(items)):
+            raise ValueError("Matrix shape {0} does not match {1} items.".format(matrix.shape, len(items)))
+
+        result = cls.__new__(cls)
+        result.__setstate__({"size": len(items), "items": items, "_index": {it: i for i, it in enumerate(items)},
+                             "_matrix": matrix, "method": method, "tolerance": tolerance,
+                             "max_iterations": max_iterations, "version": 0})
+        return result
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_matrix"] = np.asarray(self._matrix)
+        state.pop("_listeners", None)
+        for k in self._CACHE_FIELDS:
+            state.pop(k, None)
+
+        return state
+
+    def __setstate__(self, state):
+        # Проекты, сохраненные до перехода на ndarray, хранят матрицу как {(c1, c2): Fraction}.
+        if isinstance(state.get("_matrix"), dict):
+            items = state["items"]
+            state["_matrix"] = np.array([[float(state["_matrix"][(c1, c2)]) for c2 in items] for c1 in items])
+            state["_index"] = {it: i for i, it in enumerate(items)}
+
+        state.setdefault("method", PriorityMethod.GEOMETRIC_MEAN)
+        state.setdefault("tolerance", 1e-12)
+        state.setdefault("max_iterations", 1000)
+        state.setdefault("version", 0)
+        state.setdefault("_listeners", [])
+
+        self.__dict__.update(state)
+        self._reset_cache()
+
+    def _reset_cache(self):
+        self._row_logs = None
+        self._col_sums = None
+        self._weights = None
+        self._lmax = None
+        self._edits = 0
+        self._eigenvector = None
+        self.iterations = 0
+
+    def add_listener(self, listener) -> None:
+        # listener(matrix, event, *args): "set" с индексами и новым значением ячейки,
+        # "reset" при изменении, которое нельзя описать одной ячейкой.
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener) -> None:
+        self._listeners.remove(listener)
+
+    def _notify(self, event: str, *args) -> None:
+        for listener in self._listeners:
+            listener(self, event, *args)
+
+    def set_method(self, method: PriorityMethod) -> None:
+        if not isinstance(method, PriorityMethod):
+            raise TypeError("Method must be PriorityMethod, got: {0}".format(method.__class__))
+
+        self.method = method
+        self.version += 1
+        self._weights = None
+        self._lmax = None
+        self._notify("reset")
+
+    def _build_cache(self):
+        if self._row_logs is None:
+            self._row_logs = np.log(self._matrix).sum(axis=1)
+            self._col_sums = self._matrix.sum(axis=0)
+            self._edits = 0
+
+    def _get_priority_vector(self):
+        self._build_cache()
+        return np.exp(self._row_logs / self.size)
+
+    def _get_col_sums(self):
+        self._build_cache()
+        return self._col_sums
+
+    def _get_weights(self) -> np.ndarray:
+        if self._weights is None:
+            if self.method is PriorityMethod.EIGENVECTOR:
+                self._power_iteration()
+            else:
+                v = self._get_priority_vector()
+                self._weights = v / v.sum()
+
+        return self._weights
+
+    def _power_iteration(self) -> None:
+        # Стартуем с предыдущего собственного вектора: после правки одной ячейки
+        # хватает нескольких умножений матрицы на вектор.
+        v = self._eigenvector
+        if v is None:
+            v = self._get_priority_vector()
+            v = v / v.sum()
+
+        lmax = float(self.size)
+        self.iterations = 0
+        while self.iterations < self.max_iterations:
+            self.iterations += 1
+            w = self._matrix @ v
+            lmax = w.sum()
+            w /= lmax
+            delta = np.abs(w - v).sum()
+            v = w
+            if delta < self.tolerance:
+                break
+
+        self._eigenvector = v
+        self._weights = v
+        self._lmax = float(lmax)
+
+    def get_items(self) -> tuple:
+        return tuple(self.items)
+
+    def get_normalized_vector(self) -> dict:
+        return dict(zip(self.items, self._get_weights().tolist()))
+
+    def get_lmax(self):
+        if self._lmax is None:
+            if self.method is PriorityMethod.EIGENVECTOR:
+                self._power_iteration()
+            else:
+                self._lmax = float(self._get_weights() @ self._get_col_sums())
+
+        return self._lmax
+
+    def get_coherence_relation(self) -> float:
+        return int(10000 * (self.get_lmax() - self.size) / (self.size - 1) / self._get_coherence_index()) / 100
+
+    def _get_coherence_index(self):
+        return random_index(self.size)
+
+    def get_inconsistency_ranking(self) -> list:
+        # Вклад суждения в несогласованность: отклонение a_ij от w_i / w_j.
+        w = self._get_weights()
+        rows, cols = np.triu_indices(self.size, 1)
+        deviation = np.abs(np.log(self._matrix[rows, cols] * w[cols] / w[rows]))
+
+        order = np.argsort(-deviation, kind="stable")
+        return [(self.items[rows[k]], self.items[cols[k]], float(deviation[k])) for k in order]
+
+    def suggest_repairs(self, threshold: float = 10, max_edits: int = None) -> list:
+        # Жадно заменяем по одному суждению на ближайшее согласованное значение шкалы,
+        # каждый раз выбирая ячейку, которая сильнее всего уменьшает lambda max.
+        work = self.copy()
+        rows, cols = np.triu_indices(self.size, 1)
+        edited = np.zeros(rows.size, dtype=bool)
+        log_scale = np.log(SAATY_SCALE)
+
+        edits = []
+        while work.get_coherence_relation() > threshold and (max_edits is None or len(edits) < max_edits):
+            w = work._get_weights()
+            old = work._matrix[rows, cols]
+            new = SAATY_SCALE[np.abs(np.log(w[rows] / w[cols])[:, None] - log_scale).argmin(axis=1)]
+
+            lmax = work._estimate_lmax(rows, cols, new)
+            lmax[edited | (new == old)] = np.inf
+
+            k = int(np.argmin(lmax))
+            if not np.isfinite(lmax[k]):
+                break
+
+            work._set_value(rows[k], cols[k], new[k])
+            edited[k] = True
+            edits.append((self.items[rows[k]], self.items[cols[k]], str(Fraction(new[k]).limit_denominator(9))))
+
+        return edits
+
+    def _estimate_lmax(self, rows: np.ndarray, cols: np.ndarray, values: np.ndarray) -> np.ndarray:
+        # lambda max по геометрическому среднему после замены a[rows, cols] на values,
+        # для всех кандидатов сразу и без пересчета матрицы: меняются только
+        # две компоненты вектора и две суммы столбцов.
+        self._build_cache()
+        g = np.exp(self._row_logs / self.size)
+        s = self._col_sums
+        old = self._matrix[rows, cols]
+
+        shift = np.exp((np.log(values) - np.log(old)) / self.size)
+        gi, gj = g[rows] * shift, g[cols] / shift
+        si, sj = s[rows] + 1 / values - 1 / old, s[cols] + values - old
+
+        total = g.sum() + gi - g[rows] + gj - g[cols]
+        dot = g @ s + gi * si - g[rows] * s[rows] + gj * sj - g[cols] * s[cols]
+        return dot / total
+
+    def copy(self) -> "ComparisonMatrix":
+        return copy.deepcopy(self)
+
+    def _load(self, matrix: np.ndarray) -> None:
+        # Значения вне шкалы Саати допустимы (например, групповые оценки), проверяется только обратная симметричность.
+        matrix = np.asarray(matrix, dtype=float)
+        if matrix.shape != (self.size, self.size) or np.any(matrix <= 0) or not np.allclose(matrix * matrix.T, 1):
+            raise ValueError("Matrix must be a positive reciprocal {0}x{0} array.".format(self.size))
+
+        self._matrix = matrix.copy()
+        self.version += 1
+        self._reset_cache()
+        self._notify("reset")
+
+    def add(self, item: str) -> None:
+        self.items.append(item)
+        self._index[item] = self.size
+        self.size += 1
+
+        self._matrix = np.pad(self._matrix, ((0, 1), (0, 1)), constant_values=1.)
+        self.version += 1
+        self._reset_cache()
+        self._notify("reset")
+
+    def remove(self, item: str) -> None:
+        if self.size <= 3: raise IndexError("At least 3 items must remain.")
+        i = self._index[item]
+
+        self._matrix = np.delete(np.delete(self._matrix, i, axis=0), i, axis=1)
+
+        self.items.remove(item)
+        self._index = {it: i for i, it in enumerate(self.items)}
+        self.size -= 1
+        self.version += 1
+        self._reset_cache()
+        self._notify("reset")
+
+    def __str__(self):
+        result = "Comparison matrix:\n"
+
+        for i in range(0, self.size):
+            for j in range(0, self.size):
+                result += "[{0}]".format(self.get(self.items[i], self.items[j]))
+
+            result += "\n"
+
+        return result
+
+    def set(self, name1: str, name2: str, value: Union[Fraction, int, float, str]):
+        if not (isinstance(value, Fraction) or isinstance(value, str) or isinstance(value, int) or isinstance(value,
+                                                                                                              float)):
+            raise ValueError("Value must be Fraction, str, int, or float, got: {0}".format(value.__class__))
+
+        value = Fraction(value)
+
+        self._check_value(value)
+
+        i, j = self._get_position(name1, name2)
+
+        value = value.numerator / value.denominator
+        # Повторный ввод того же значения не меняет матрицу: ни версии, ни записи в журнал.
+        if i == j or self._matrix[i, j] == value:
+            return
+
+        self._set_value(i, j, value)
+        self._notify("set", i, j, float(self._matrix[i, j]))
+
+    def _set_value(self, i: int, j: int, value: float) -> None:
+        old = self._matrix[i, j]
+        if old == value:
+            return
+
+        self._matrix[i, j] = value
+        self._matrix[j, i] = 1 / value
+
+        self.version += 1
+        self._weights = None
+        self._lmax = None
+
+        if self._row_logs is None:
+            return
+
+        self._edits += 1
+        if self._edits >= self._REBUILD_EVERY:
+            # Периодически пересчитываем суммы целиком, чтобы не накапливать погрешность.
+            self._row_logs = None
+            return
+
+        d = np.log(value) - np.log(old)
+        self._row_logs[i] += d
+        self._row_logs[j] -= d
+        self._col_sums[j] += value - old
+        self._col_sums[i] += 1 / value - 1 / old
+
+    def get(self, name1: str, name2: str):
+        i, j = self._get_position(name1, name2)
+
+        return str(Fraction(self._matrix[i, j]).limit_denominator(9))
+
+    def _get_position(self, name1: str, name2: str) -> tuple:
+        if name1 not in self._index or name2 not in self._index:
+            raise IndexError("No comparison: {0} -> {1}".format(name1, name2))
+
+        return self._index[name1], self._index[name2]
+
+    def _check_value(self, value: Fraction) -> None:
+        if value.numerator not in range(1, 10) or value.denominator not in range(1, 10):
+            raise ValueError("Invalid fractional value: {0}.".format(value))
+        # TODO Улучшить метод проверки Fraction.
+
+
+class CriterionNode(object):
+    def __init__(self, name: str, items, method: PriorityMethod = PriorityMethod.GEOMETRIC_MEAN) -> None:
+        self.name = name
+        # У листовых критериев матрица сравнивает альтернативы, у остальных - подкритерии.
+        self.children = {}
+        self.matrix = ComparisonMatrix(items, method)
+
+        self.revision = 0
+        self._vector = None
+        self._stamp = None
+
+    @classmethod
+    def from_matrix(cls, name: str, matrix: ComparisonMatrix, children: dict = None) -> "CriterionNode":
+        result = cls.__new__(cls)
+        result.__dict__.update(name=name, matrix=matrix, children=children or {}, revision=0, _vector=None,
+                               _stamp=None)
+        return result
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_vector"] = None
+        state["_stamp"] = None
+        return state
+
+    def is_leaf(self) -> bool:
+        return not self.children
+
+    def synthesize(self) -> np.ndarray:
+        # Вектор альтернатив для этого узла. Пересчитывается, только если изменилась
+        # собственная матрица или вектор одного из потомков.
+        if self.is_leaf():
+            stamp = (self.matrix.version,)
+            if stamp != self._stamp:
+                self._vector = self.matrix._get_weights()
+        else:
+            vectors = [self.children[it].synthesize() for it in self.matrix.items]
+            stamp = (self.matrix.version,) + tuple(self.children[it].revision for it in self.matrix.items)
+            if stamp != self._stamp:
+                self._vector = self.matrix._get_weights() @ np.vstack(vectors)
+
+        if stamp != self._stamp:
+            self._stamp = stamp
+            self.revision += 1
+
+        return self._vector
+
+
+class AHPProject(object):
+    def __init__(self, name: str, target: str, criteria, alternatives,
+                 method: PriorityMethod = PriorityMethod.GEOMETRIC_MEAN) -> None:
+        self.alternatives = list(alternatives)
+        self.target = target
+        self.name = name
+
+        self._nodes = {}
+        self.root = self._build_node(target, criteria, method)
+
+    @classmethod
+    def from_root(cls, name: str, target: str, alternatives, root: CriterionNode) -> "AHPProject":
+        result = cls.__new__(cls)
+        result.__dict__.update(name=name, target=target, alternatives=list(alternatives), root=root, _nodes={})
+        for node in result.get_nodes()[1:]:
+            result._nodes[node.name] = node
+
+        return result
+
+    def __setstate__(self, state):
+        # Старый формат: один уровень критериев, матрицы хранятся в атрибутах проекта.
+        if "root" not in state:
+            children = {crit: CriterionNode.from_matrix(crit, matrix)
+                        for crit, matrix in state.pop("alternatives_comparisons").items()}
+            root = CriterionNode.from_matrix(state["target"], state.pop("criteria_comparison"), children)
+
+            state.pop("criteria")
+            state["root"] = root
+            state["_nodes"] = dict(root.children)
+
+        self.__dict__.update(state)
+
+    def _build_node(self, name: str, criteria, method: PriorityMethod) -> CriterionNode:
+        if isinstance(criteria, dict):
+            names = list(criteria.keys())
+        else:
+            names = list(criteria)
+            criteria = dict.fromkeys(names)
+
+        node = CriterionNode(name, names, method)
+        for crit in names:
+            if not isinstance(crit, str):
+                raise TypeError("Criterion must be str, got: {0}".format(crit.__class__))
+            if crit in self._nodes:
+                raise ValueError("Duplicate criterion: {0}".format(crit))
+
+            if criteria[crit]:
+                child = self._build_node(crit, criteria[crit], method)
+            else:
+                child = CriterionNode(crit, self.alternatives, method)
+
+            self._nodes[crit] = child
+            node.children[crit] = child
+
+        return node
+
+    @property
+    def criteria(self) -> list:
+        return list(self.root.matrix.items)
+
+    @property
+    def criteria_comparison(self) -> ComparisonMatrix:
+        return self.root.matrix
+
+    @property
+    def alternatives_comparisons(self) -> dict:
+        return {node.name: node.matrix for node in self.get_leaves()}
+
+    def get_node(self, name: str) -> CriterionNode:
+        if name not in self._nodes:
+            raise IndexError("No criterion: {0}".format(name))
+
+        return self._nodes[name]
+
+    def get_nodes(self) -> list:
+        result = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            result.append(node)
+            stack.extend(reversed([node.children[it] for it in node.matrix.items if it in node.children]))
+
+        return result
+
+    def get_leaves(self) -> list:
+        return [node for node in self.get_nodes() if node.is_leaf() and node is not self.root]
+
+    def add_criterion(self, crit: str, parent: str = None) -> None:
+        if not isinstance(crit, str):
+            raise TypeError("Criterion must be str, got: {0}".format(crit.__class__))
+        if crit in self._nodes:
+            raise ValueError("Duplicate criterion: {0}".format(crit))
+
+        node = self.root if parent is None else self.get_node(parent)
+        if node.is_leaf():
+            raise ValueError("Criterion {0} has no subcriteria, use split_criterion.".format(parent))
+
+        child = CriterionNode(crit, self.alternatives, node.matrix.method)
+        node.matrix.add(crit)
+        node.children[crit] = child
+        self._nodes[crit] = child
+
+    def split_criterion(self, crit: str, subcriteria) -> None:
+        node = self.get_node(crit)
+        if not node.is_leaf():
+            raise ValueError("Criterion {0} already has subcriteria.".format(crit))
+
+        subcriteria = list(subcriteria)
+        for it in subcriteria:
+            if not isinstance(it, str):
+                raise TypeError("Criterion must be str, got: {0}".format(it.__class__))
+            if it in self._nodes:
+                raise ValueError("Duplicate criterion: {0}".format(it))
+
+        node.matrix = ComparisonMatrix(subcriteria, node.matrix.method)
+        node._stamp = None
+        for it in subcriteria:
+            node.children[it] = CriterionNode(it, self.alternatives, node.matrix.method)
+            self._nodes[it] = node.children[it]
+
+    def set_priority_method(self, method: PriorityMethod) -> None:
+        for node in self.get_nodes():
+            node.matrix.set_method(method)
+
+    def get_global_vector(self) -> dict:
+        return dict(zip(self.alternatives, self.root.synthesize().tolist()))
+
+    def get_local_priorities(self) -> np.ndarray:
+        # Альтернативы x критерии верхнего уровня.
+        return np.column_stack([self.root.children[c].synthesize() for c in self.criteria])
+
+    def sensitivity_analysis(self, span: float = .5, steps: int = 21) -> dict:
+        if span <= 0 or steps < 2:
+            raise ValueError("Span must be positive and steps at least 2, got: {0}, {1}".format(span, steps))
+
+        criteria = self.criteria
+        weights = self.root.matrix._get_weights()
+        local = self.get_local_priorities()
+        deltas = np.linspace(-span, span, steps)
+        idx = np.arange(weights.size)
+
+        # Вес критерия c меняется на delta, остальные пропорционально перенормируются:
+        # grid[c, s] - полный вектор весов для шага s.
+        target = np.clip(weights[:, None] * (1 + deltas), 0, 1)
+        grid = weights * ((1 - target) / (1 - weights[:, None]))[:, :, None]
+        grid[idx, :, idx] = target
+
+        scores = grid @ local.T
+        # Смена ранжирования между соседними шагами сетки.
+        order = np.argsort(-scores, axis=2, kind="stable")
+        reversals = np.any(order[:, 1:] != order[:, :-1], axis=2)
+
+        # Точки безразличия: оценка альтернативы линейна по весу t критерия c,
+        # s_a(t) = t * L[a, c] + (1 - t) * R[a, c].
+        base = local @ weights
+        rest = (base - weights[:, None] * local.T) / (1 - weights[:, None])
+        slope = local.T - rest
+        a, b = np.triu_indices(len(self.alternatives), 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (rest[:, b] - rest[:, a]) / (slope[:, a] - slope[:, b])
+            crossing = t / weights[:, None] - 1
+        valid = np.isfinite(crossing) & (t >= 0) & (t <= 1) & (np.abs(crossing) <= span)
+
+        result = {}
+        for c, crit in enumerate(criteria):
+            pairs = np.flatnonzero(valid[c])
+            pairs = pairs[np.argsort(np.abs(crossing[c, pairs]))]
+            result[crit] = {
+                "deltas": deltas,
+                "weights": grid[c],
+                "scores": scores[c],
+                "rank_reversals": [(float(deltas[s + 1]), [self.alternatives[i] for i in order[c, s + 1]])
+                                   for s in np.flatnonzero(reversals[c])],
+                "break_even": [(self.alternatives[a[k]], self.alternatives[b[k]], float(crossing[c, k]))
+                               for k in pairs],
+            }
+
+        return result
+
+    def add_alternative(self, alt: str):
+        if not isinstance(alt, str):
+            raise TypeError("ALternative must be str, got: {0}".format(alt.__class__))
+        if alt in self.alternatives:
+            raise ValueError("Duplicate alternative: {0}".format(alt))
+
+        self.alternatives.append(alt)
+        for node in self.get_leaves():
+            node.matrix.add(alt)
+
+    def __str__(self) -> str:
+        res = "{0}:\n{1}".format(self.target, self.root.matrix)
+        for node in self.get_nodes()[1:]:
+            res += "{0}:\n{1}".format(node.name, node.matrix)
+
+        return res
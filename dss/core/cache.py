@@ -0,0 +1,20 @@
+import os
+
+CACHE_DIR_ENV = "DSS_CACHE_DIR"
+
+
+def get_cache_dir() -> str:
+    path = os.environ.get(CACHE_DIR_ENV) or os.path.join(os.path.expanduser("~"), ".cache", "dss")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def cache_path(name: str) -> str:
+    return os.path.join(get_cache_dir(), name)
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    tmp = "{}.{}.tmp".format(path, os.getpid())
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
@@ -0,0 +1,92 @@
+import numpy as np
+
+# Эксперт выпадает из группы, если согласие его ранжировки с остальными ниже медианы на столько
+# масштабированных медианных отклонений.
+OUTLIER_Z = 3.
+# Масштаб медианного абсолютного отклонения до стандартного для нормального распределения.
+MAD_SCALE = 1.4826
+
+
+def rank_rows(values, descending: bool = True) -> tuple:
+    # Ранги внутри каждой строки со средними рангами для равных значений (1 - наибольшее значение при descending).
+    # Возвращает (ранги, поправки на связи sum(t^3 - t) по строкам).
+    values = np.asarray(values, dtype=float)
+    if values.ndim != 2:
+        raise ValueError("Expected a 2-d array, got shape {0}.".format(values.shape))
+    n, m = values.shape
+    if not m:
+        return np.zeros((n, 0)), np.zeros(n)
+
+    keys = -values if descending else values
+    order = np.argsort(keys, axis=1, kind="stable")
+    ordered = np.take_along_axis(keys, order, axis=1)
+
+    # Группы равных значений нумеруются подряд по всем строкам: начало строки всегда начинает группу.
+    starts = np.ones((n, m), dtype=bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    group = np.cumsum(starts.ravel()) - 1
+    sizes = np.bincount(group).astype(float)
+    first = np.flatnonzero(starts.ravel()) % m
+
+    ranks = np.empty((n, m))
+    np.put_along_axis(ranks, order, (first + (sizes + 1) / 2)[group].reshape(n, m), axis=1)
+
+    ties = np.bincount(np.flatnonzero(starts.ravel()) // m, weights=sizes ** 3 - sizes, minlength=n)
+    return ranks, ties
+
+
+def kendall_w(ranks: np.ndarray, ties: np.ndarray = None) -> float:
+    # Коэффициент конкордации Кендалла с поправкой на связанные ранги: 0 - нет согласия, 1 - полное.
+    n, m = ranks.shape
+    if n < 2 or m < 2:
+        raise ValueError("Concordance needs at least 2 experts and 2 alternatives.")
+
+    totals = ranks.sum(axis=0)
+    s = ((totals - totals.mean()) ** 2).sum()
+    denominator = n ** 2 * (m ** 3 - m) - n * (0. if ties is None else ties.sum())
+    return float(12 * s / denominator) if denominator > 0 else 1.
+
+
+def significance(w: float, experts: int, alternatives: int) -> tuple:
+    # Критерий хи-квадрат для W (точен при числе альтернатив больше 7): (статистика, степени свободы, p-значение).
+    # scipy загружается только для p-значения.
+    from scipy.stats import chi2
+
+    df = alternatives - 1
+    statistic = experts * df * w
+    return statistic, df, float(chi2.sf(statistic, df))
+
+
+def spearman_matrix(ranks: np.ndarray) -> np.ndarray:
+    # Ранговая корреляция Спирмена для всех пар экспертов одним умножением матриц.
+    # У эксперта с одинаковыми оценками всех альтернатив корреляция не определена (nan).
+    centered = ranks - ranks.mean(axis=1, keepdims=True)
+    norms = np.sqrt((centered ** 2).sum(axis=1))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        centered /= norms[:, None]
+        result = centered @ centered.T
+    np.clip(result, -1, 1, out=result)
+    return result
+
+
+def agreement(ranks: np.ndarray) -> np.ndarray:
+    # Корреляция ранжировки каждого эксперта с суммой рангов остальных экспертов.
+    others = ranks.sum(axis=0) - ranks
+    a = ranks - ranks.mean(axis=1, keepdims=True)
+    b = others - others.mean(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (a * b).sum(axis=1) / np.sqrt((a ** 2).sum(axis=1) * (b ** 2).sum(axis=1))
+
+
+def find_outliers(scores: np.ndarray, z: float = OUTLIER_Z) -> np.ndarray:
+    # Индексы экспертов, чье согласие с группой ниже медианы более чем на z робастных отклонений.
+    # Эксперты с неопределенным согласием (nan) тоже считаются выпадающими.
+    valid = scores[np.isfinite(scores)]
+    if not valid.size:
+        return np.flatnonzero(~np.isfinite(scores))
+
+    # Нижняя граница разброса: при почти полном согласии погрешность округления не делает экспертов выпадающими.
+    median = np.median(valid)
+    spread = max(MAD_SCALE * np.median(np.abs(valid - median)), 1e-9)
+    with np.errstate(invalid="ignore"):
+        return np.flatnonzero((scores < median - z * spread) | ~np.isfinite(scores))
@@ -0,0 +1,84 @@
+import json
+
+import numpy as np
+
+from dss.core.cache import cache_path, write_atomic
+
+SAATY_SCALE = np.array([1 / 9, 1 / 8, 1 / 7, 1 / 6, 1 / 5, 1 / 4, 1 / 3, 1 / 2, 1, 2, 3, 4, 5, 6, 7, 8, 9])
+
+# Значения Саати для малых матриц, остальные получаются моделированием.
+SAATY_INDEX = {1: 0, 2: 0, 3: .58, 4: .9, 5: 1.12, 6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45, 10: 1.49}
+
+RI_CACHE_FILE = "random_index.json"
+RI_SAMPLES = 1000
+
+_random_index = None
+
+
+def random_index(size: int) -> float:
+    if size in SAATY_INDEX:
+        return SAATY_INDEX[size]
+
+    table = _load_table()
+    if size not in table:
+        table[size] = simulate_random_index(size)
+        _save_table(table)
+
+    return table[size]
+
+
+def simulate_random_index(size: int, samples: int = RI_SAMPLES, seed: int = None) -> float:
+    rng = np.random.default_rng(size if seed is None else seed)
+    rows, cols = np.triu_indices(size, 1)
+    # Не больше ~16M элементов на пачку матриц.
+    batch = max(1, min(samples, 2 ** 24 // (size * size)))
+
+    total = 0.
+    for start in range(0, samples, batch):
+        count = min(batch, samples - start)
+        values = rng.choice(SAATY_SCALE, size=(count, rows.size))
+
+        m = np.ones((count, size, size))
+        m[:, rows, cols] = values
+        m[:, cols, rows] = 1 / values
+
+        total += perron_vectors(m)[0].sum()
+
+    lmax = total / samples
+    return float((lmax - size) / (size - 1))
+
+
+def perron_vectors(m: np.ndarray, tol: float = 1e-10, max_iter: int = 100, start: np.ndarray = None) -> tuple:
+    # Степенной метод сразу для пачки положительных матриц: (lambda max, нормализованные векторы).
+    v = np.full(m.shape[:2], 1 / m.shape[1]) if start is None else start
+    lmax = np.zeros(m.shape[0])
+    for _ in range(max_iter):
+        w = np.einsum("kij,kj->ki", m, v)
+        prev, lmax = lmax, w.sum(axis=1)
+        v = w / lmax[:, None]
+        if np.abs(lmax - prev).max() < tol * m.shape[1]:
+            break
+
+    return lmax, v
+
+
+def _load_table() -> dict:
+    global _random_index
+
+    if _random_index is None:
+        try:
+            with open(cache_path(RI_CACHE_FILE), "r") as f:
+                data = json.load(f)
+            _random_index = {int(k): v for k, v in data["table"].items()} if data["samples"] == RI_SAMPLES else {}
+        except (OSError, ValueError, KeyError):
+            _random_index = {}
+
+    return _random_index
+
+
+def _save_table(table: dict) -> None:
+    data = {"samples": RI_SAMPLES, "table": {str(k): v for k, v in sorted(table.items())}}
+    try:
+        write_atomic(cache_path(RI_CACHE_FILE), json.dumps(data, indent=1).encode())
+    except OSError:
+        pass
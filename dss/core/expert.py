@@ -0,0 +1,305 @@
+import csv
+from enum import Enum
+from typing import Iterable
+
+import numpy as np
+
+from dss.core.concordance import OUTLIER_Z, agreement, find_outliers, kendall_w, rank_rows, significance, \
+    spearman_matrix
+
+# Сколько экспертов перечислять в сообщении об ошибке проверки голосов.
+MAX_REPORTED = 10
+
+
+class Position(Enum):
+    LEAD_ENGINEER = 0
+    SENIOR_RESEARCHER = 1
+    LEAD_RESEARCHER = 2
+    SECTOR_HEAD = 3
+    DEP_HEAD = 4
+    COMPLEX_HEAD = 5
+    DIRECTOR = 6
+
+
+class Degree(Enum):
+    SPECIALIST = 0
+    PhD = 1
+    Ph_P_D = 2
+    ACADEMICIAN = 3
+
+
+class Expert(object):
+    MAX_RATE = 100
+    __competency_map = {
+        (Position.LEAD_ENGINEER, Degree.SPECIALIST): 1,
+
+        (Position.SENIOR_RESEARCHER, Degree.SPECIALIST): 1,
+        (Position.SENIOR_RESEARCHER, Degree.PhD): 1.5,
+
+        (Position.LEAD_RESEARCHER, Degree.PhD): 2.25,
+        (Position.LEAD_RESEARCHER, Degree.Ph_P_D): 3,
+
+        (Position.SECTOR_HEAD, Degree.SPECIALIST): 2,
+        (Position.SECTOR_HEAD, Degree.PhD): 3,
+        (Position.SECTOR_HEAD, Degree.Ph_P_D): 4,
+        (Position.SECTOR_HEAD, Degree.ACADEMICIAN): 6,
+
+        (Position.DEP_HEAD, Degree.SPECIALIST): 2.5,
+        (Position.DEP_HEAD, Degree.PhD): 3.75,
+        (Position.DEP_HEAD, Degree.Ph_P_D): 5,
+        (Position.DEP_HEAD, Degree.ACADEMICIAN): 7.5,
+
+        (Position.COMPLEX_HEAD, Degree.SPECIALIST): 3,
+        (Position.COMPLEX_HEAD, Degree.PhD): 4.5,
+        (Position.COMPLEX_HEAD, Degree.Ph_P_D): 6,
+        (Position.COMPLEX_HEAD, Degree.ACADEMICIAN): 9,
+
+        (Position.DIRECTOR, Degree.SPECIALIST): 4,
+        (Position.DIRECTOR, Degree.Ph_P_D): 8,
+        (Position.DIRECTOR, Degree.PhD): 6,
+        (Position.DIRECTOR, Degree.ACADEMICIAN): 12,
+
+    }
+
+    def __init__(self, name: str, position: Position, degree: Degree):
+        try:
+            self.competency_index = self.__competency_map[(position, degree)]
+        except KeyError as e:
+            raise ValueError("An expert with such position({}) can not have such degree({}).".format(position, degree))
+
+        self.degree = degree
+        self.position = position
+        self.name = name
+        self.rate_count = self.MAX_RATE
+
+    def __str__(self):
+        return "{}: {}, {}".format(self.name, self.degree, self.position)
+
+
+class ExpertProject(object):
+    def __init__(self, alternatives: Iterable[str], experts: Iterable[Expert], name: str, target: str):
+        self.target = target
+        self.name = name
+        self.__alternatives = list(alternatives)
+        self.__experts = list(experts)
+        # Голоса - матрица эксперты x альтернативы в очках (0 - MAX_RATE).
+        self._votes = np.zeros((len(self.__experts), len(self.__alternatives)))
+        self._listeners = []
+        self.__build_index()
+
+    def __build_index(self) -> None:
+        self._expert_index = {exp: i for i, exp in enumerate(self.__experts)}
+        self._alt_index = {alt: j for j, alt in enumerate(self.__alternatives)}
+        competencies = np.array([exp.competency_index for exp in self.__experts], dtype=float)
+        self._weights = competencies / self.__get_competencies_sum()
+        self._result = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_listeners", None)
+        for key in ("_expert_index", "_alt_index", "_weights", "_result"):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault("_listeners", [])
+        if "votes" in state:
+            # Старые файлы: голоса в словарях по экспертам.
+            votes = state.pop("votes")
+            state.pop("_ExpertProject__votes", None)
+            state.pop("_ExpertProject__relative_competencies", None)
+            state["_ExpertProject__experts"] = list(state["_ExpertProject__experts"])
+            state["_votes"] = np.array([[votes[exp][alt] for alt in state["_ExpertProject__alternatives"]]
+                                        for exp in state["_ExpertProject__experts"]], dtype=float).reshape(
+                len(state["_ExpertProject__experts"]), len(state["_ExpertProject__alternatives"]))
+        self.__dict__.update(state)
+        self.__build_index()
+
+    def add_listener(self, listener) -> None:
+        # listener(project, "vote", expert_index, alternative_index, rate, rate_count)
+        # или listener(project, "votes", expert_indices, votes) для голосов многих экспертов сразу.
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener) -> None:
+        self._listeners.remove(listener)
+
+    def _notify(self, event: str, *args) -> None:
+        for listener in self._listeners:
+            listener(self, event, *args)
+
+    def get_alternatives(self) -> tuple:
+        return tuple(self.__alternatives)
+
+    def get_experts(self) -> tuple:
+        return tuple(self.__experts)
+
+    def get_votes(self) -> np.ndarray:
+        # Только для чтения: голоса меняются через vote, иначе кэш результата устареет.
+        votes = self._votes.view()
+        votes.flags.writeable = False
+        return votes
+
+    def get_vote(self, expert: Expert, alternative: str) -> int:
+        return int(self._votes[self._get_position(expert, alternative)])
+
+    def _get_position(self, expert: Expert, alternative: str) -> tuple:
+        if expert not in self._expert_index or alternative not in self._alt_index:
+            raise IndexError("No vote: {0}, {1}".format(expert, alternative))
+        return self._expert_index[expert], self._alt_index[alternative]
+
+    def _load_votes(self, votes) -> None:
+        votes = np.asarray(votes, dtype=float)
+        if votes.shape != self._votes.shape:
+            raise ValueError("Votes shape {0} does not match {1}.".format(votes.shape, self._votes.shape))
+        self._votes = votes.astype(np.int64).astype(float)
+        self._result = None
+
+    def set_votes(self, votes, experts: Iterable[Expert] = None) -> None:
+        # Голоса сразу для многих экспертов: строка на эксперта (по умолчанию - на всех экспертов проекта).
+        # Бюджеты проверяются для всех строк до изменения проекта: при ошибке не меняется ничего.
+        experts = self.get_experts() if experts is None else list(experts)
+        for exp in experts:
+            if exp not in self._expert_index:
+                raise IndexError("No expert: {0}".format(exp))
+        rows = [self._expert_index[exp] for exp in experts]
+        if len(set(rows)) != len(rows):
+            raise ValueError("Duplicate experts.")
+
+        votes = np.asarray(votes, dtype=float)
+        if votes.shape != (len(rows), len(self.__alternatives)):
+            raise ValueError("Votes shape {0} does not match {1}.".format(votes.shape,
+                                                                         (len(rows), len(self.__alternatives))))
+        if not np.isfinite(votes).all() or (votes < 0).any() or (votes != np.round(votes)).any():
+            raise ValueError("Votes must be non-negative integers.")
+
+        totals = votes.sum(axis=1)
+        over = np.flatnonzero(totals > Expert.MAX_RATE)
+        if over.size:
+            raise ValueError("Votes exceed {0} points: {1}".format(Expert.MAX_RATE, ", ".join(
+                "{} ({:g})".format(experts[k].name, totals[k]) for k in over[:MAX_REPORTED])))
+
+        self._votes[rows] = votes
+        for exp, total in zip(experts, totals.tolist()):
+            exp.rate_count = Expert.MAX_RATE - int(total)
+        self._result = None
+        self._notify("votes", rows, votes)
+
+    def import_votes(self, path: str, sheet: str = None) -> int:
+        # Таблица CSV или Excel: заголовок "эксперт,альтернатива 1,...", далее строка на эксперта.
+        # Альтернативы, которых нет в таблице, получают 0; эксперты, которых нет в таблице, не меняются.
+        names, alternatives, votes = read_votes(path, sheet)
+
+        by_name = {}
+        for exp in self.__experts:
+            by_name.setdefault(exp.name, []).append(exp)
+        experts = []
+        for name in names:
+            if len(by_name.get(name, ())) != 1:
+                raise ValueError("{0} expert: {1}".format("Ambiguous" if name in by_name else "Unknown", name))
+            experts.append(by_name[name][0])
+
+        unknown = [it for it in alternatives if it not in self._alt_index]
+        if unknown:
+            raise ValueError("Unknown alternatives: {0}".format(", ".join(unknown)))
+        if len(set(alternatives)) != len(alternatives):
+            raise ValueError("Duplicate alternatives.")
+
+        full = np.zeros((len(experts), len(self.__alternatives)))
+        full[:, [self._alt_index[it] for it in alternatives]] = votes
+        self.set_votes(full, experts)
+        return len(experts)
+
+    def _set_vote(self, expert: Expert, alternative: str, rate: int) -> None:
+        self._votes[self._get_position(expert, alternative)] = rate
+        self._result = None
+
+    def vote(self, expert: Expert, alternative: str, rate: int):
+        if not isinstance(rate, int):
+            raise ValueError("Illegal coeficient value: {} (must be int in range 0-10).".format(rate))
+
+        i, j = self._get_position(expert, alternative)
+        if expert.rate_count == 0 and self.__sum_votes(expert) < Expert.MAX_RATE:
+            expert.rate_count = Expert.MAX_RATE - self.__sum_votes(expert)
+
+        if rate < expert.rate_count:
+            self._set_vote(expert, alternative, rate)
+            expert.rate_count -= rate
+        else:
+            self._set_vote(expert, alternative, expert.rate_count)
+            expert.rate_count = 0
+
+        self._notify("vote", i, j, int(self._votes[i, j]), expert.rate_count)
+
+    def __get_competencies_sum(self) -> float:
+        return sum(x.competency_index for x in self.__experts)
+
+    def __sum_votes(self, expert):
+        return int(self._votes[self._expert_index[expert]].sum())
+
+    def get_result(self):
+        # Взвешенная по компетентности сумма голосов; пересчитывается только после изменения голосов.
+        if self._result is None:
+            scores = self._weights @ self._votes / Expert.MAX_RATE
+            self._result = dict(zip(self.__alternatives, scores.tolist()))
+        return dict(self._result)
+
+    def get_concordance(self, z: float = OUTLIER_Z) -> dict:
+        # Согласованность ранжировок экспертов, отдавших хотя бы один голос: W Кендалла и его значимость,
+        # попарные корреляции Спирмена, согласие каждого эксперта с остальными и выпадающие эксперты.
+        voted = np.flatnonzero(self._votes.any(axis=1))
+        experts = [self.__experts[i] for i in voted]
+        ranks, ties = rank_rows(self._votes[voted])
+        w = kendall_w(ranks, ties)
+        statistic, df, p_value = significance(w, len(experts), len(self.__alternatives))
+        scores = agreement(ranks)
+
+        return {"w": w, "chi2": statistic, "df": df, "p_value": p_value, "experts": experts,
+                "ranks": ranks, "spearman": spearman_matrix(ranks), "agreement": scores,
+                "outliers": [experts[i] for i in find_outliers(scores, z)]}
+
+
+def read_votes(path: str, sheet: str = None) -> tuple:
+    # (имена экспертов, альтернативы, матрица голосов) из CSV или первого (заданного) листа Excel.
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        rows = _read_excel_rows(path, sheet)
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = [it for it in csv.reader(f) if it]
+
+    if not rows or len(rows[0]) < 2:
+        raise ValueError("Expected header 'expert,<alternatives>' in {0}".format(path))
+
+    width = len(rows[0])
+    alternatives = [str(it) for it in rows[0][1:]]
+    names, votes = [], np.zeros((len(rows) - 1, width - 1))
+    for k, row in enumerate(rows[1:]):
+        if len(row) > width:
+            raise ValueError("Row {0} of {1} has more cells than the header.".format(k + 2, path))
+        names.append(str(row[0]))
+        try:
+            votes[k, :len(row) - 1] = [float(it) if it not in ("", None) else 0. for it in row[1:]]
+        except ValueError:
+            raise ValueError("Row {0} of {1} has a non-numeric vote.".format(k + 2, path))
+    return names, alternatives, votes
+
+
+def _read_excel_rows(path: str, sheet: str = None) -> list:
+    # openpyxl нужен только для импорта из Excel и загружается по требованию.
+    try:
+        import openpyxl
+    except ImportError:
+        raise ImportError("Reading Excel files requires openpyxl.")
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet else wb.worksheets[0]
+        rows = []
+        for it in ws.iter_rows(values_only=True):
+            row = list(it)
+            while row and row[-1] is None:
+                row.pop()
+            if row:
+                rows.append(row)
+        return rows
+    finally:
+        wb.close()
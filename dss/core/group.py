@@ -0,0 +1,59 @@
+import copy
+
+import numpy as np
+
+
+def aggregate_judgments(projects, weights=None):
+    # AIJ: взвешенное геометрическое среднее суждений по каждой матрице иерархии.
+    projects = list(projects)
+    w = _get_weights(projects, weights)
+
+    result = copy.deepcopy(projects[0])
+    nodes = [p.get_nodes() for p in projects]
+
+    for k, node in enumerate(result.get_nodes()):
+        stack = np.stack([n[k].matrix._matrix for n in nodes])
+        node.matrix._load(np.exp(np.tensordot(w, np.log(stack), axes=1)))
+
+    return result
+
+
+def aggregate_priorities(projects, weights=None, geometric: bool = False) -> dict:
+    # AIP: взвешенное среднее глобальных векторов приоритетов.
+    projects = list(projects)
+    w = _get_weights(projects, weights)
+
+    stack = np.stack([p.root.synthesize() for p in projects])
+    if geometric:
+        v = np.exp(w @ np.log(stack))
+        v /= v.sum()
+    else:
+        v = w @ stack
+
+    return dict(zip(projects[0].alternatives, v.tolist()))
+
+
+def _get_weights(projects: list, weights) -> np.ndarray:
+    if not projects:
+        raise ValueError("At least one project required.")
+
+    base = _get_structure(projects[0])
+    for i, p in enumerate(projects[1:], 1):
+        if _get_structure(p) != base:
+            raise ValueError("Project {0} ({1}) has a different structure.".format(i, p.name))
+
+    if weights is None:
+        w = np.ones(len(projects))
+    else:
+        # Вес эксперта - его индекс компетентности.
+        w = np.array([getattr(it, "competency_index", it) for it in weights], dtype=float)
+
+    if w.shape != (len(projects),) or np.any(w < 0) or w.sum() <= 0:
+        raise ValueError("Need one non-negative weight per project, got: {0}".format(weights))
+
+    return w / w.sum()
+
+
+def _get_structure(project) -> tuple:
+    nodes = tuple((n.name, tuple(n.matrix.items), n.is_leaf()) for n in project.get_nodes())
+    return tuple(project.alternatives), nodes[1:], tuple(project.criteria)
@@ -0,0 +1,259 @@
+import json
+import os
+
+from dss.core.ahp import AHPProject
+from dss.core.expert import ExpertProject
+from dss.core.storage import load_project, save_project
+
+# Журнал изменений рядом с файлом проекта: по строке JSON на измененную ячейку.
+# Первая строка связывает журнал со снимком (размер и время изменения файла, к которому применяются записи).
+# При сжатии проект пишется в отдельный файл снимка, а не в файл пользователя: тот меняется только
+# явным сохранением, после которого снимок и журнал удаляются.
+JOURNAL_SUFFIX = ".journal"
+SNAPSHOT_SUFFIX = ".snapshot"
+JOURNAL_FORMAT = "dss-journal"
+COMPACT_EVERY = 10000
+JOURNALED_TYPES = (AHPProject, ExpertProject)
+
+
+def journal_path(path: str) -> str:
+    return path + JOURNAL_SUFFIX
+
+
+def snapshot_path(path: str) -> str:
+    return path + SNAPSHOT_SUFFIX
+
+
+def _snapshot_stamp(path: str) -> list:
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+class Journal(object):
+    def __init__(self, proj, path: str, compact_every: int = COMPACT_EVERY):
+        if not isinstance(proj, JOURNALED_TYPES):
+            raise TypeError("Unsupported project type: {0}".format(proj.__class__.__name__))
+
+        self.proj = proj
+        self.path = path
+        self.compact_every = compact_every
+        self.count = 0
+        self.stale = False
+        self._snapshot = False
+        self._file = None
+        self._sources = []
+        self._nodes = {}
+        self._layout = None
+        self._attach()
+
+    def _get_layout(self) -> tuple:
+        # Структура, к которой привязаны индексы в записях журнала.
+        if isinstance(self.proj, AHPProject):
+            return tuple(id(node.matrix) for node in self.proj.get_nodes())
+        return tuple(id(exp) for exp in self.proj.get_experts()) + self.proj.get_alternatives()
+
+    def _attach(self) -> None:
+        if isinstance(self.proj, AHPProject):
+            self._sources = [node.matrix for node in self.proj.get_nodes()]
+            self._nodes = {id(m): k for k, m in enumerate(self._sources)}
+        else:
+            self._sources = [self.proj]
+
+        for it in self._sources:
+            it.add_listener(self._record)
+        self._layout = self._get_layout()
+
+    def _detach(self) -> None:
+        for it in self._sources:
+            it.remove_listener(self._record)
+        self._sources = []
+
+    def _record(self, source, event: str, *args) -> None:
+        if event == "set":
+            self._write(["set", self._nodes[id(source)]] + list(args))
+        elif event == "vote":
+            self._write(["vote"] + list(args))
+        elif event == "votes":
+            rows, votes = args
+            self._write(["votes", list(rows), votes.astype(int).tolist()])
+        else:
+            # Изменение структуры не выражается через ячейки: до сжатия журнал больше не пишется.
+            self.stale = True
+
+    def _write(self, record: list) -> None:
+        if self.stale:
+            return
+
+        self._open_file()
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        self.count += 1
+
+    def _open_file(self) -> None:
+        if self._file is not None:
+            return
+
+        header = {"format": JOURNAL_FORMAT, "snapshot": _snapshot_stamp(self.path)}
+        if self._snapshot:
+            # Записи применяются к снимку, который действителен, пока не изменился файл проекта.
+            header.update(snapshot=_snapshot_stamp(snapshot_path(self.path)), project=header["snapshot"])
+        self._file = open(journal_path(self.path), "w", encoding="utf-8")
+        self._file.write(json.dumps(header) + "\n")
+        self._file.flush()
+
+    def needs_compaction(self) -> bool:
+        return self.stale or self.count >= self.compact_every or self._layout != self._get_layout()
+
+    def sync(self) -> None:
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+
+    def tick(self) -> bool:
+        # Вызывается периодически: сбрасывает журнал на диск, при необходимости сжимает его в снимок.
+        if self.needs_compaction():
+            self.compact()
+            return True
+
+        self.sync()
+        return False
+
+    def compact(self) -> None:
+        # Переносит журнал в снимок рядом с проектом; файл проекта не меняется.
+        self._detach()
+        self._close_file()
+        try:
+            save_project(self.proj, snapshot_path(self.path))
+        except BaseException:
+            self._resume()
+            raise
+
+        self._snapshot = True
+        self.count = 0
+        self.stale = False
+        self._open_file()
+        self._attach()
+
+    def save(self) -> None:
+        # Явное сохранение: проект пишется в свой файл, снимок и журнал больше не нужны.
+        self._detach()
+        self._close_file()
+        try:
+            save_project(self.proj, self.path)
+        except BaseException:
+            self._resume()
+            raise
+
+        self.discard()
+        self._attach()
+
+    def _resume(self) -> None:
+        # Сохранение не удалось: файлы снимка и журнала не тронуты, журнал продолжается с того же места.
+        # Прежняя структура сохраняется, чтобы изменение, требующее сжатия, не потерялось.
+        layout = self._layout
+        if os.path.exists(journal_path(self.path)):
+            self._file = open(journal_path(self.path), "a", encoding="utf-8")
+        self._attach()
+        self._layout = layout
+
+    def discard(self) -> None:
+        self._close_file()
+        discard_recovery(self.path)
+
+        self._snapshot = False
+        self.count = 0
+        self.stale = False
+
+    def close(self) -> None:
+        self._detach()
+        self._close_file()
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _read_header(path: str) -> dict:
+    try:
+        with open(journal_path(path), encoding="utf-8") as f:
+            header = json.loads(f.readline())
+    except (OSError, ValueError):
+        return {}
+
+    return header if isinstance(header, dict) and header.get("format") == JOURNAL_FORMAT else {}
+
+
+def has_journal(path: str) -> bool:
+    header = _read_header(path)
+    if not header:
+        return False
+    try:
+        if "project" in header:
+            return header["project"] == _snapshot_stamp(path) and \
+                header["snapshot"] == _snapshot_stamp(snapshot_path(path))
+        return header["snapshot"] == _snapshot_stamp(path)
+    except OSError:
+        return False
+
+
+def has_snapshot(path: str) -> bool:
+    return has_journal(path) and "project" in _read_header(path)
+
+
+def discard_recovery(path: str) -> None:
+    for it in (journal_path(path), snapshot_path(path)):
+        if os.path.exists(it):
+            os.remove(it)
+
+
+def recover(path: str, proj=None) -> tuple:
+    # Несохраненное состояние проекта path: снимок (если есть) с примененным журналом.
+    # proj - проект, уже открытый из path; без снимка журнал применяется к нему.
+    # Возвращает (проект, число примененных записей) или (None, 0), если восстанавливать нечего.
+    if not has_journal(path):
+        return None, 0
+
+    if has_snapshot(path):
+        # Снимок читается в память: после сохранения или отказа от изменений его файл удаляется.
+        proj = load_project(snapshot_path(path), mmap=False)
+    elif proj is None:
+        proj = load_project(path)
+    return proj, replay(proj, path)
+
+
+def replay(proj, path: str) -> int:
+    # Применяет журнал к проекту, открытому из файла, к которому журнал относится (проекта или снимка).
+    # Журнал от другого снимка игнорируется.
+    if not has_journal(path):
+        return 0
+
+    if isinstance(proj, AHPProject):
+        matrices = [node.matrix for node in proj.get_nodes()]
+    else:
+        experts, alternatives = proj.get_experts(), proj.get_alternatives()
+
+    count = 0
+    with open(journal_path(path), encoding="utf-8") as f:
+        f.readline()
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Последняя строка могла быть записана не полностью.
+                break
+
+            if record[0] == "set":
+                k, i, j, value = record[1:]
+                matrices[k]._set_value(i, j, value)
+            elif record[0] == "vote":
+                i, j, rate, rate_count = record[1:]
+                proj._set_vote(experts[i], alternatives[j], rate)
+                experts[i].rate_count = rate_count
+            elif record[0] == "votes":
+                rows, votes = record[1:]
+                proj.set_votes(votes, [experts[i] for i in rows])
+            else:
+                raise ValueError("Unknown journal record: {0}".format(record[0]))
+            count += 1
+
+    return count
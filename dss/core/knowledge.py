@@ -0,0 +1,527 @@
+import csv
+import hashlib
+import pickle
+import shlex
+from collections import deque
+from typing import Iterable
+
+from dss.core.cache import cache_path, write_atomic
+
+# Факт - кортеж строк, например ("симптом", "пациент1", "жар"). Правило в файле:
+#   rule грипп: симптом ?p жар & симптом ?p кашель & not привит ?p => диагноз ?p грипп
+# Переменные начинаются с "?", "?" без имени совпадает с чем угодно, "not" - отсутствие подходящего факта.
+# Выведенные факты держатся, пока есть хотя бы одна активация правила, которая их вывела.
+VARIABLE_PREFIX = "?"
+NOT_WORD = "not"
+RULE_WORD = "rule"
+# Ограничение на число срабатываний за одно изменение: правила с отрицанием могут не сходиться.
+MAX_STEPS = 10 ** 7
+# Версия скомпилированной сети в кэше: меняется вместе с устройством узлов, старые файлы перестают подходить.
+COMPILED_VERSION = 2
+COMPILED_CACHE_FILE = "rules-{}.pickle"
+
+
+def is_variable(token: str) -> bool:
+    return token.startswith(VARIABLE_PREFIX)
+
+
+def _split(text: str) -> list:
+    return shlex.split(text) if '"' in text or "'" in text else text.split()
+
+
+class Rule(object):
+    def __init__(self, name: str, conditions: Iterable[tuple], conclusions: Iterable[tuple]):
+        # conditions - пары (отрицание, образец), conclusions - образцы выводимых фактов.
+        self.name = name
+        self.conditions = [(bool(negated), tuple(pattern)) for negated, pattern in conditions]
+        self.conclusions = [tuple(pattern) for pattern in conclusions]
+
+        if not self.conditions or not self.conclusions:
+            raise ValueError("Rule {0} needs conditions and conclusions.".format(name))
+
+        bound = {it for negated, pattern in self.conditions if not negated for it in pattern if is_variable(it)}
+        for pattern in self.conclusions:
+            for it in pattern:
+                if it == VARIABLE_PREFIX or is_variable(it) and it not in bound:
+                    raise ValueError("Variable {0} of rule {1} is not bound by a condition.".format(it, name))
+
+    @classmethod
+    def parse(cls, line: str) -> "Rule":
+        head, sep, body = line.partition(":")
+        words = head.split()
+        if not sep or len(words) != 2 or words[0] != RULE_WORD:
+            raise ValueError("Expected 'rule <name>: <conditions> => <conclusions>', got: {0}".format(line))
+        conditions, sep, conclusions = body.partition("=>")
+        if not sep:
+            raise ValueError("Rule {0} has no '=>'.".format(words[1]))
+
+        parsed = []
+        for it in conditions.split("&"):
+            pattern = _split(it)
+            negated = bool(pattern) and pattern[0] == NOT_WORD
+            if negated:
+                pattern = pattern[1:]
+            if not pattern:
+                raise ValueError("Empty condition in rule {0}.".format(words[1]))
+            parsed.append((negated, pattern))
+
+        return cls(words[1], parsed, [_split(it) for it in conclusions.split("&")])
+
+    def __str__(self):
+        def text(pattern):
+            return " ".join(shlex.quote(it) if it.split() != [it] else it for it in pattern)
+
+        conditions = " & ".join((NOT_WORD + " " if negated else "") + text(p) for negated, p in self.conditions)
+        return "{} {}: {} => {}".format(RULE_WORD, self.name, conditions, " & ".join(map(text, self.conclusions)))
+
+
+def parse_rules(lines: Iterable[str]) -> list:
+    return [Rule.parse(it) for it in (line.strip() for line in lines) if it and not it.startswith("#")]
+
+
+def parse_facts(lines: Iterable[str]) -> list:
+    return [tuple(_split(it)) for it in (line.strip() for line in lines) if it and not it.startswith("#")]
+
+
+def read_rules(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return parse_rules(f)
+
+
+def read_facts(path: str) -> list:
+    # Факты по строке: слова через пробел или, для .csv, ячейки строки.
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            return [tuple(it) for it in csv.reader(f) if it and not it[0].startswith("#")]
+        return parse_facts(f)
+
+
+class AlphaMemory(object):
+    # Факты, проходящие проверки одного образца: константы на позициях и равенство повторных переменных.
+    def __init__(self, arity: int, constants: tuple, equal: tuple):
+        self.key = (arity, constants, equal)
+        self.arity = arity
+        self.constants = constants
+        self.equal = equal
+        self.facts = set()
+        self.joins = []
+
+    def test(self, fact: tuple) -> bool:
+        return all(fact[a] == fact[b] for a, b in self.equal)
+
+
+class JoinNode(object):
+    # Соединение частичных совпадений (кортежей фактов) родителя с фактами альфа-памяти.
+    # Обе стороны проиндексированы значениями общих переменных, поэтому соединение не перебирает память целиком.
+    def __init__(self, uid: int, parent, alpha: AlphaMemory, left_keys: tuple, right_keys: tuple, negated: bool):
+        self.uid = uid
+        self.parent = parent
+        self.alpha = alpha
+        self.left_keys = left_keys
+        self.right_keys = right_keys
+        self.negated = negated
+        self.left = {}
+        self.right = {}
+        self.tokens = set()
+        self.children = []
+        self.productions = []
+
+
+class KnowledgeBase(object):
+    # Прямой вывод на сети Rete: альфа-память общая для одинаковых образцов, узлы соединения - для
+    # одинаковых начал правил. Добавление или удаление факта проходит только по узлам, которые от него зависят.
+    def __init__(self, name: str, max_steps: int = MAX_STEPS):
+        self.name = name
+        self.max_steps = max_steps
+        self.rules = []
+        self.explicit = set()
+        self.version = 0
+
+        self._facts = set()
+        self._support = {}
+        self._alpha = {}
+        self._alpha_index = {}
+        self._joins = {}
+        self._top = JoinNode(0, None, None, (), (), False)
+        self._top.tokens.add(())
+        self._agenda = deque()
+
+    @classmethod
+    def from_files(cls, name: str, rules_path: str, facts_path: str = None, cache: bool = True) -> "KnowledgeBase":
+        kb = compile_rules(rules_path, cache)
+        kb.name = name
+        if facts_path:
+            kb.assert_facts(read_facts(facts_path))
+        return kb
+
+    def load_rules(self, path: str) -> int:
+        rules = read_rules(path)
+        self.add_rules(rules)
+        return len(rules)
+
+    def load_facts(self, path: str) -> int:
+        facts = read_facts(path)
+        self.assert_facts(facts)
+        return len(facts)
+
+    # Построение сети
+
+    def add_rules(self, rules: Iterable[Rule]) -> None:
+        for rule in rules:
+            self._add_rule(rule)
+        self._run()
+
+    def add_rule(self, rule: Rule) -> None:
+        self.add_rules([rule])
+
+    def _add_rule(self, rule: Rule) -> None:
+        if any(it.name == rule.name for it in self.rules):
+            raise ValueError("Duplicate rule: {0}".format(rule.name))
+
+        node, bindings, size = self._top, {}, 0
+        for negated, pattern in rule.conditions:
+            constants, equal, left_keys, right_keys, local = [], [], [], [], {}
+            for pos, it in enumerate(pattern):
+                if it == VARIABLE_PREFIX:
+                    continue
+                elif not is_variable(it):
+                    constants.append((pos, it))
+                elif it in local:
+                    equal.append((local[it], pos))
+                elif it in bindings:
+                    local[it] = pos
+                    left_keys.append(bindings[it])
+                    right_keys.append(pos)
+                else:
+                    local[it] = pos
+
+            alpha = self._get_alpha(len(pattern), tuple(constants), tuple(equal))
+            node = self._get_join(node, alpha, tuple(left_keys), tuple(right_keys), negated)
+            if not negated:
+                for it, pos in local.items():
+                    bindings.setdefault(it, (size, pos))
+                size += 1
+
+        templates = [tuple((True, bindings[it]) if is_variable(it) else (False, it) for it in pattern)
+                     for pattern in rule.conclusions]
+        production = (rule.name, templates)
+        node.productions.append(production)
+        self.rules.append(rule)
+        self.version += 1
+
+        for token in list(node.tokens):
+            self._agenda.append((True, production, token))
+
+    def _get_alpha(self, arity: int, constants: tuple, equal: tuple) -> AlphaMemory:
+        key = (arity, constants, equal)
+        if key not in self._alpha:
+            alpha = AlphaMemory(arity, constants, equal)
+            alpha.facts = {it for it in self._facts if self._matches(alpha, it)}
+            self._add_alpha(alpha)
+        return self._alpha[key]
+
+    def _add_alpha(self, alpha: AlphaMemory) -> None:
+        positions = tuple(pos for pos, _ in alpha.constants)
+        values = tuple(value for _, value in alpha.constants)
+        self._alpha_index.setdefault(alpha.arity, {}).setdefault(positions, {}).setdefault(values, []).append(alpha)
+        self._alpha[alpha.key] = alpha
+
+    @staticmethod
+    def _matches(alpha: AlphaMemory, fact: tuple) -> bool:
+        return len(fact) == alpha.arity and all(fact[pos] == value for pos, value in alpha.constants) and \
+            alpha.test(fact)
+
+    def _get_join(self, parent: JoinNode, alpha: AlphaMemory, left_keys: tuple, right_keys: tuple,
+                  negated: bool) -> JoinNode:
+        # Ключи из значений, а не id(): сеть сохраняется в кэш и загружается обратно.
+        key = (parent.uid, alpha.key, left_keys, right_keys, negated)
+        if key not in self._joins:
+            node = JoinNode(len(self._joins) + 1, parent, alpha, left_keys, right_keys, negated)
+            self._joins[key] = node
+            parent.children.append(node)
+            alpha.joins.append(node)
+
+            # Новый узел заполняется из уже существующих фактов и частичных совпадений родителя.
+            for fact in alpha.facts:
+                node.right.setdefault(tuple(fact[p] for p in right_keys), set()).add(fact)
+            for token in parent.tokens:
+                self._left_add(node, token)
+        return self._joins[key]
+
+    # Распространение по сети
+
+    def _left_key(self, node: JoinNode, token: tuple) -> tuple:
+        return tuple(token[i][p] for i, p in node.left_keys)
+
+    def _left_add(self, node: JoinNode, token: tuple) -> None:
+        key = self._left_key(node, token)
+        node.left.setdefault(key, set()).add(token)
+        if node.negated:
+            if not node.right.get(key):
+                self._emit(node, token)
+        else:
+            for fact in node.right.get(key, ()):
+                self._emit(node, token + (fact,))
+
+    def _left_remove(self, node: JoinNode, token: tuple) -> None:
+        key = self._left_key(node, token)
+        bucket = node.left[key]
+        bucket.discard(token)
+        if not bucket:
+            del node.left[key]
+
+        if node.negated:
+            if not node.right.get(key):
+                self._revoke(node, token)
+        else:
+            for fact in node.right.get(key, ()):
+                self._revoke(node, token + (fact,))
+
+    def _right_add(self, node: JoinNode, fact: tuple) -> None:
+        key = tuple(fact[p] for p in node.right_keys)
+        bucket = node.right.setdefault(key, set())
+        bucket.add(fact)
+        if node.negated:
+            if len(bucket) == 1:
+                for token in list(node.left.get(key, ())):
+                    self._revoke(node, token)
+        else:
+            for token in list(node.left.get(key, ())):
+                self._emit(node, token + (fact,))
+
+    def _right_remove(self, node: JoinNode, fact: tuple) -> None:
+        key = tuple(fact[p] for p in node.right_keys)
+        bucket = node.right[key]
+        bucket.discard(fact)
+        if not bucket:
+            del node.right[key]
+
+        if node.negated:
+            if not bucket:
+                for token in list(node.left.get(key, ())):
+                    self._emit(node, token)
+        else:
+            for token in list(node.left.get(key, ())):
+                self._revoke(node, token + (fact,))
+
+    def _emit(self, node: JoinNode, token: tuple) -> None:
+        node.tokens.add(token)
+        for child in node.children:
+            self._left_add(child, token)
+        for production in node.productions:
+            self._agenda.append((True, production, token))
+
+    def _revoke(self, node: JoinNode, token: tuple) -> None:
+        node.tokens.discard(token)
+        for child in node.children:
+            self._left_remove(child, token)
+        for production in node.productions:
+            self._agenda.append((False, production, token))
+
+    def _get_alphas(self, fact: tuple) -> list:
+        result = []
+        for positions, table in self._alpha_index.get(len(fact), {}).items():
+            for alpha in table.get(tuple(fact[p] for p in positions), ()):
+                if alpha.test(fact):
+                    result.append(alpha)
+        return result
+
+    def _insert(self, fact: tuple) -> None:
+        self._facts.add(fact)
+        for alpha in self._get_alphas(fact):
+            alpha.facts.add(fact)
+            for node in alpha.joins:
+                self._right_add(node, fact)
+
+    def _delete(self, fact: tuple) -> None:
+        self._facts.discard(fact)
+        for alpha in self._get_alphas(fact):
+            alpha.facts.discard(fact)
+            for node in alpha.joins:
+                self._right_remove(node, fact)
+
+    def _run(self, deleted: set = None) -> None:
+        # Срабатывания обрабатываются по очереди: вывод факта может добавить новые активации.
+        # Факт, потерявший хотя бы одну опору, удаляется вместе со всем выведенным из него, а затем
+        # восстанавливается по оставшимся опорам: иначе правила, выводящие факты друг из друга, держали бы их вечно.
+        deleted = set() if deleted is None else deleted
+        steps = 0
+        while self._agenda or deleted:
+            while self._agenda:
+                add, (name, templates), token = self._agenda.popleft()
+                for template in templates:
+                    fact = tuple(token[value[0]][value[1]] if var else value for var, value in template)
+                    if add:
+                        self._support.setdefault(fact, set()).add((name, token))
+                        if fact not in self._facts:
+                            self._insert(fact)
+                    else:
+                        support = self._support[fact]
+                        support.discard((name, token))
+                        if not support:
+                            del self._support[fact]
+                        if fact in self._facts:
+                            self._delete(fact)
+                            deleted.add(fact)
+
+                steps += 1
+                if steps > self.max_steps:
+                    self._agenda.clear()
+                    raise ValueError("Rules did not converge in {0} steps.".format(self.max_steps))
+
+            for fact in deleted:
+                if fact not in self._facts and (fact in self.explicit or fact in self._support):
+                    self._insert(fact)
+            deleted.clear()
+
+    # Факты
+
+    @staticmethod
+    def _to_fact(fact) -> tuple:
+        fact = tuple(_split(fact)) if isinstance(fact, str) else tuple(fact)
+        if not fact or not all(isinstance(it, str) for it in fact):
+            raise TypeError("Fact must be a non-empty tuple of str.")
+        if any(is_variable(it) for it in fact):
+            raise ValueError("Fact can not contain variables: {0}".format(" ".join(fact)))
+        return fact
+
+    def assert_facts(self, facts: Iterable) -> None:
+        for it in facts:
+            fact = self._to_fact(it)
+            if fact not in self.explicit:
+                self.explicit.add(fact)
+                if fact not in self._facts:
+                    self._insert(fact)
+        self.version += 1
+        self._run()
+
+    def assert_fact(self, fact) -> None:
+        self.assert_facts([fact])
+
+    def retract_facts(self, facts: Iterable) -> None:
+        # Выведенный факт, который был и задан явно, остается, пока его поддерживают правила.
+        facts = [self._to_fact(it) for it in facts]
+        for fact in facts:
+            if fact not in self.explicit:
+                raise IndexError("No asserted fact: {0}".format(" ".join(fact)))
+
+        deleted = set()
+        for fact in facts:
+            self.explicit.discard(fact)
+            if fact in self._facts:
+                self._delete(fact)
+                deleted.add(fact)
+        self.version += 1
+        self._run(deleted)
+
+    def retract_fact(self, fact) -> None:
+        self.retract_facts([fact])
+
+    def get_facts(self) -> list:
+        return sorted(self._facts)
+
+    def get_derived(self) -> list:
+        return sorted(it for it in self._facts if it not in self.explicit)
+
+    def is_derived(self, fact) -> bool:
+        return self._to_fact(fact) in self._support
+
+    def __contains__(self, fact) -> bool:
+        return self._to_fact(fact) in self._facts
+
+    def explain(self, fact) -> list:
+        # Правила и факты, из которых выведен факт: [(правило, (факты условий, ...)), ...].
+        return sorted(self._support.get(self._to_fact(fact), ()))
+
+    def query(self, pattern) -> list:
+        # Подстановки переменных для фактов, подходящих под образец.
+        pattern = tuple(_split(pattern)) if isinstance(pattern, str) else tuple(pattern)
+        constants = [(pos, it) for pos, it in enumerate(pattern) if not is_variable(it)]
+
+        result = []
+        for fact in self._facts:
+            if len(fact) != len(pattern) or any(fact[pos] != it for pos, it in constants):
+                continue
+            bindings = {}
+            for it, value in zip(pattern, fact):
+                if it != VARIABLE_PREFIX and is_variable(it) and bindings.setdefault(it, value) != value:
+                    break
+            else:
+                result.append(bindings)
+        return result
+
+    def __getstate__(self):
+        # Узлы сети ссылаются друг на друга через родителей, детей и альфа-память: pickle обходил бы этот граф
+        # рекурсивно и на больших сетях упирался бы в предел рекурсии. Поэтому сеть сохраняется таблицами,
+        # где ссылки заменены номерами, и связывается заново при загрузке.
+        state = self.__dict__.copy()
+        for key in ("_alpha", "_alpha_index", "_joins", "_top", "_agenda"):
+            del state[key]
+
+        alphas = list(self._alpha.values())
+        numbers = {id(it): k for k, it in enumerate(alphas)}
+        state["_alpha_table"] = [(it.key, it.facts) for it in alphas]
+        state["_join_table"] = [(node.uid, node.parent.uid, numbers[id(node.alpha)], node.left_keys, node.right_keys,
+                                 node.negated, node.left, node.right, node.tokens, node.productions)
+                                for node in sorted(self._joins.values(), key=lambda it: it.uid)]
+        return state
+
+    def __setstate__(self, state):
+        alpha_table = state.pop("_alpha_table")
+        join_table = state.pop("_join_table")
+        self.__dict__.update(state)
+        self._alpha = {}
+        self._alpha_index = {}
+        self._joins = {}
+        self._top = JoinNode(0, None, None, (), (), False)
+        self._top.tokens.add(())
+        self._agenda = deque()
+
+        alphas = []
+        for key, facts in alpha_table:
+            alpha = AlphaMemory(*key)
+            alpha.facts = facts
+            self._add_alpha(alpha)
+            alphas.append(alpha)
+
+        # Узлы идут по возрастанию номеров: родитель всегда создан раньше, порядок детей сохраняется.
+        nodes = {0: self._top}
+        for uid, parent, alpha, left_keys, right_keys, negated, left, right, tokens, productions in join_table:
+            node = JoinNode(uid, nodes[parent], alphas[alpha], left_keys, right_keys, negated)
+            node.left, node.right, node.tokens, node.productions = left, right, tokens, productions
+            nodes[parent].children.append(node)
+            node.alpha.joins.append(node)
+            self._joins[(parent, node.alpha.key, left_keys, right_keys, negated)] = node
+            nodes[uid] = node
+
+    def __str__(self):
+        return "{}: {} rules, {} facts ({} derived)".format(self.name, len(self.rules), len(self._facts),
+                                                           len(self._facts) - len(self.explicit))
+
+
+def compile_rules(path: str, cache: bool = True) -> KnowledgeBase:
+    # Сеть правил без фактов сохраняется в кэш по хэшу содержимого файла: при повторном запуске
+    # с теми же правилами разбор и построение сети пропускаются.
+    with open(path, "rb") as f:
+        data = f.read()
+
+    digest = hashlib.sha256(b"%d\0%s" % (COMPILED_VERSION, data)).hexdigest()
+    compiled = cache_path(COMPILED_CACHE_FILE.format(digest)) if cache else None
+    if compiled:
+        try:
+            with open(compiled, "rb") as f:
+                kb = pickle.load(f)
+            if isinstance(kb, KnowledgeBase):
+                return kb
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            pass
+
+    kb = KnowledgeBase(path)
+    kb.add_rules(parse_rules(data.decode("utf-8").splitlines()))
+    if compiled:
+        # Кэш только ускоряет запуск: если сеть не удалось сохранить, работаем без него.
+        try:
+            write_atomic(compiled, pickle.dumps(kb, pickle.HIGHEST_PROTOCOL))
+        except (OSError, RecursionError, pickle.PicklingError):
+            pass
+    return kb
@@ -0,0 +1,310 @@
+import csv
+from typing import Iterable, Union
+
+import numpy as np
+import scipy.sparse as sp
+
+
+class MarkovProject(object):
+    # Однородная цепь Маркова с дискретным временем. Матрица переходов хранится в CSR:
+    # модели надежности имеют до 10^5 состояний при нескольких переходах из каждого.
+    def __init__(self, name: str, states: Iterable[str], transitions=None, tolerance: float = 1e-9):
+        self.name = name
+        self.tolerance = tolerance
+        self.states = list(states)
+
+        for it in self.states:
+            if not isinstance(it, str):
+                raise TypeError("Only str states allowed.")
+        if len(set(self.states)) != len(self.states):
+            raise ValueError("Duplicate states.")
+
+        self._index = {it: i for i, it in enumerate(self.states)}
+
+        if transitions is None:
+            # Пока переходы не заданы, каждое состояние переходит само в себя.
+            self._matrix = sp.identity(self.size, format="csr")
+        else:
+            self._matrix = self._to_csr(transitions)
+        self._updates = {}
+        self.version = 0
+
+    @classmethod
+    def from_csv(cls, name: str, path: str, tolerance: float = 1e-9) -> "MarkovProject":
+        # Строки файла: состояние, следующее состояние, вероятность перехода.
+        states, index, rows, cols, probs = [], {}, [], [], []
+        with open(path, newline="", encoding="utf-8") as f:
+            for record in csv.reader(f):
+                if not record or record[0].startswith("#"):
+                    continue
+                if len(record) != 3:
+                    raise ValueError("Expected 'from,to,probability', got: {0}".format(",".join(record)))
+
+                for it in record[:2]:
+                    if it not in index:
+                        index[it] = len(states)
+                        states.append(it)
+                rows.append(index[record[0]])
+                cols.append(index[record[1]])
+                probs.append(float(record[2]))
+
+        matrix = sp.csr_matrix((probs, (rows, cols)), shape=(len(states), len(states)))
+        return cls(name, states, matrix, tolerance)
+
+    @property
+    def size(self) -> int:
+        return len(self.states)
+
+    def _to_csr(self, transitions) -> sp.csr_matrix:
+        matrix = sp.csr_matrix(transitions, dtype=float)
+        if matrix.shape != (self.size, self.size):
+            raise ValueError("Transition matrix shape {0} does not match {1} states.".format(matrix.shape, self.size))
+        if matrix.nnz and matrix.data.min() < 0:
+            raise ValueError("Transition probabilities must be non-negative.")
+
+        matrix.sum_duplicates()
+        matrix.eliminate_zeros()
+        return matrix
+
+    def set(self, state1: str, state2: str, probability: Union[float, str]) -> None:
+        # Правки копятся в словаре и вливаются в CSR при следующем расчете.
+        probability = float(probability)
+        if not 0 <= probability <= 1:
+            raise ValueError("Probability must be in range 0-1, got: {0}".format(probability))
+
+        self._updates[self._get_position(state1, state2)] = probability
+        self.version += 1
+
+    def get(self, state1: str, state2: str) -> float:
+        i, j = self._get_position(state1, state2)
+        if (i, j) in self._updates:
+            return self._updates[(i, j)]
+        return float(self._matrix[i, j])
+
+    def _get_position(self, state1: str, state2: str) -> tuple:
+        if state1 not in self._index or state2 not in self._index:
+            raise IndexError("No transition: {0} -> {1}".format(state1, state2))
+
+        return self._index[state1], self._index[state2]
+
+    def get_matrix(self) -> sp.csr_matrix:
+        if self._updates:
+            keys = np.array(list(self._updates), dtype=np.int64)
+            values = np.fromiter(self._updates.values(), dtype=float, count=len(self._updates))
+            mask = sp.csr_matrix((np.ones(len(keys)), (keys[:, 0], keys[:, 1])), shape=self._matrix.shape)
+            new = sp.csr_matrix((values, (keys[:, 0], keys[:, 1])), shape=self._matrix.shape)
+
+            # Старые значения вычитаются точно, поэтому новые попадают в матрицу без погрешности.
+            self._matrix = (self._matrix - self._matrix.multiply(mask) + new).tocsr()
+            self._matrix.eliminate_zeros()
+            self._updates = {}
+
+        return self._matrix
+
+    def set_matrix(self, transitions) -> None:
+        self._matrix = self._to_csr(transitions)
+        self._updates = {}
+        self.version += 1
+
+    def merge(self, other: "MarkovProject") -> None:
+        # Новые состояния добавляются, строки состояний с переходами в other заменяются целиком.
+        for it in other.states:
+            if it not in self._index:
+                self.add_state(it)
+
+        order = np.array([self._index[it] for it in other.states], dtype=np.int64)
+        new = other.get_matrix().tocoo()
+        current = self.get_matrix().tocoo()
+        keep = ~np.isin(current.row, order[new.row])
+
+        self.set_matrix(sp.csr_matrix((np.concatenate((current.data[keep], new.data)),
+                                       (np.concatenate((current.row[keep], order[new.row])),
+                                        np.concatenate((current.col[keep], order[new.col])))),
+                                      shape=(self.size, self.size)))
+
+    def add_state(self, state: str) -> None:
+        if not isinstance(state, str):
+            raise TypeError("Only str states allowed.")
+        if state in self._index:
+            raise ValueError("Duplicate state: {0}".format(state))
+
+        self._matrix = sp.block_diag((self.get_matrix(), sp.identity(1)), format="csr")
+        self._index[state] = self.size
+        self.states.append(state)
+        self.version += 1
+
+    def remove_state(self, state: str) -> None:
+        # Вероятности переходов в удаленное состояние теряются: строки нужно поправить до расчета.
+        keep = np.ones(self.size, dtype=bool)
+        keep[self._get_position(state, state)[0]] = False
+
+        self._matrix = self.get_matrix()[keep][:, keep].tocsr()
+        self.states.remove(state)
+        self._index = {it: i for i, it in enumerate(self.states)}
+        self.version += 1
+
+    def check(self) -> None:
+        sums = np.asarray(self.get_matrix().sum(axis=1)).ravel()
+        bad = np.flatnonzero(np.abs(sums - 1) > self.tolerance)
+        if bad.size:
+            raise ValueError("Transition probabilities from {0} sum to {1}, must be 1 ({2} invalid states).".format(
+                self.states[bad[0]], sums[bad[0]], bad.size))
+
+    def _get_distribution(self, initial) -> np.ndarray:
+        if isinstance(initial, str):
+            vector = np.zeros(self.size)
+            vector[self._get_position(initial, initial)[0]] = 1
+        elif isinstance(initial, dict):
+            vector = np.zeros(self.size)
+            for state, p in initial.items():
+                vector[self._get_position(state, state)[0]] = p
+        else:
+            vector = np.asarray(initial, dtype=float)
+
+        if vector.shape != (self.size,) or np.any(vector < 0) or abs(vector.sum() - 1) > self.tolerance:
+            raise ValueError("Initial distribution must be a probability vector over {0} states.".format(self.size))
+        return vector
+
+    def stationary_distribution(self, tolerance: float = 1e-10, max_iterations: int = None) -> np.ndarray:
+        from scipy.sparse import linalg
+
+        self.check()
+        p = self.get_matrix()
+        n = self.size
+
+        # pi (I - P) = 0, sum(pi) = 1: последнее уравнение системы заменяется нормировкой.
+        a = (sp.identity(n, format="csr") - p).T.tocsr()
+        a = sp.vstack([a[:-1], sp.csr_matrix(np.ones((1, n)))], format="csc")
+        b = np.zeros(n)
+        b[-1] = 1
+
+        # Диагональный предобусловливатель: неполное LU на графах переходов общего вида дает слишком большое заполнение.
+        diagonal = a.diagonal()
+        diagonal[diagonal == 0] = 1
+        preconditioner = sp.diags(1 / diagonal)
+
+        x, info = linalg.gmres(a, b, M=preconditioner, rtol=tolerance, restart=50, maxiter=max_iterations)
+        if info != 0 or np.linalg.norm(a @ x - b, 1) > np.sqrt(tolerance):
+            raise ValueError("Stationary distribution did not converge (the chain may be reducible).")
+
+        x = np.clip(x, 0, None)
+        return x / x.sum()
+
+    def transition_power(self, steps: int, drop_tolerance: float = 0., max_nnz: int = None) -> sp.csr_matrix:
+        # P^n возведением в квадрат: log2(n) произведений вместо n.
+        # drop_tolerance отбрасывает малые вероятности, если степени P становятся слишком плотными.
+        if steps < 0:
+            raise ValueError("Number of steps must be non-negative, got: {0}".format(steps))
+
+        result = sp.identity(self.size, format="csr")
+        square = self.get_matrix()
+        while steps:
+            if steps & 1:
+                result = _prune(result @ square, drop_tolerance)
+            steps >>= 1
+            if steps:
+                if max_nnz is not None and _product_nnz(square) > max_nnz:
+                    raise ValueError("P^n has more than {0} non-zero elements, use drop_tolerance.".format(max_nnz))
+                square = _prune(square @ square, drop_tolerance)
+
+        return result
+
+    def distribution(self, initial, steps: int, drop_tolerance: float = 0., max_nnz: int = None) -> np.ndarray:
+        # Распределение через steps шагов. Степени P возводятся в квадрат, пока остаются разреженными
+        # (не больше max_nnz элементов, по умолчанию примерно как у P), остальные шаги - умножения на вектор.
+        if steps < 0:
+            raise ValueError("Number of steps must be non-negative, got: {0}".format(steps))
+
+        vector = self._get_distribution(initial)
+        square = self.get_matrix()
+        max_nnz = max_nnz or 2 * square.nnz + self.size
+
+        while steps:
+            if steps & 1:
+                vector = square.T @ vector
+            steps >>= 1
+            if not steps:
+                break
+
+            if _product_nnz(square) > max_nnz:
+                # Осталось умножить на (square^2)^steps.
+                for _ in range(2 * steps):
+                    vector = square.T @ vector
+                break
+            square = _prune(square @ square, drop_tolerance)
+
+        return vector
+
+    def get_absorbing_states(self) -> list:
+        return [self.states[i] for i in np.flatnonzero(self._get_absorbing())]
+
+    def _get_absorbing(self) -> np.ndarray:
+        p = self.get_matrix()
+        return (np.abs(p.diagonal() - 1) <= self.tolerance) & (np.diff(p.indptr) == 1)
+
+    def _factorize_transient(self) -> tuple:
+        from scipy.sparse import linalg
+
+        self.check()
+        absorbing = self._get_absorbing()
+        if not absorbing.any():
+            raise ValueError("Chain has no absorbing states.")
+
+        transient = np.flatnonzero(~absorbing)
+        p = self.get_matrix()[transient]
+        q = p[:, transient]
+
+        try:
+            lu = linalg.splu((sp.identity(transient.size, format="csc") - q).tocsc())
+        except RuntimeError:
+            raise ValueError("Some transient states never reach an absorbing state.")
+
+        return lu, transient, np.flatnonzero(absorbing), p
+
+    def absorption_analysis(self) -> dict:
+        # N = (I - Q)^-1 не строится: все величины получаются решениями с одним LU-разложением I - Q.
+        lu, transient, absorbing, p = self._factorize_transient()
+
+        steps = lu.solve(np.ones(transient.size))
+        variance = 2 * lu.solve(steps) - steps - steps ** 2
+        probabilities = lu.solve(p[:, absorbing].toarray())
+
+        return {"transient": [self.states[i] for i in transient],
+                "absorbing": [self.states[i] for i in absorbing],
+                "expected_steps": steps,
+                "variance": variance,
+                "probabilities": probabilities}
+
+    def fundamental_matrix(self, states: Iterable[str] = None) -> np.ndarray:
+        # Столбцы N для заданных переходных состояний (все столбцы - плотная матрица, только для малых цепей).
+        lu, transient, _, _ = self._factorize_transient()
+        position = {i: k for k, i in enumerate(transient)}
+
+        if states is None:
+            columns = np.arange(transient.size)
+        else:
+            columns = []
+            for it in states:
+                i = self._get_position(it, it)[0]
+                if i not in position:
+                    raise ValueError("State {0} is absorbing.".format(it))
+                columns.append(position[i])
+
+        unit = np.zeros((transient.size, len(columns)))
+        unit[columns, np.arange(len(columns))] = 1
+        return lu.solve(unit)
+
+    def __str__(self):
+        return "{}: {} states, {} transitions".format(self.name, self.size, self.get_matrix().nnz)
+
+
+def _product_nnz(matrix: sp.csr_matrix) -> int:
+    # Верхняя оценка числа ненулевых элементов matrix @ matrix: сумма длин строк, на которые ссылается каждая строка.
+    return int(np.diff(matrix.indptr)[matrix.indices].sum())
+
+
+def _prune(matrix: sp.csr_matrix, tolerance: float) -> sp.csr_matrix:
+    if tolerance > 0:
+        matrix.data[matrix.data < tolerance] = 0
+        matrix.eliminate_zeros()
+    return matrix
@@ -0,0 +1,236 @@
+from typing import Iterable
+
+import numpy as np
+import scipy.sparse as sp
+
+from dss.core.markov import MarkovProject
+
+
+class MarkovDecisionProject(object):
+    # Марковский процесс принятия решений: для каждого действия своя цепь переходов (MarkovProject)
+    # и вектор ожидаемых вознаграждений. Для расчетов матрицы действий складываются в одну
+    # CSR размера (действия * состояния) x состояния, и шаг Беллмана - одно умножение на вектор.
+    def __init__(self, name: str, states: Iterable[str], actions: Iterable[str], discount: float = .95,
+                 tolerance: float = 1e-9):
+        self.name = name
+        self.tolerance = tolerance
+        self.states = list(states)
+        self.actions = list(actions)
+
+        if not self.actions:
+            raise ValueError("At least one action required.")
+        for it in self.actions:
+            if not isinstance(it, str):
+                raise TypeError("Only str actions allowed.")
+        if len(set(self.actions)) != len(self.actions):
+            raise ValueError("Duplicate actions.")
+
+        self.chains = {it: MarkovProject(it, self.states, tolerance=tolerance) for it in self.actions}
+        self.rewards = np.zeros((len(self.actions), self.size))
+        self.allowed = np.ones((len(self.actions), self.size), dtype=bool)
+        self.set_discount(discount)
+
+        self._stack = None
+        self._stamp = None
+
+    @property
+    def size(self) -> int:
+        return len(self.states)
+
+    def set_discount(self, discount: float) -> None:
+        if not 0 < discount < 1:
+            raise ValueError("Discount must be in range (0, 1), got: {0}".format(discount))
+        self.discount = float(discount)
+
+    def get_chain(self, action: str) -> MarkovProject:
+        if action not in self.chains:
+            raise IndexError("No action: {0}".format(action))
+        return self.chains[action]
+
+    def set_transition(self, action: str, state1: str, state2: str, probability) -> None:
+        self.get_chain(action).set(state1, state2, probability)
+
+    def set_transitions(self, action: str, transitions) -> None:
+        self.get_chain(action).set_matrix(transitions)
+
+    def set_reward(self, action: str, state: str, reward) -> None:
+        self.rewards[self._get_action(action), self._get_state(state)] = float(reward)
+
+    def set_rewards(self, action: str, rewards) -> None:
+        rewards = np.asarray(rewards, dtype=float)
+        if rewards.shape != (self.size,):
+            raise ValueError("Rewards shape {0} does not match {1} states.".format(rewards.shape, self.size))
+        self.rewards[self._get_action(action)] = rewards
+
+    def set_allowed(self, action: str, state: str, allowed: bool) -> None:
+        self.allowed[self._get_action(action), self._get_state(state)] = allowed
+
+    def _get_action(self, action: str) -> int:
+        if action not in self.chains:
+            raise IndexError("No action: {0}".format(action))
+        return self.actions.index(action)
+
+    def _get_state(self, state: str) -> int:
+        return self.chains[self.actions[0]]._get_position(state, state)[0]
+
+    def add_state(self, state: str) -> None:
+        for chain in self.chains.values():
+            chain.add_state(state)
+
+        self.states.append(state)
+        self.rewards = np.pad(self.rewards, ((0, 0), (0, 1)))
+        self.allowed = np.pad(self.allowed, ((0, 0), (0, 1)), constant_values=True)
+
+    def add_action(self, action: str) -> None:
+        if not isinstance(action, str):
+            raise TypeError("Only str actions allowed.")
+        if action in self.chains:
+            raise ValueError("Duplicate action: {0}".format(action))
+
+        self.chains[action] = MarkovProject(action, self.states, tolerance=self.tolerance)
+        self.actions.append(action)
+        self.rewards = np.pad(self.rewards, ((0, 1), (0, 0)))
+        self.allowed = np.pad(self.allowed, ((0, 1), (0, 0)), constant_values=True)
+
+    def _get_stack(self) -> sp.csr_matrix:
+        stamp = tuple((id(self.chains[it]), self.chains[it].version) for it in self.actions)
+        if stamp != self._stamp:
+            self._stack = sp.vstack([self.chains[it].get_matrix() for it in self.actions], format="csr")
+            self._stamp = stamp
+        return self._stack
+
+    def check(self) -> None:
+        if not self.allowed.any(axis=0).all():
+            state = self.states[int(np.flatnonzero(~self.allowed.any(axis=0))[0])]
+            raise ValueError("No action allowed in state {0}.".format(state))
+        if not np.isfinite(self.rewards[self.allowed]).all():
+            raise ValueError("Rewards must be finite.")
+
+        # Строки запрещенных действий не проверяются: они в расчет не попадают.
+        sums = np.asarray(self._get_stack().sum(axis=1)).reshape(self.allowed.shape)
+        bad = np.argwhere(self.allowed & (np.abs(sums - 1) > self.tolerance))
+        if bad.size:
+            a, s = bad[0]
+            raise ValueError("Transition probabilities of action {0} from {1} sum to {2}, must be 1.".format(
+                self.actions[a], self.states[s], sums[a, s]))
+
+    def bellman(self, values: np.ndarray) -> np.ndarray:
+        # Q(a, s) = R(a, s) + discount * sum_s' P_a(s, s') V(s') сразу для всех действий и состояний.
+        q = self.rewards + self.discount * (self._get_stack() @ values).reshape(self.rewards.shape)
+        q[~self.allowed] = -np.inf
+        return q
+
+    def _initial_values(self) -> np.ndarray:
+        # При V0 = min R / (1 - discount) выполняется T V0 >= V0, и модифицированная итерация монотонна.
+        return np.full(self.size, self.rewards[self.allowed].min() / (1 - self.discount))
+
+    def _threshold(self, tolerance: float) -> float:
+        # Останов по невязке Беллмана дает стратегию, оптимальную с точностью до tolerance.
+        return tolerance * (1 - self.discount) / (2 * self.discount)
+
+    def _policy_rows(self, policy: np.ndarray) -> np.ndarray:
+        return policy * self.size + np.arange(self.size)
+
+    def evaluate_policy(self, policy, values: np.ndarray = None) -> np.ndarray:
+        # Решение (I - discount * P_pi) V = R_pi; матрица строго диагонально доминирует,
+        # поэтому GMRES с диагональным предобусловливателем сходится за несколько итераций.
+        from scipy.sparse import linalg
+
+        policy = self._get_policy(policy)
+        rows = self._policy_rows(policy)
+        a = (sp.identity(self.size, format="csr") - self.discount * self._get_stack()[rows]).tocsr()
+        b = self.rewards.ravel()[rows]
+
+        values, info = linalg.gmres(a, b, x0=values, M=sp.diags(1 / a.diagonal()), rtol=self.tolerance,
+                                    restart=50)
+        if info != 0:
+            raise ValueError("Policy evaluation did not converge.")
+        return values
+
+    def _get_policy(self, policy) -> np.ndarray:
+        if isinstance(policy, dict):
+            policy = [policy[it] for it in self.states]
+        policy = np.array([self._get_action(it) if isinstance(it, str) else it for it in policy], dtype=np.int64)
+
+        if policy.shape != (self.size,) or not self.allowed[policy, np.arange(self.size)].all():
+            raise ValueError("Policy must choose an allowed action for each of {0} states.".format(self.size))
+        return policy
+
+    def value_iteration(self, tolerance: float = 1e-6, max_iterations: int = 100000) -> dict:
+        self.check()
+        values = self._initial_values()
+        threshold = self._threshold(tolerance)
+
+        trace = []
+        for iteration in range(1, max_iterations + 1):
+            q = self.bellman(values)
+            new = q.max(axis=0)
+            trace.append(np.abs(new - values).max())
+            values = new
+            if trace[-1] < threshold:
+                break
+        else:
+            raise ValueError("Value iteration did not converge in {0} iterations.".format(max_iterations))
+
+        return self._result("value_iteration", values, q.argmax(axis=0), trace)
+
+    def policy_iteration(self, policy=None, max_iterations: int = 1000) -> dict:
+        self.check()
+        # Начальная стратегия - первое разрешенное действие в каждом состоянии.
+        policy = self.allowed.argmax(axis=0) if policy is None else self._get_policy(policy)
+        states = np.arange(self.size)
+
+        trace, values = [], None
+        for iteration in range(1, max_iterations + 1):
+            values = self.evaluate_policy(policy, values)
+            q = self.bellman(values)
+            trace.append(np.abs(q.max(axis=0) - values).max())
+
+            # Действие меняется, только если новое заметно лучше: так стратегия не зацикливается на равных.
+            improve = q.max(axis=0) > q[policy, states] + self.tolerance * (1 + np.abs(values))
+            if not improve.any():
+                break
+            policy = np.where(improve, q.argmax(axis=0), policy)
+        else:
+            raise ValueError("Policy iteration did not converge in {0} iterations.".format(max_iterations))
+
+        return self._result("policy_iteration", values, policy, trace)
+
+    def modified_policy_iteration(self, evaluation_steps: int = 20, tolerance: float = 1e-6,
+                                  max_iterations: int = 100000) -> dict:
+        # Оценка стратегии заменяется evaluation_steps шагами V = R_pi + discount * P_pi V.
+        self.check()
+        values = self._initial_values()
+        threshold = self._threshold(tolerance)
+        stack = self._get_stack()
+        rewards = self.rewards.ravel()
+
+        trace = []
+        for iteration in range(1, max_iterations + 1):
+            q = self.bellman(values)
+            new = q.max(axis=0)
+            policy = q.argmax(axis=0)
+            trace.append(np.abs(new - values).max())
+            values = new
+            if trace[-1] < threshold:
+                break
+
+            rows = self._policy_rows(policy)
+            p, r = stack[rows], rewards[rows]
+            for _ in range(evaluation_steps):
+                values = r + self.discount * (p @ values)
+        else:
+            raise ValueError("Modified policy iteration did not converge in {0} iterations.".format(max_iterations))
+
+        return self._result("modified_policy_iteration", values, policy, trace)
+
+    def _result(self, method: str, values: np.ndarray, policy: np.ndarray, trace: list) -> dict:
+        return {"method": method,
+                "values": values,
+                "policy": [self.actions[i] for i in policy],
+                "actions": policy,
+                "iterations": len(trace),
+                "trace": np.array(trace)}
+
+    def __str__(self):
+        return "{}: {} states, {} actions, discount {}".format(self.name, self.size, len(self.actions), self.discount)
@@ -0,0 +1,112 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from dss.core.ahp import PriorityMethod
+from dss.core.consistency import SAATY_SCALE, perron_vectors
+
+# Не больше ~4M элементов в одной пачке сэмплированных матриц.
+CHUNK_ELEMENTS = 2 ** 22
+
+_LOG_SCALE = np.log(SAATY_SCALE)
+
+
+def rank_probabilities(project, samples: int = 10000, steps: int = 1, workers: int = None, seed: int = None) -> dict:
+    if samples < 1:
+        raise ValueError("At least one sample required, got: {0}".format(samples))
+    if steps < 0 or steps >= SAATY_SCALE.size:
+        raise ValueError("Steps must be in range 0-{0}, got: {1}".format(SAATY_SCALE.size - 1, steps))
+
+    tree = _export_tree(project.root)
+    workers = max(1, min(workers or os.cpu_count() or 1, samples))
+
+    # Каждому процессу - своя часть выборки и свой поток случайных чисел,
+    # поэтому результат зависит только от seed и числа процессов.
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    sizes = [samples // workers + (1 if i < samples % workers else 0) for i in range(workers)]
+
+    if workers == 1:
+        parts = [_simulate(tree, sizes[0], steps, seeds[0])]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            parts = list(pool.map(_simulate, [tree] * workers, sizes, [steps] * workers, seeds))
+
+    counts = sum(p[0] for p in parts)
+    mean = sum(p[1] for p in parts) / samples
+    var = np.maximum(sum(p[2] for p in parts) / samples - mean ** 2, 0)
+
+    return {
+        "alternatives": list(project.alternatives),
+        "rank_probabilities": counts / samples,
+        "mean": mean,
+        "std": np.sqrt(var),
+        "samples": samples,
+    }
+
+
+def _export_tree(node) -> tuple:
+    # Рабочим процессам передаются только массивы и флаги.
+    children = None if node.is_leaf() else [_export_tree(node.children[it]) for it in node.matrix.items]
+    return np.array(node.matrix._matrix), node.matrix.method is PriorityMethod.EIGENVECTOR, children
+
+
+def _simulate(tree: tuple, samples: int, steps: int, seed: np.random.SeedSequence) -> tuple:
+    rng = np.random.default_rng(seed)
+    chunk = max(1, CHUNK_ELEMENTS // _max_size(tree) ** 2)
+
+    counts = total = squares = 0
+    for start in range(0, samples, chunk):
+        g = _sample_tree(tree, min(chunk, samples - start), steps, rng)
+        n = g.shape[1]
+
+        ranks = np.empty(g.shape, dtype=np.intp)
+        np.put_along_axis(ranks, np.argsort(-g, axis=1), np.arange(n), axis=1)
+
+        counts = counts + np.bincount((np.arange(n) * n + ranks).ravel(), minlength=n * n).reshape(n, n)
+        total = total + g.sum(axis=0)
+        squares = squares + (g ** 2).sum(axis=0)
+
+    return counts, total, squares
+
+
+def _max_size(tree: tuple) -> int:
+    matrix, _, children = tree
+    return max([matrix.shape[0]] + [_max_size(c) for c in children or ()])
+
+
+def _sample_tree(tree: tuple, count: int, steps: int, rng: np.random.Generator) -> np.ndarray:
+    matrix, eigen, children = tree
+    w = _sample_vectors(matrix, eigen, count, steps, rng)
+
+    if children is None:
+        return w
+
+    sub = np.stack([_sample_tree(c, count, steps, rng) for c in children], axis=1)
+    return np.einsum("sk,ska->sa", w, sub)
+
+
+def _sample_vectors(matrix: np.ndarray, eigen: bool, count: int, steps: int, rng: np.random.Generator) -> np.ndarray:
+    n = matrix.shape[0]
+    rows, cols = np.triu_indices(n, 1)
+
+    # Суждение сдвигается на +-steps делений шкалы Саати.
+    pos = np.abs(np.log(matrix[rows, cols])[:, None] - _LOG_SCALE).argmin(axis=1).astype(np.int8)
+    pos = pos + rng.integers(-steps, steps + 1, size=(count, rows.size), dtype=np.int8)
+    np.clip(pos, 0, SAATY_SCALE.size - 1, out=pos)
+
+    if eigen:
+        values = SAATY_SCALE.take(pos)
+        stack = np.ones((count, n, n))
+        stack[:, rows, cols] = values
+        stack[:, cols, rows] = 1 / values
+        return perron_vectors(stack)[1]
+
+    # Для геометрического среднего достаточно сумм логарифмов по строкам:
+    # log a_ij входит в строку i со знаком плюс и в строку j со знаком минус.
+    incidence = np.zeros((rows.size, n))
+    incidence[np.arange(rows.size), rows] = 1
+    incidence[np.arange(rows.size), cols] = -1
+
+    v = np.exp(_LOG_SCALE.take(pos) @ incidence / n)
+    return v / v.sum(axis=1, keepdims=True)
@@ -0,0 +1,375 @@
+import io
+import json
+import os
+import pickle
+import struct
+import sys
+import zipfile
+
+import numpy as np
+
+from dss.core.ahp import AHPProject, ComparisonMatrix, CriterionNode, PriorityMethod
+from dss.core.expert import Degree, Expert, ExpertProject, Position
+from dss.core.knowledge import KnowledgeBase, Rule
+from dss.core.tree import DecisionTree, NodeKind
+from dss.core.uncertainty import UncertaintyProject
+
+# Файл проекта - zip без сжатия: header.json с описанием структуры и массивы в формате .npy,
+# которые при открытии отображаются в память по одному на матрицу.
+FORMAT_NAME = "dss-project"
+FORMAT_VERSION = 1
+HEADER = "header.json"
+
+_ZIP_MAGIC = b"PK\x03\x04"
+
+# Старые файлы ссылаются на модули с интерфейсом; классы модели теперь живут в dss.core.
+_LEGACY_MODULES = {
+    "ahpproject": "dss.core.ahp",
+    "dss.ahpproject": "dss.core.ahp",
+    "expertproject": "dss.core.expert",
+    "dss.expertproject": "dss.core.expert",
+}
+
+
+class ProjectUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        return super().find_class(_LEGACY_MODULES.get(module, module), name)
+
+
+def load_pickle(path: str):
+    with open(path, "rb") as f:
+        return ProjectUnpickler(f).load()
+
+
+def is_legacy(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(_ZIP_MAGIC)) != _ZIP_MAGIC
+
+
+def load_project(path: str, mmap: bool = True):
+    if is_legacy(path):
+        return load_pickle(path)
+
+    with zipfile.ZipFile(path) as zf:
+        header = json.loads(zf.read(HEADER).decode("utf-8"))
+        if header.get("format") != FORMAT_NAME:
+            raise ValueError("Not a project file: {0}".format(path))
+        if header.get("version", 0) > FORMAT_VERSION:
+            raise ValueError("Unsupported project file version {0} (supported up to {1}).".format(
+                header.get("version"), FORMAT_VERSION))
+
+        def array(name):
+            return _map_array(path, zf.getinfo(name)) if mmap else _read_array(zf, name)
+
+        if header["type"] == "ahp":
+            return _load_ahp(header, array)
+        elif header["type"] == "expert":
+            return _load_expert(header, array)
+        elif header["type"] == "markov":
+            return _load_markov(header, array)
+        elif header["type"] == "mdp":
+            return _load_mdp(header, array)
+        elif header["type"] == "tree":
+            return _load_tree(header, array)
+        elif header["type"] == "uncertainty":
+            return _load_uncertainty(header, array)
+        elif header["type"] == "knowledge":
+            return _load_knowledge(header)
+
+    raise ValueError("Unknown project type: {0}".format(header["type"]))
+
+
+def save_project(proj, path: str) -> None:
+    if isinstance(proj, AHPProject):
+        header, arrays = _dump_ahp(proj)
+    elif isinstance(proj, ExpertProject):
+        header, arrays = _dump_expert(proj)
+    elif _is_markov(proj):
+        header, arrays = _dump_markov(proj)
+    elif _is_mdp(proj):
+        header, arrays = _dump_mdp(proj)
+    elif isinstance(proj, DecisionTree):
+        header, arrays = _dump_tree(proj)
+    elif isinstance(proj, UncertaintyProject):
+        header, arrays = _dump_uncertainty(proj)
+    elif isinstance(proj, KnowledgeBase):
+        header, arrays = _dump_knowledge(proj)
+    else:
+        raise TypeError("Unsupported project type: {0}".format(proj.__class__.__name__))
+
+    header.update(format=FORMAT_NAME, version=FORMAT_VERSION)
+
+    # Пишем во временный файл: открытый проект может быть отображен из файла, который перезаписываем.
+    tmp = "{}.{}.tmp".format(path, os.getpid())
+    try:
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_STORED) as zf:
+            zf.writestr(HEADER, json.dumps(header, ensure_ascii=False, indent=1).encode("utf-8"))
+            for name, arr in arrays.items():
+                with zf.open(name, "w", force_zip64=True) as f:
+                    np.lib.format.write_array(f, np.ascontiguousarray(arr))
+    except BaseException:
+        # Недописанный файл не оставляем рядом с проектом.
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    _detach(proj, path)
+    os.replace(tmp, path)
+
+
+def convert_pickle(src: str, dst: str = None) -> bool:
+    if not is_legacy(src):
+        return False
+
+    save_project(load_pickle(src), dst or src)
+    return True
+
+
+def _dump_ahp(proj: AHPProject) -> tuple:
+    order = proj.get_nodes()
+    index = {id(node): k for k, node in enumerate(order)}
+
+    nodes, arrays = [], {}
+    for k, node in enumerate(order):
+        name = "matrices/{}.npy".format(k)
+        arrays[name] = node.matrix._matrix
+        children = None if node.is_leaf() else [index[id(node.children[it])] for it in node.matrix.items]
+        nodes.append({"name": node.name, "items": node.matrix.items, "children": children, "array": name,
+                      "method": node.matrix.method.name, "tolerance": node.matrix.tolerance,
+                      "max_iterations": node.matrix.max_iterations})
+
+    header = {"type": "ahp", "name": proj.name, "target": proj.target, "alternatives": proj.alternatives,
+              "nodes": nodes}
+    return header, arrays
+
+
+def _load_ahp(header: dict, array) -> AHPProject:
+    nodes = []
+    for it in header["nodes"]:
+        matrix = ComparisonMatrix.from_array(it["items"], array(it["array"]), PriorityMethod[it["method"]],
+                                             it["tolerance"], it["max_iterations"])
+        nodes.append(CriterionNode.from_matrix(it["name"], matrix))
+
+    for node, it in zip(nodes, header["nodes"]):
+        if it["children"] is not None:
+            node.children = {nodes[k].name: nodes[k] for k in it["children"]}
+
+    return AHPProject.from_root(header["name"], header["target"], header["alternatives"], nodes[0])
+
+
+def _dump_expert(proj: ExpertProject) -> tuple:
+    experts = proj.get_experts()
+    alternatives = proj.get_alternatives()
+    votes = proj.get_votes().astype(np.int64)
+
+    header = {"type": "expert", "name": proj.name, "target": proj.target, "alternatives": alternatives,
+              "experts": [{"name": exp.name, "position": exp.position.name, "degree": exp.degree.name,
+                           "rate_count": exp.rate_count} for exp in experts],
+              "votes": "votes.npy"}
+    return header, {"votes.npy": votes.reshape(len(experts), len(alternatives))}
+
+
+def _load_expert(header: dict, array) -> ExpertProject:
+    experts = []
+    for it in header["experts"]:
+        exp = Expert(it["name"], Position[it["position"]], Degree[it["degree"]])
+        exp.rate_count = it["rate_count"]
+        experts.append(exp)
+
+    proj = ExpertProject(header["alternatives"], experts, header["name"], header["target"])
+    proj._load_votes(array(header["votes"]))
+    return proj
+
+
+def _is_markov(proj) -> bool:
+    # Цепь Маркова существует, только если ее модуль уже загружен: scipy не импортируется ради проверки.
+    markov = sys.modules.get("dss.core.markov")
+    return markov is not None and isinstance(proj, markov.MarkovProject)
+
+
+def _is_mdp(proj) -> bool:
+    mdp = sys.modules.get("dss.core.mdp")
+    return mdp is not None and isinstance(proj, mdp.MarkovDecisionProject)
+
+
+def _dump_csr(matrix, prefix: str) -> tuple:
+    # Матрица переходов хранится тремя массивами CSR.
+    names = {k: "{}/{}.npy".format(prefix, k) for k in ("data", "indices", "indptr")}
+    return names, {names[k]: getattr(matrix, k) for k in names}
+
+
+def _load_csr(names: dict, size: int, array):
+    import scipy.sparse as sp
+
+    return sp.csr_matrix((array(names["data"]), array(names["indices"]), array(names["indptr"])),
+                         shape=(size, size))
+
+
+def _dump_markov(proj) -> tuple:
+    names, arrays = _dump_csr(proj.get_matrix(), "transitions")
+    header = {"type": "markov", "name": proj.name, "states": proj.states, "tolerance": proj.tolerance,
+              "transitions": names}
+    return header, arrays
+
+
+def _load_markov(header: dict, array):
+    from dss.core.markov import MarkovProject
+
+    matrix = _load_csr(header["transitions"], len(header["states"]), array)
+    return MarkovProject(header["name"], header["states"], matrix, header["tolerance"])
+
+
+def _dump_mdp(proj) -> tuple:
+    transitions, arrays = [], {"rewards.npy": proj.rewards, "allowed.npy": proj.allowed}
+    for k, action in enumerate(proj.actions):
+        names, chain = _dump_csr(proj.get_chain(action).get_matrix(), "transitions/{}".format(k))
+        transitions.append(names)
+        arrays.update(chain)
+
+    header = {"type": "mdp", "name": proj.name, "states": proj.states, "actions": proj.actions,
+              "discount": proj.discount, "tolerance": proj.tolerance, "transitions": transitions,
+              "rewards": "rewards.npy", "allowed": "allowed.npy"}
+    return header, arrays
+
+
+def _load_mdp(header: dict, array):
+    from dss.core.mdp import MarkovDecisionProject
+
+    proj = MarkovDecisionProject(header["name"], header["states"], header["actions"], header["discount"],
+                                 header["tolerance"])
+    for action, names in zip(header["actions"], header["transitions"]):
+        proj.set_transitions(action, _load_csr(names, proj.size, array))
+
+    # Вознаграждения и допустимые действия меняются на месте и при добавлении состояний, поэтому копируются.
+    proj.rewards = np.array(array(header["rewards"]), dtype=float)
+    proj.allowed = np.array(array(header["allowed"]), dtype=bool)
+    return proj
+
+
+def _dump_tree(proj: DecisionTree) -> tuple:
+    # Ветви всех узлов подряд, как в CSR: ветви узла k - indptr[k]:indptr[k + 1]. Общие поддеревья хранятся один раз.
+    nodes = proj.nodes
+    indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(node.children) for node in nodes])
+    probabilities = [p for node in nodes
+                     for p in (node.probabilities if node.kind == NodeKind.CHANCE else [np.nan] * len(node.children))]
+
+    arrays = {"tree/kinds.npy": np.array([node.kind.value for node in nodes], dtype=np.int8),
+              "tree/values.npy": np.array([node.value for node in nodes], dtype=float),
+              "tree/indptr.npy": indptr,
+              "tree/children.npy": np.array([it.index for node in nodes for it in node.children], dtype=np.int64),
+              "tree/probabilities.npy": np.array(probabilities, dtype=float),
+              "tree/cash.npy": np.array([c for node in nodes for c in node.cash], dtype=float)}
+
+    header = {"type": "tree", "name": proj.name, "tolerance": proj.tolerance,
+              "root": None if proj.root is None else proj.root.index,
+              "names": [node.name for node in nodes], "events": [node.event for node in nodes],
+              "labels": [node.labels for node in nodes], "arrays": {k[5:-4]: k for k in arrays}}
+    return header, arrays
+
+
+def _load_tree(header: dict, array) -> DecisionTree:
+    names = header["arrays"]
+    if header["root"] is None:
+        return DecisionTree(header["name"], header["tolerance"])
+
+    return DecisionTree.from_arrays(header["name"], header["names"], array(names["kinds"]), array(names["values"]),
+                                    header["events"], header["labels"], array(names["indptr"]),
+                                    array(names["children"]), array(names["probabilities"]), array(names["cash"]),
+                                    header["root"], header["tolerance"])
+
+
+def _dump_uncertainty(proj: UncertaintyProject) -> tuple:
+    # Матрица выигрышей пишется в файл целиком без промежуточной копии, даже если она отображена в память.
+    header = {"type": "uncertainty", "name": proj.name, "alternatives": proj.alternatives,
+              "scenarios": proj.scenarios, "alpha": proj.alpha, "payoffs": "payoffs.npy"}
+    return header, {"payoffs.npy": proj.payoffs}
+
+
+def _load_uncertainty(header: dict, array) -> UncertaintyProject:
+    return UncertaintyProject(header["name"], header["alternatives"], header["scenarios"],
+                              array(header["payoffs"]), header["alpha"])
+
+
+def _dump_knowledge(proj: KnowledgeBase) -> tuple:
+    # Хранятся правила и явно заданные факты; выведенные факты и сеть восстанавливаются при открытии.
+    header = {"type": "knowledge", "name": proj.name, "max_steps": proj.max_steps,
+              "rules": [str(it) for it in proj.rules], "facts": sorted(proj.explicit)}
+    return header, {}
+
+
+def _load_knowledge(header: dict) -> KnowledgeBase:
+    kb = KnowledgeBase(header["name"], header["max_steps"])
+    kb.add_rules(Rule.parse(it) for it in header["rules"])
+    kb.assert_facts(header["facts"])
+    return kb
+
+
+def _read_array(zf: zipfile.ZipFile, name: str) -> np.ndarray:
+    return np.lib.format.read_array(io.BytesIO(zf.read(name)))
+
+
+def _map_array(path: str, info: zipfile.ZipInfo) -> np.ndarray:
+    if info.compress_type != zipfile.ZIP_STORED:
+        raise ValueError("Compressed array can not be memory mapped: {0}".format(info.filename))
+
+    with open(path, "rb") as f:
+        # Данные начинаются после локального заголовка zip: 30 байт + имя + дополнительное поле.
+        f.seek(info.header_offset)
+        local = f.read(30)
+        name_len, extra_len = struct.unpack("<HH", local[26:30])
+        f.seek(info.header_offset + 30 + name_len + extra_len)
+
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+
+    if not shape or 0 in shape:
+        return np.zeros(shape, dtype=dtype)
+
+    # Копирование при записи: правки остаются в памяти, файл меняется только при сохранении.
+    return np.memmap(path, dtype=dtype, mode="c", offset=offset, shape=shape, order="F" if fortran else "C")
+
+
+def _detach(proj, path: str) -> None:
+    # Отображенный массив держит файл открытым (в Windows его нельзя заменить), поэтому в память копируются
+    # только массивы, отображенные из заменяемого файла path. Отображения других файлов остаются на диске.
+    if isinstance(proj, AHPProject):
+        for node in proj.get_nodes():
+            if _is_mapped(node.matrix._matrix, path):
+                node.matrix._matrix = np.array(node.matrix._matrix)
+    elif isinstance(proj, UncertaintyProject):
+        if _is_mapped(proj.payoffs, path):
+            proj.payoffs = np.array(proj.payoffs)
+    elif _is_markov(proj):
+        _detach_chain(proj, path)
+    elif _is_mdp(proj):
+        for action in proj.actions:
+            _detach_chain(proj.get_chain(action), path)
+
+
+def _detach_chain(chain, path: str) -> None:
+    matrix = chain.get_matrix()
+    if any(_is_mapped(a, path) for a in (matrix.data, matrix.indices, matrix.indptr)):
+        chain.set_matrix(matrix.copy())
+
+
+def _is_mapped(array: np.ndarray, path: str = None) -> bool:
+    # Отображен ли массив из файла path (без path - из любого файла).
+    # scipy оборачивает отображенные массивы в обычные ndarray: np.memmap ищется среди базовых массивов.
+    while isinstance(array, np.ndarray):
+        if isinstance(array, np.memmap):
+            return path is None or _is_same_file(array.filename, path)
+        array = array.base
+    return False
+
+
+def _is_same_file(a: str, b: str) -> bool:
+    try:
+        return a is not None and os.path.samefile(a, b)
+    except OSError:
+        # Нового файла еще нет: ни один массив из него не отображен.
+        return False
@@ -0,0 +1,533 @@
+from enum import Enum
+from typing import Iterable
+
+import numpy as np
+
+
+class NodeKind(Enum):
+    DECISION = 0
+    CHANCE = 1
+    TERMINAL = 2
+
+
+class TreeNode(object):
+    # Ветви хранятся параллельными списками: метка, потомок, вероятность (у узла случая) и выплата при переходе.
+    # event - имя неопределенности: узлы случая с одним event описывают одну и ту же величину (для EVPI/EVSI).
+    def __init__(self, kind: NodeKind, name: str, value: float = 0., event: str = None):
+        self.kind = kind
+        self.name = name
+        self.value = float(value)
+        self.event = event
+        self.labels = []
+        self.children = []
+        self.probabilities = []
+        self.cash = []
+        self.index = None
+
+    def is_leaf(self) -> bool:
+        return self.kind == NodeKind.TERMINAL
+
+    def _key(self) -> tuple:
+        return (self.kind, self.name, self.value, self.event, tuple(self.labels),
+                tuple(it.index for it in self.children), tuple(self.probabilities), tuple(self.cash))
+
+    def __str__(self):
+        return self.name
+
+
+class DecisionTree(object):
+    # Дерево решений хранится как DAG: одинаковые поддеревья создаются один раз (add_* возвращают уже
+    # существующий узел), и ожидаемое значение каждого узла считается один раз. Значения кэшируются,
+    # правка помечает устаревшими узел и его предков, свертка пересчитывает только их.
+    def __init__(self, name: str, tolerance: float = 1e-9):
+        self.name = name
+        self.tolerance = tolerance
+        self.nodes = []
+        self.root = None
+        self.version = 0
+
+        self._parents = []
+        self._interned = {}
+        self._values = []
+        self._choices = []
+        self._dirty = set()
+        self._order = None
+
+    @classmethod
+    def from_arrays(cls, name: str, names: list, kinds, values, events: list, labels: list, indptr, children,
+                    probabilities, cash, root: int, tolerance: float = 1e-9) -> "DecisionTree":
+        # Ветви узла k - элементы indptr[k]:indptr[k + 1] массивов children, probabilities и cash.
+        tree = cls(name, tolerance)
+        nodes = [TreeNode(NodeKind(int(kind)), it, value, event)
+                 for it, kind, value, event in zip(names, kinds.tolist(), values.tolist(), events)]
+
+        indptr, children = indptr.tolist(), children.tolist()
+        probabilities, cash = probabilities.tolist(), cash.tolist()
+        for k, node in enumerate(nodes):
+            start, end = indptr[k], indptr[k + 1]
+            node.labels = list(labels[k])
+            node.children = [nodes[i] for i in children[start:end]]
+            if node.kind == NodeKind.CHANCE:
+                node.probabilities = probabilities[start:end]
+            node.cash = cash[start:end]
+
+        for k, node in enumerate(nodes):
+            node.index = k
+        for node in nodes:
+            tree._append(node)
+        for node in nodes:
+            tree._link(node)
+        tree.set_root(nodes[root])
+        return tree
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_order"] = None
+        return state
+
+    def add_terminal(self, name: str, value: float = 0.) -> TreeNode:
+        return self._add(TreeNode(NodeKind.TERMINAL, name, value))
+
+    def add_decision(self, name: str, labels: Iterable[str] = (), children: Iterable[TreeNode] = (),
+                     cash: Iterable[float] = None) -> TreeNode:
+        node = TreeNode(NodeKind.DECISION, name)
+        self._set_branches(node, labels, children, None, cash)
+        return self._add(node)
+
+    def add_chance(self, name: str, labels: Iterable[str] = (), children: Iterable[TreeNode] = (),
+                   probabilities: Iterable[float] = (), cash: Iterable[float] = None, event: str = None) -> TreeNode:
+        node = TreeNode(NodeKind.CHANCE, name, event=event)
+        self._set_branches(node, labels, children, probabilities, cash)
+        return self._add(node)
+
+    def new_node(self, kind: NodeKind, name: str) -> TreeNode:
+        # Пустой узел для редактирования: в отличие от add_*, не совпадает с уже существующими узлами.
+        node = TreeNode(kind, name)
+        self._append(node)
+        return node
+
+    def _set_branches(self, node: TreeNode, labels, children, probabilities, cash) -> None:
+        node.labels = [str(it) for it in labels]
+        node.children = list(children)
+        node.cash = [0.] * len(node.labels) if cash is None else [float(it) for it in cash]
+        if probabilities is not None:
+            node.probabilities = [float(it) for it in probabilities]
+
+        sizes = {len(node.labels), len(node.children), len(node.cash)}
+        if node.kind == NodeKind.CHANCE:
+            sizes.add(len(node.probabilities))
+        if len(sizes) != 1:
+            raise ValueError("Branch lists of node {0} have different lengths.".format(node.name))
+        for it in node.children:
+            self._check_node(it)
+
+    def _check_node(self, node: TreeNode) -> None:
+        if node.index is None or node.index >= len(self.nodes) or self.nodes[node.index] is not node:
+            raise IndexError("Node {0} does not belong to tree {1}.".format(node.name, self.name))
+
+    def _add(self, node: TreeNode) -> TreeNode:
+        key = node._key()
+        if key in self._interned:
+            return self._interned[key]
+
+        self._append(node)
+        self._link(node)
+        return node
+
+    def _append(self, node: TreeNode) -> None:
+        node.index = len(self.nodes)
+        self.nodes.append(node)
+        self._parents.append(set())
+        self._values.append(0.)
+        self._choices.append(-1)
+        self._dirty.add(node.index)
+        self._interned.setdefault(node._key(), node)
+        self._order = None
+        self.version += 1
+
+    def _link(self, node: TreeNode) -> None:
+        for it in node.children:
+            self._parents[it.index].add(node.index)
+
+    def set_root(self, node: TreeNode) -> None:
+        self._check_node(node)
+        self.root = node
+        self._order = None
+        self.version += 1
+
+    def _unintern(self, node: TreeNode) -> None:
+        # Измененный узел больше не совпадает со своим ключом; узлы с тем же новым содержимым не объединяются до share().
+        key = node._key()
+        if self._interned.get(key) is node:
+            del self._interned[key]
+
+    def _changed(self, node: TreeNode, structure: bool = False) -> None:
+        self._invalidate([node.index])
+        if structure:
+            self._order = None
+        self.version += 1
+
+    def _invalidate(self, indices: Iterable[int]) -> None:
+        stack = [i for i in indices if i not in self._dirty]
+        self._dirty.update(stack)
+        while stack:
+            for parent in self._parents[stack.pop()]:
+                if parent not in self._dirty:
+                    self._dirty.add(parent)
+                    stack.append(parent)
+
+    def set_value(self, node: TreeNode, value: float) -> None:
+        self._check_node(node)
+        if not node.is_leaf():
+            raise TypeError("Only terminal nodes have a value: {0}".format(node.name))
+
+        self._unintern(node)
+        node.value = float(value)
+        self._changed(node)
+
+    def set_probability(self, node: TreeNode, branch: int, probability: float) -> None:
+        self._check_node(node)
+        if node.kind != NodeKind.CHANCE:
+            raise TypeError("Only chance nodes have probabilities: {0}".format(node.name))
+        probability = float(probability)
+        if not 0 <= probability <= 1:
+            raise ValueError("Probability must be in range 0-1, got: {0}".format(probability))
+
+        self._unintern(node)
+        node.probabilities[branch] = probability
+        self._changed(node)
+
+    def set_cash(self, node: TreeNode, branch: int, cash: float) -> None:
+        self._check_node(node)
+        self._unintern(node)
+        node.cash[branch] = float(cash)
+        self._changed(node)
+
+    def set_event(self, node: TreeNode, event: str) -> None:
+        self._check_node(node)
+        if node.kind != NodeKind.CHANCE:
+            raise TypeError("Only chance nodes have events: {0}".format(node.name))
+
+        self._unintern(node)
+        node.event = event or None
+        self._changed(node)
+
+    def add_branch(self, node: TreeNode, label: str, child: TreeNode, probability: float = 0.,
+                   cash: float = 0.) -> None:
+        self._check_node(node)
+        self._check_node(child)
+        if node.is_leaf():
+            raise TypeError("Terminal node can not have branches: {0}".format(node.name))
+        if child is node or node.index in self._get_descendants(child):
+            raise ValueError("Branch {0} -> {1} makes a cycle.".format(node.name, child.name))
+
+        self._unintern(node)
+        node.labels.append(str(label))
+        node.children.append(child)
+        node.cash.append(float(cash))
+        if node.kind == NodeKind.CHANCE:
+            node.probabilities.append(float(probability))
+        self._parents[child.index].add(node.index)
+        self._changed(node, structure=True)
+
+    def remove_branch(self, node: TreeNode, branch: int) -> None:
+        self._check_node(node)
+        self._unintern(node)
+        child = node.children.pop(branch)
+        node.labels.pop(branch)
+        node.cash.pop(branch)
+        if node.kind == NodeKind.CHANCE:
+            node.probabilities.pop(branch)
+        if child not in node.children:
+            self._parents[child.index].discard(node.index)
+        self._changed(node, structure=True)
+
+    def _get_descendants(self, node: TreeNode) -> set:
+        result, stack = set(), [node]
+        while stack:
+            for it in stack.pop().children:
+                if it.index not in result:
+                    result.add(it.index)
+                    stack.append(it)
+        return result
+
+    def get_order(self) -> list:
+        # Узлы, достижимые из корня, в обратном топологическом порядке: потомки раньше предков.
+        if self._order is None:
+            if self.root is None:
+                raise ValueError("Tree {0} has no root.".format(self.name))
+
+            order, visited = [], {self.root.index}
+            stack = [(self.root, iter(self.root.children))]
+            while stack:
+                node, children = stack[-1]
+                for child in children:
+                    if child.index not in visited:
+                        visited.add(child.index)
+                        stack.append((child, iter(child.children)))
+                        break
+                else:
+                    order.append(node.index)
+                    stack.pop()
+            self._order = order
+        return self._order
+
+    def share(self) -> int:
+        # Объединяет одинаковые поддеревья, появившиеся после правок; недостижимые из корня узлы удаляются.
+        # Возвращает число удаленных узлов. Ссылки на удаленные узлы становятся недействительными.
+        order = self.get_order()
+        canonical, nodes, interned = {}, [], {}
+        for node in [self.nodes[i] for i in order]:
+            node.children = [canonical[id(it)] for it in node.children]
+            node.index = None
+            # Ключ строится по индексам в новом списке узлов.
+            key = (node.kind, node.name, node.value, node.event, tuple(node.labels),
+                   tuple(it.index for it in node.children), tuple(node.probabilities), tuple(node.cash))
+            if key not in interned:
+                node.index = len(nodes)
+                nodes.append(node)
+                interned[key] = node
+            canonical[id(node)] = interned[key]
+
+        removed = len(self.nodes) - len(nodes)
+        root = canonical[id(self.root)]
+        self.nodes, self._parents, self._values, self._choices, self._interned = [], [], [], [], {}
+        self._dirty = set()
+        for node in nodes:
+            self._append(node)
+        for node in nodes:
+            self._link(node)
+        self.root = root
+        self._order = None
+        return removed
+
+    def count_paths(self) -> int:
+        # Число путей от корня до конечных узлов, то есть размер дерева без объединения поддеревьев.
+        paths = {}
+        for i in self.get_order():
+            node = self.nodes[i]
+            paths[i] = 1 if node.is_leaf() else sum(paths[it.index] for it in node.children)
+        return paths[self.root.index]
+
+    def _roll(self, node: TreeNode, values: list, probabilities: dict = None) -> tuple:
+        # Ожидаемое значение узла по уже посчитанным значениям потомков. probabilities заменяет
+        # вероятности исходов (по меткам) у узлов случая указанного события.
+        if node.is_leaf():
+            return node.value, -1
+
+        if not node.children:
+            raise ValueError("Node {0} has no branches.".format(node.name))
+        branch = [c + values[it.index] for c, it in zip(node.cash, node.children)]
+
+        if node.kind == NodeKind.DECISION:
+            choice = max(range(len(branch)), key=branch.__getitem__)
+            return branch[choice], choice
+
+        if probabilities is not None:
+            weights = [probabilities.get(it, 0.) for it in node.labels]
+        else:
+            weights = node.probabilities
+            if min(weights) < 0 or abs(sum(weights) - 1) > self.tolerance:
+                raise ValueError("Probabilities of node {0} sum to {1}, must be 1.".format(node.name, sum(weights)))
+        return sum(p * v for p, v in zip(weights, branch)), -1
+
+    def _evaluate(self, indices: Iterable[int], values: list, choices: list, event: str = None,
+                  probabilities: dict = None) -> None:
+        for i in indices:
+            node = self.nodes[i]
+            override = probabilities if event is not None and node.event == event else None
+            values[i], choices[i] = self._roll(node, values, override)
+
+    def _get_dirty_order(self, dirty: set) -> list:
+        order = self.get_order()
+        if len(dirty) * 8 < len(order):
+            position = {i: k for k, i in enumerate(order)}
+            return sorted((i for i in dirty if i in position), key=position.__getitem__)
+        return [i for i in order if i in dirty]
+
+    def rollback(self) -> float:
+        # Свертка: пересчитываются только узлы, помеченные после правок.
+        indices = self._get_dirty_order(self._dirty)
+        self._evaluate(indices, self._values, self._choices)
+        self._dirty.difference_update(indices)
+        return self._values[self.root.index]
+
+    def get_value(self, node: TreeNode) -> float:
+        self.rollback()
+        return self._values[node.index]
+
+    def get_branch_values(self, node: TreeNode) -> list:
+        self.rollback()
+        return [c + self._values[it.index] for c, it in zip(node.cash, node.children)]
+
+    def get_choice(self, node: TreeNode) -> int:
+        if node.kind != NodeKind.DECISION:
+            raise TypeError("Only decision nodes have a choice: {0}".format(node.name))
+        self.rollback()
+        return self._choices[node.index]
+
+    def get_policy(self) -> list:
+        # Оптимальные решения в узлах решения, до которых можно дойти при оптимальной стратегии.
+        self.rollback()
+        return [(self.nodes[i], self.nodes[i].labels[self._choices[i]]) for i in self._get_policy_nodes()
+                if self.nodes[i].kind == NodeKind.DECISION]
+
+    def _get_policy_nodes(self) -> list:
+        reachable, stack = {self.root.index}, [self.root]
+        while stack:
+            node = stack.pop()
+            children = node.children if node.kind != NodeKind.DECISION else [node.children[self._choices[node.index]]]
+            for it in children:
+                if it.index not in reachable:
+                    reachable.add(it.index)
+                    stack.append(it)
+        return [i for i in self.get_order() if i in reachable]
+
+    def risk_profile(self) -> tuple:
+        # Распределение итогового выигрыша при оптимальной стратегии: (значения по возрастанию, вероятности).
+        # Распределение каждого узла считается один раз и используется всеми его предками.
+        self.rollback()
+        profiles = {}
+        for i in self._get_policy_nodes():
+            node = self.nodes[i]
+            if node.is_leaf():
+                profiles[i] = (np.array([node.value]), np.ones(1))
+            elif node.kind == NodeKind.DECISION:
+                k = self._choices[i]
+                values, probs = profiles[node.children[k].index]
+                profiles[i] = (values + node.cash[k], probs)
+            else:
+                parts = [(profiles[it.index][0] + c, profiles[it.index][1] * p)
+                         for it, c, p in zip(node.children, node.cash, node.probabilities) if p > 0]
+                values, inverse = np.unique(np.concatenate([v for v, _ in parts]), return_inverse=True)
+                profiles[i] = (values, np.bincount(inverse, np.concatenate([p for _, p in parts]), values.size))
+
+        return profiles[self.root.index]
+
+    def get_events(self) -> list:
+        return sorted({self.nodes[i].event for i in self.get_order() if self.nodes[i].event is not None})
+
+    def get_event_probabilities(self, event: str) -> dict:
+        # Априорные вероятности исходов события; у всех узлов события они должны совпадать.
+        result = None
+        for i in self.get_order():
+            node = self.nodes[i]
+            if node.event != event:
+                continue
+
+            probs = dict(zip(node.labels, node.probabilities))
+            if result is None:
+                result = probs
+            elif set(probs) != set(result) or any(abs(probs[it] - result[it]) > self.tolerance for it in probs):
+                raise ValueError("Chance nodes of event {0} have different outcomes.".format(event))
+
+        if result is None:
+            raise IndexError("No event: {0}".format(event))
+        return result
+
+    def _conditional_value(self, event: str, probabilities: dict, indices: list) -> float:
+        # Свертка с другими вероятностями исходов события: пересчитываются только узлы события и их предки,
+        # значения остальных узлов берутся из кэша.
+        values, choices = list(self._values), list(self._choices)
+        self._evaluate(indices, values, choices, event, probabilities)
+        return values[self.root.index]
+
+    def _get_event_ancestors(self, event: str) -> list:
+        dirty, stack = set(), [i for i in self.get_order() if self.nodes[i].event == event]
+        dirty.update(stack)
+        while stack:
+            for parent in self._parents[stack.pop()]:
+                if parent not in dirty:
+                    dirty.add(parent)
+                    stack.append(parent)
+        return self._get_dirty_order(dirty)
+
+    def evpi(self, event: str) -> float:
+        # Ожидаемая ценность полной информации об исходе события, известном до всех решений
+        # (событие предполагается независимым от остальных).
+        base = self.rollback()
+        priors = self.get_event_probabilities(event)
+        indices = self._get_event_ancestors(event)
+
+        informed = sum(p * self._conditional_value(event, {label: 1.}, indices) for label, p in priors.items() if p > 0)
+        return max(informed - base, 0.)
+
+    def evsi(self, event: str, likelihoods: dict) -> float:
+        # Ожидаемая ценность выборочной информации: likelihoods[сигнал][исход] = P(сигнал | исход).
+        # Для каждого сигнала дерево сворачивается с апостериорными вероятностями по формуле Байеса.
+        base = self.rollback()
+        priors = self.get_event_probabilities(event)
+        indices = self._get_event_ancestors(event)
+
+        for label in priors:
+            total = sum(signal.get(label, 0.) for signal in likelihoods.values())
+            if abs(total - 1) > self.tolerance:
+                raise ValueError("Likelihoods of outcome {0} sum to {1}, must be 1.".format(label, total))
+
+        informed = 0.
+        for signal in likelihoods.values():
+            joint = {label: p * signal.get(label, 0.) for label, p in priors.items()}
+            marginal = sum(joint.values())
+            if marginal > 0:
+                posterior = {label: p / marginal for label, p in joint.items()}
+                informed += marginal * self._conditional_value(event, posterior, indices)
+        return max(informed - base, 0.)
+
+    def sensitivity(self, node: TreeNode, values: Iterable[float], branch: int = None) -> np.ndarray:
+        # Значение корня при разных значениях параметра: выигрыша конечного узла, выплаты ветви branch
+        # узла решения или вероятности ветви branch узла случая (остальные масштабируются пропорционально).
+        # Каждый расчет пересчитывает только путь от измененного узла к корню.
+        self._check_node(node)
+        values = [float(it) for it in values]
+        if node.is_leaf():
+            saved = node.value
+        elif branch is None:
+            raise ValueError("Branch required for node {0}.".format(node.name))
+        elif node.kind == NodeKind.DECISION:
+            saved = node.cash[branch]
+        else:
+            saved = list(node.probabilities)
+            # Значения проверяются до расчета, чтобы ошибка не прерывала перебор на середине.
+            for value in values:
+                if not 0 <= value <= 1:
+                    raise ValueError("Probability must be in range 0-1, got: {0}".format(value))
+                if len(saved) == 1 and value != 1:
+                    raise ValueError("The only branch of node {0} must have probability 1.".format(node.name))
+
+        self._unintern(node)
+        result = []
+        try:
+            for value in values:
+                self._set_parameter(node, branch, value, saved)
+                self._invalidate([node.index])
+                result.append(self.rollback())
+        finally:
+            if node.kind == NodeKind.CHANCE:
+                node.probabilities = saved
+            else:
+                self._set_parameter(node, branch, saved, saved)
+            self._invalidate([node.index])
+            self._interned.setdefault(node._key(), node)
+
+        return np.array(result)
+
+    @staticmethod
+    def _set_parameter(node: TreeNode, branch: int, value: float, saved) -> None:
+        if node.is_leaf():
+            node.value = value
+        elif node.kind == NodeKind.DECISION:
+            node.cash[branch] = value
+        else:
+            if not 0 <= value <= 1:
+                raise ValueError("Probability must be in range 0-1, got: {0}".format(value))
+            rest = 1 - saved[branch]
+            if rest > 0:
+                scale = (1 - value) / rest
+                node.probabilities = [value if k == branch else p * scale for k, p in enumerate(saved)]
+            else:
+                # У остальных ветвей нулевые вероятности, пропорции нет: остаток делится поровну.
+                share = (1 - value) / (len(saved) - 1) if len(saved) > 1 else 0.
+                node.probabilities = [value if k == branch else share for k in range(len(saved))]
+
+    def __str__(self):
+        return "{}: {} nodes".format(self.name, len(self.nodes))
@@ -0,0 +1,258 @@
+import csv
+import itertools
+from typing import Iterable
+
+import numpy as np
+
+# Размер блока (элементов матрицы), по которому считаются критерии: промежуточные массивы не превышают 32 МБ.
+CHUNK_ELEMENTS = 2 ** 22
+CRITERIA = ("wald", "maximax", "savage", "hurwicz", "laplace")
+
+
+class CriteriaAccumulator(object):
+    # Критерии по блокам сценариев (столбцов матрицы выигрышей). Каждый сценарий целиком входит в один блок,
+    # поэтому сожаление Сэвиджа (максимум по альтернативам минус выигрыш) считается за один проход.
+    def __init__(self, alternatives: int):
+        self.minimum = np.full(alternatives, np.inf)
+        self.maximum = np.full(alternatives, -np.inf)
+        self.total = np.zeros(alternatives)
+        self.regret = np.zeros(alternatives)
+        self.scenarios = 0
+
+    def add(self, block: np.ndarray) -> None:
+        # block - альтернативы x сценарии.
+        block = np.asarray(block, dtype=float)
+        if block.ndim != 2 or block.shape[0] != self.minimum.size:
+            raise ValueError("Block shape {0} does not match {1} alternatives.".format(block.shape, self.minimum.size))
+        if not block.shape[1]:
+            return
+        if not np.isfinite(block).all():
+            raise ValueError("Payoffs must be finite.")
+
+        np.minimum(self.minimum, block.min(axis=1), out=self.minimum)
+        np.maximum(self.maximum, block.max(axis=1), out=self.maximum)
+        self.total += block.sum(axis=1)
+        np.maximum(self.regret, (block.max(axis=0) - block).max(axis=1), out=self.regret)
+        self.scenarios += block.shape[1]
+
+    def hurwicz(self, alpha) -> np.ndarray:
+        # alpha - коэффициент оптимизма; для массива alpha результат - строка на каждое значение.
+        alpha = np.asarray(alpha, dtype=float)
+        if np.any((alpha < 0) | (alpha > 1)):
+            raise ValueError("Alpha must be in range 0-1.")
+        return np.multiply.outer(alpha, self.maximum) + np.multiply.outer(1 - alpha, self.minimum)
+
+    def result(self, alpha: float = .5) -> dict:
+        if not self.scenarios:
+            raise ValueError("No scenarios.")
+
+        return {"wald": self.minimum.copy(),
+                "maximax": self.maximum.copy(),
+                "savage": self.regret.copy(),
+                "hurwicz": self.hurwicz(alpha),
+                "laplace": self.total / self.scenarios}
+
+
+def best_index(criterion: str, scores: np.ndarray) -> int:
+    # По Сэвиджу лучшая альтернатива - с наименьшим сожалением, по остальным критериям - с наибольшим значением.
+    return int(np.argmin(scores) if criterion == "savage" else np.argmax(scores))
+
+
+def iter_blocks(payoffs: np.ndarray, chunk_elements: int = CHUNK_ELEMENTS):
+    # Блоки столбцов; для np.memmap в память попадает только текущий блок.
+    step = max(1, chunk_elements // max(1, payoffs.shape[0]))
+    for start in range(0, payoffs.shape[1], step):
+        yield payoffs[:, start:start + step]
+
+
+def read_csv_header(path: str) -> list:
+    with open(path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f), None)
+    if not header or len(header) < 2:
+        raise ValueError("Expected header 'scenario,<alternatives>' in {0}".format(path))
+    return header[1:]
+
+
+def iter_csv_blocks(path: str, chunk_elements: int = CHUNK_ELEMENTS):
+    # Файл: заголовок "сценарий,альтернатива 1,...", далее строка на сценарий.
+    # Возвращает (имена сценариев, блок альтернативы x сценарии), не читая файл целиком.
+    alternatives = read_csv_header(path)
+    step = max(1, chunk_elements // len(alternatives))
+    columns = range(1, len(alternatives) + 1)
+
+    with open(path, newline="", encoding="utf-8") as f:
+        f.readline()
+        while True:
+            lines = [it for it in itertools.islice(f, step) if it.strip()]
+            if not lines:
+                return
+
+            try:
+                block = np.loadtxt(lines, delimiter=",", quotechar='"', usecols=columns, ndmin=2)
+            except ValueError as e:
+                raise ValueError("Expected {0} payoffs in each row of {1}: {2}".format(len(alternatives), path, e))
+            yield [it[0] for it in csv.reader(lines)], block.T
+
+
+def evaluate_csv(path: str, alpha: float = .5, chunk_elements: int = CHUNK_ELEMENTS) -> dict:
+    # Потоковый расчет для таблиц, не помещающихся в память.
+    alternatives = read_csv_header(path)
+    acc = CriteriaAccumulator(len(alternatives))
+    for _, block in iter_csv_blocks(path, chunk_elements):
+        acc.add(block)
+
+    result = acc.result(alpha)
+    result["alternatives"] = alternatives
+    return result
+
+
+class UncertaintyProject(object):
+    # Матрица выигрышей альтернативы x сценарии без вероятностей сценариев.
+    # Может быть np.memmap: критерии считаются по блокам столбцов.
+    def __init__(self, name: str, alternatives: Iterable[str], scenarios: Iterable[str], payoffs=None,
+                 alpha: float = .5):
+        self.name = name
+        self.alternatives = list(alternatives)
+        self.scenarios = list(scenarios)
+
+        for items in (self.alternatives, self.scenarios):
+            for it in items:
+                if not isinstance(it, str):
+                    raise TypeError("Only str items allowed.")
+            if len(set(items)) != len(items):
+                raise ValueError("Duplicate items.")
+
+        shape = (len(self.alternatives), len(self.scenarios))
+        if payoffs is None:
+            self.payoffs = np.zeros(shape)
+        elif isinstance(payoffs, np.memmap):
+            self.payoffs = payoffs
+        else:
+            self.payoffs = np.array(payoffs, dtype=float)
+        if self.payoffs.shape != shape:
+            raise ValueError("Payoffs shape {0} does not match {1}.".format(self.payoffs.shape, shape))
+
+        self._alt_index = {it: i for i, it in enumerate(self.alternatives)}
+        self._scen_index = {it: i for i, it in enumerate(self.scenarios)}
+        self.set_alpha(alpha)
+        self.version = 0
+        self._acc = None
+        self._stamp = None
+
+    @classmethod
+    def from_csv(cls, name: str, path: str, out: str = None, chunk_elements: int = CHUNK_ELEMENTS,
+                 alpha: float = .5) -> "UncertaintyProject":
+        # С out матрица пишется блоками в файл .npy и отображается в память.
+        alternatives = read_csv_header(path)
+        if out is None:
+            scenarios, blocks = [], []
+            for names, block in iter_csv_blocks(path, chunk_elements):
+                scenarios += names
+                blocks.append(block)
+            payoffs = np.hstack(blocks) if blocks else np.zeros((len(alternatives), 0))
+            return cls(name, alternatives, scenarios, payoffs, alpha)
+
+        # Первый проход - число сценариев, второй - запись блоков.
+        count = _count_rows(path)
+        payoffs = np.lib.format.open_memmap(out, mode="w+", dtype=float, shape=(len(alternatives), count))
+        scenarios = []
+        for names, block in iter_csv_blocks(path, chunk_elements):
+            payoffs[:, len(scenarios):len(scenarios) + len(names)] = block
+            scenarios += names
+        payoffs.flush()
+        return cls(name, alternatives, scenarios, payoffs, alpha)
+
+    @property
+    def shape(self) -> tuple:
+        return self.payoffs.shape
+
+    def set_alpha(self, alpha: float) -> None:
+        if not 0 <= alpha <= 1:
+            raise ValueError("Alpha must be in range 0-1, got: {0}".format(alpha))
+        self.alpha = float(alpha)
+
+    def _get_position(self, alternative: str, scenario: str) -> tuple:
+        if alternative not in self._alt_index or scenario not in self._scen_index:
+            raise IndexError("No payoff: {0}, {1}".format(alternative, scenario))
+        return self._alt_index[alternative], self._scen_index[scenario]
+
+    def set(self, alternative: str, scenario: str, value) -> None:
+        value = float(value)
+        if not np.isfinite(value):
+            raise ValueError("Payoff must be finite, got: {0}".format(value))
+
+        self.payoffs[self._get_position(alternative, scenario)] = value
+        self.version += 1
+
+    def get(self, alternative: str, scenario: str) -> float:
+        return float(self.payoffs[self._get_position(alternative, scenario)])
+
+    def set_matrix(self, payoffs) -> None:
+        payoffs = np.array(payoffs, dtype=float)
+        if payoffs.shape != self.shape:
+            raise ValueError("Payoffs shape {0} does not match {1}.".format(payoffs.shape, self.shape))
+        self.payoffs = payoffs
+        self.version += 1
+
+    def add_alternative(self, alternative: str) -> None:
+        self._check_new(alternative, self._alt_index)
+        self.payoffs = np.pad(self.payoffs, ((0, 1), (0, 0)))
+        self._alt_index[alternative] = len(self.alternatives)
+        self.alternatives.append(alternative)
+        self.version += 1
+
+    def add_scenario(self, scenario: str) -> None:
+        self._check_new(scenario, self._scen_index)
+        self.payoffs = np.pad(self.payoffs, ((0, 0), (0, 1)))
+        self._scen_index[scenario] = len(self.scenarios)
+        self.scenarios.append(scenario)
+        self.version += 1
+
+    @staticmethod
+    def _check_new(item: str, items: dict) -> None:
+        if not isinstance(item, str):
+            raise TypeError("Only str items allowed.")
+        if item in items:
+            raise ValueError("Duplicate item: {0}".format(item))
+
+    def _accumulate(self, chunk_elements: int = CHUNK_ELEMENTS) -> CriteriaAccumulator:
+        # Версия запоминается до расчета: правка во время расчета в другом потоке не попадет в кэш.
+        version, payoffs = self.version, self.payoffs
+        if self._acc is None or self._stamp != version:
+            acc = CriteriaAccumulator(payoffs.shape[0])
+            for block in iter_blocks(payoffs, chunk_elements):
+                acc.add(block)
+            self._acc = acc
+            self._stamp = version
+        return self._acc
+
+    def evaluate(self, alpha: float = None, chunk_elements: int = CHUNK_ELEMENTS) -> dict:
+        # Одни и те же суммы по блокам дают все критерии; повторный расчет без правок берется из кэша.
+        return self._accumulate(chunk_elements).result(self.alpha if alpha is None else alpha)
+
+    def best(self, alpha: float = None) -> dict:
+        return {k: self.alternatives[best_index(k, v)] for k, v in self.evaluate(alpha).items()}
+
+    def hurwicz_sweep(self, alphas=None) -> tuple:
+        # Значения критерия Гурвица для сетки alpha: (alpha, значения alpha x альтернативы, лучшие альтернативы).
+        alphas = np.linspace(0, 1, 101) if alphas is None else np.asarray(alphas, dtype=float)
+        scores = self._accumulate().hurwicz(alphas)
+        return alphas, scores, scores.argmax(axis=1)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_acc"] = None
+        state["_stamp"] = None
+        if isinstance(self.payoffs, np.memmap):
+            state["payoffs"] = np.array(self.payoffs)
+        return state
+
+    def __str__(self):
+        return "{}: {} alternatives, {} scenarios".format(self.name, *self.shape)
+
+
+def _count_rows(path: str) -> int:
+    # Число сценариев без разбора чисел.
+    with open(path, newline="", encoding="utf-8") as f:
+        f.readline()
+        return sum(1 for it in f if it.strip())
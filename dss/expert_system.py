@@ -1,4 +1,15 @@
-import pyknow as pk
+from dss.core.knowledge import KnowledgeBase, Rule, parse_facts, parse_rules, read_facts, read_rules
 
-class E_System(pk.KnowledgeEngine):
-    def __init__(self):
+# Прежнее имя движка экспертной системы.
+E_System = KnowledgeBase
+
+# Окна загружаются по требованию: импорт модели не должен тянуть wx.
+_GUI_NAMES = ("KnowledgeWindow",)
+
+
+def __getattr__(name):
+    if name in _GUI_NAMES:
+        from dss.gui import knowledge
+        return getattr(knowledge, name)
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
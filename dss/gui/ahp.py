@@ -0,0 +1,614 @@
+import copy
+import operator
+
+import wx
+import wx.grid
+import wx.propgrid as pg
+
+from dss.core.ahp import AHPProject, ComparisonMatrix, CriterionNode, PriorityMethod
+from dss.gui.recompute import RecomputeScheduler
+
+
+def show_plot(values) -> None:
+    # matplotlib загружается только при первом построении графика.
+    from matplotlib import pyplot
+
+    pyplot.plot(list(values))
+    pyplot.show()
+
+
+class AHPDialog(wx.Dialog):
+
+    def __init__(self, parent):
+        wx.Dialog.__init__(self, parent, id=wx.ID_ANY, title=u"Создание проэкта", pos=wx.DefaultPosition,
+                           size=wx.Size(556, 384), style=wx.DEFAULT_DIALOG_STYLE)
+
+        self.SetSizeHints(wx.DefaultSize, wx.DefaultSize)
+
+        bSizer3 = wx.BoxSizer(wx.VERTICAL)
+
+        fgSizer1 = wx.FlexGridSizer(0, 4, 0, 0)
+        fgSizer1.SetFlexibleDirection(wx.BOTH)
+        fgSizer1.SetNonFlexibleGrowMode(wx.FLEX_GROWMODE_SPECIFIED)
+
+        fgSizer1.SetMinSize(wx.Size(-1, 210))
+        self.m_staticText2 = wx.StaticText(self, wx.ID_ANY, u"Имя", wx.DefaultPosition, wx.DefaultSize, 0)
+        self.m_staticText2.Wrap(-1)
+        fgSizer1.Add(self.m_staticText2, 0, wx.ALL, 5)
+
+        self.name_ed = wx.TextCtrl(self, wx.ID_ANY, u"untitled", wx.DefaultPosition, wx.Size(160, -1), 0)
+        fgSizer1.Add(self.name_ed, 0, wx.ALL, 5)
+
+        self.m_staticText3 = wx.StaticText(self, wx.ID_ANY, u"Цель", wx.DefaultPosition, wx.DefaultSize, 0)
+        self.m_staticText3.Wrap(-1)
+        fgSizer1.Add(self.m_staticText3, 0, wx.ALL, 5)
+
+        self.target_ed = wx.TextCtrl(self, wx.ID_ANY, wx.EmptyString, wx.DefaultPosition, wx.Size(160, -1), 0)
+        fgSizer1.Add(self.target_ed, 0, wx.ALL, 5)
+
+        self.m_staticText4 = wx.StaticText(self, wx.ID_ANY, u"Критерии", wx.DefaultPosition, wx.DefaultSize, 0)
+        self.m_staticText4.Wrap(-1)
+        fgSizer1.Add(self.m_staticText4, 0, wx.ALL, 5)
+
+        self.crit_grid = wx.grid.Grid(self, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize, 0)
+
+        # Grid
+        self.crit_grid.CreateGrid(3, 1)
+        self.crit_grid.EnableEditing(True)
+        self.crit_grid.EnableGridLines(True)
+        self.crit_grid.EnableDragGridSize(False)
+        self.crit_grid.SetMargins(0, 0)
+
+        # Columns
+        self.crit_grid.SetColSize(0, 129)
+        self.crit_grid.EnableDragColMove(False)
+        self.crit_grid.EnableDragColSize(True)
+        self.crit_grid.SetColLabelSize(30)
+        self.crit_grid.SetColLabelValue(0, u"Name")
+        self.crit_grid.SetColLabelAlignment(wx.ALIGN_CENTRE, wx.ALIGN_CENTRE)
+
+        # Rows
+        self.crit_grid.EnableDragRowSize(True)
+        self.crit_grid.SetRowLabelSize(30)
+        self.crit_grid.SetRowLabelAlignment(wx.ALIGN_CENTRE, wx.ALIGN_CENTRE)
+
+        # Label Appearance
+
+        # Cell Defaults
+        self.crit_grid.SetDefaultCellAlignment(wx.ALIGN_LEFT, wx.ALIGN_TOP)
+        self.crit_grid.SetMinSize(wx.Size(-1, 200))
+
+        fgSizer1.Add(self.crit_grid, 0, wx.ALL, 5)
+
+        self.m_staticText5 = wx.StaticText(self, wx.ID_ANY, u"Альтернативы", wx.DefaultPosition, wx.DefaultSize, 0)
+        self.m_staticText5.Wrap(-1)
+        fgSizer1.Add(self.m_staticText5, 0, wx.ALL, 5)
+
+        self.alt_grid = wx.grid.Grid(self, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize, 0)
+
+        # Grid
+        self.alt_grid.CreateGrid(3, 1)
+        self.alt_grid.EnableEditing(True)
+        self.alt_grid.EnableGridLines(True)
+        self.alt_grid.EnableDragGridSize(False)
+        self.alt_grid.SetMargins(0, 0)
+
+        # Columns
+        self.alt_grid.SetColSize(0, 129)
+        self.alt_grid.EnableDragColMove(False)
+        self.alt_grid.EnableDragColSize(True)
+        self.alt_grid.SetColLabelSize(30)
+        self.alt_grid.SetColLabelValue(0, u"Name")
+        self.alt_grid.SetColLabelAlignment(wx.ALIGN_CENTRE, wx.ALIGN_CENTRE)
+
+        # Rows
+        self.alt_grid.EnableDragRowSize(True)
+        self.alt_grid.SetRowLabelSize(30)
+        self.alt_grid.SetRowLabelAlignment(wx.ALIGN_CENTRE, wx.ALIGN_CENTRE)
+
+        # Label Appearance
+
+        # Cell Defaults
+        self.alt_grid.SetDefaultCellAlignment(wx.ALIGN_LEFT, wx.ALIGN_TOP)
+        self.alt_grid.SetMinSize(wx.Size(-1, 200))
+
+        fgSizer1.Add(self.alt_grid, 0, wx.ALL, 5)
+
+        fgSizer1.AddSpacer(0)
+
+        fgSizer3 = wx.FlexGridSizer(0, 2, 0, 0)
+        fgSizer3.SetFlexibleDirection(wx.BOTH)
+        fgSizer3.SetNonFlexibleGrowMode(wx.FLEX_GROWMODE_SPECIFIED)
+
+        self.crit_add = wx.Button(self, wx.ID_ANY, u"+", wx.DefaultPosition, wx.Size(70, -1), 0)
+        fgSizer3.Add(self.crit_add, 0, wx.ALL, 5)
+
+        self.crit_del_btn = wx.Button(self, wx.ID_ANY, u"-", wx.DefaultPosition, wx.Size(70, -1), 0)
+        fgSizer3.Add(self.crit_del_btn, 0, wx.ALL, 5)
+
+        fgSizer1.Add(fgSizer3, 1, wx.EXPAND, 5)
+
+        fgSizer1.AddSpacer(0)
+
+        fgSizer4 = wx.FlexGridSizer(0, 2, 0, 0)
+        fgSizer4.SetFlexibleDirection(wx.BOTH)
+        fgSizer4.SetNonFlexibleGrowMode(wx.FLEX_GROWMODE_SPECIFIED)
+
+        self.add_alt_btn = wx.Button(self, wx.ID_ANY, u"+", wx.DefaultPosition, wx.Size(70, -1), 0)
+        fgSizer4.Add(self.add_alt_btn, 0, wx.ALL, 5)
+
+        self.del_alt_btn = wx.Button(self, wx.ID_ANY, u"-", wx.DefaultPosition, wx.Size(70, -1), 0)
+        fgSizer4.Add(self.del_alt_btn, 0, wx.ALL, 5)
+
+        fgSizer1.Add(fgSizer4, 1, wx.EXPAND, 5)
+
+        bSizer3.Add(fgSizer1, 1, wx.EXPAND, 5)
+
+        m_sdbSizer4 = wx.StdDialogButtonSizer()
+        self.m_sdbSizer4OK = wx.Button(self, wx.ID_OK)
+        m_sdbSizer4.AddButton(self.m_sdbSizer4OK)
+        self.m_sdbSizer4Cancel = wx.Button(self, wx.ID_CANCEL)
+        m_sdbSizer4.AddButton(self.m_sdbSizer4Cancel)
+        m_sdbSizer4.Realize()
+
+        bSizer3.Add(m_sdbSizer4, 1, wx.EXPAND, 5)
+
+        self.SetSizer(bSizer3)
+        self.Layout()
+
+        self.Centre(wx.BOTH)
+
+        # Connect Events
+        self.crit_add.Bind(wx.EVT_BUTTON, self.add_crit)
+        self.crit_del_btn.Bind(wx.EVT_BUTTON, self.del_crit)
+        self.add_alt_btn.Bind(wx.EVT_BUTTON, self.add_alt)
+        self.del_alt_btn.Bind(wx.EVT_BUTTON, self.del_alt)
+        self.m_sdbSizer4OK.Bind(wx.EVT_BUTTON, self.submit)
+
+    def add_crit(self, event):
+        self.crit_grid.InsertRows(pos=self.crit_grid.GetNumberRows())
+
+    def del_crit(self, event):
+        if self.crit_grid.GetNumberRows() > 3:
+            if self.crit_grid.GetSelectedRows():
+                self.crit_grid.DeleteRows(self.crit_grid.GetSelectedRows()[0])
+            else:
+                self.crit_grid.DeleteRows(pos=self.crit_grid.GetNumberRows() - 1)
+
+    def add_alt(self, event):
+        self.alt_grid.InsertRows(pos=self.alt_grid.GetNumberRows())
+
+    def del_alt(self, event):
+        if self.alt_grid.GetNumberRows() > 3:
+            if self.alt_grid.GetSelectedRows():
+                self.alt_grid.DeleteRows(self.alt_grid.GetSelectedRows()[0])
+            else:
+                self.alt_grid.DeleteRows(pos=self.alt_grid.GetNumberRows() - 1)
+
+    def submit(self, event):
+        if self._check_fields():
+            self.proj_name = self.name_ed.GetValue()[:15]
+            self.target = self.target_ed.GetValue()[:15]
+            self.criteria = []
+            self.alternatives = []
+
+            self._read_criteria()
+
+            self._read_alternatives()
+
+            self.EndModal(wx.ID_OK)
+
+    def _read_alternatives(self):
+        for i in range(0, self.alt_grid.GetNumberRows()):
+            val = self.alt_grid.GetCellValue(i, 0)
+            if len(val) == 0:
+                self.alternatives.append("Альтернатива {}".format(i))
+            else:
+                self.alternatives.append(val[:15])
+
+    def _read_criteria(self):
+        for i in range(0, self.crit_grid.GetNumberRows()):
+            val = self.crit_grid.GetCellValue(i, 0)
+            if len(val) == 0:
+                self.criteria.append("Критерий {}".format(i))
+            else:
+                self.criteria.append(val[:15])
+
+    def _check_fields(self):
+        if self.name_ed.IsEmpty():
+            wx.MessageBox("Поле 'имя' не может быть пустым.")
+            self.name_ed.SetFocus()
+            return False
+        elif self.target_ed.IsEmpty():
+            wx.MessageBox("Необходимо указать цель.")
+            self.target_ed.SetFocus()
+            return False
+
+        return True
+
+
+class AHPWindow(wx.Frame):
+
+    def __init__(self, parent, proj):
+        self.current_matrix = None
+        self.current_node = None
+        self.model: AHPProject = proj
+        # Виды матриц по id матрицы; создаются при первом выборе узла в дереве структуры.
+        self.views = {}
+        self.scheduler = RecomputeScheduler()
+        self._props_stamp = None
+
+        wx.Frame.__init__(self, parent, id=wx.ID_ANY, title="МАИ проэкт", pos=wx.DefaultPosition,
+                          size=wx.Size(1285, 737), style=wx.DEFAULT_FRAME_STYLE ^ wx.RESIZE_BORDER | wx.TAB_TRAVERSAL)
+
+        self.SetSizeHints(wx.DefaultSize, wx.DefaultSize)
+
+        self.main_menu = wx.MenuBar(0)
+        self.edit_menu = wx.Menu()
+        self.change_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Изменить", wx.EmptyString, wx.ITEM_NORMAL)
+        self.edit_menu.Append(self.change_mi)
+
+        self.update_ui = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Обновить", wx.EmptyString, wx.ITEM_NORMAL)
+        self.edit_menu.Append(self.update_ui)
+
+        self.calc_memu = wx.Menu()
+        self.calc_mi = wx.MenuItem(self.calc_memu, wx.ID_ANY, "Вычислить")
+
+        self.gr_menu = wx.MenuItem(self.calc_memu, wx.ID_ANY, "Показать график")
+        self.eigen_mi = wx.MenuItem(self.calc_memu, wx.ID_ANY, "Метод собственного вектора", wx.EmptyString,
+                                    wx.ITEM_CHECK)
+        self.calc_memu.Append(self.calc_mi)
+        self.calc_memu.Append(self.gr_menu)
+        self.calc_memu.Append(self.eigen_mi)
+        self.repair_mi = wx.MenuItem(self.calc_memu, wx.ID_ANY, "Исправить согласованность")
+        self.calc_memu.Append(self.repair_mi)
+        self.main_menu.Append(self.edit_menu, "Правка")
+        self.main_menu.Append(self.calc_memu, "Расчеты")
+
+        self.SetMenuBar(self.main_menu)
+
+        bSizer2 = wx.BoxSizer(wx.HORIZONTAL)
+
+        self.m_notebook1 = wx.Notebook(self, wx.ID_ANY, wx.DefaultPosition, wx.Size(-1, -1), 0)
+        self.m_notebook1.SetMaxSize(wx.Size(300, -1))
+
+        self.m_panel1 = wx.Panel(self.m_notebook1, wx.ID_ANY, wx.DefaultPosition, wx.Size(-1, -1), wx.TAB_TRAVERSAL)
+        bSizer5 = wx.BoxSizer(wx.VERTICAL)
+
+        self.struct_view = wx.TreeCtrl(self.m_panel1, wx.ID_ANY, wx.DefaultPosition, wx.Size(1000, 1000),
+                                       wx.TR_DEFAULT_STYLE)
+        bSizer5.Add(self.struct_view, 0, wx.ALL, 0)
+
+        self.m_panel1.SetSizer(bSizer5)
+        self.m_panel1.Layout()
+        bSizer5.Fit(self.m_panel1)
+        self.m_notebook1.AddPage(self.m_panel1, u"Структура", False)
+
+        bSizer2.Add(self.m_notebook1, 1, wx.EXPAND | wx.ALL, 0)
+
+        self.m_notebook2 = wx.Notebook(self, wx.ID_ANY, wx.DefaultPosition, wx.Size(675, -1), 0)
+        self.matrix_edit = wx.ScrolledWindow(self.m_notebook2, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize,
+                                             wx.HSCROLL | wx.VSCROLL | wx.ALWAYS_SHOW_SB)
+        self.matrix_edit.SetScrollRate(5, 5)
+        self.matrix_sizer = wx.BoxSizer(wx.VERTICAL)
+        self.matrix_title = wx.StaticText(self.matrix_edit, wx.ID_ANY, wx.EmptyString)
+        self.matrix_title.SetFont(wx.Font(wx.FontInfo(15).Bold().Italic()))
+        self.matrix_sizer.Add(self.matrix_title, 0, wx.ALL, 5)
+        self.matrix_edit.SetSizer(self.matrix_sizer)
+        self.m_notebook2.AddPage(self.matrix_edit, u"Изменение матриц", True)
+        self.result_win = wx.ScrolledWindow(self.m_notebook2, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize,
+                                            wx.HSCROLL | wx.VSCROLL)
+        self.result_win.SetScrollRate(5, 5)
+        self.m_notebook2.AddPage(self.result_win, u"отчет", False)
+
+        bSizer2.Add(self.m_notebook2, 1, wx.EXPAND | wx.ALL, 0)
+
+        self.m_notebook3 = wx.Notebook(self, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize, 0)
+        self.m_notebook3.SetMaxSize(wx.Size(300, -1))
+
+        self.m_scrolledWindow7 = wx.ScrolledWindow(self.m_notebook3, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize,
+                                                   wx.HSCROLL | wx.VSCROLL)
+        self.m_scrolledWindow7.SetScrollRate(5, 5)
+        bSizer4 = wx.BoxSizer(wx.VERTICAL)
+
+        self.props = pg.PropertyGrid(self.m_scrolledWindow7, wx.ID_ANY, wx.DefaultPosition, wx.Size(292, 647),
+                                     wx.propgrid.PG_DEFAULT_STYLE | wx.propgrid.PG_TOOLTIPS)
+        bSizer4.Add(self.props, 0, wx.ALL, 0)
+
+        self.m_scrolledWindow7.SetSizer(bSizer4)
+        self.m_scrolledWindow7.Layout()
+        bSizer4.Fit(self.m_scrolledWindow7)
+        self.m_notebook3.AddPage(self.m_scrolledWindow7, u"Свойства", False)
+
+        bSizer2.Add(self.m_notebook3, 1, wx.EXPAND | wx.ALL, 0)
+
+        self.SetSizer(bSizer2)
+        self.Layout()
+
+        self.Centre(wx.BOTH)
+
+        self.Bind(wx.EVT_MENU, self.calculate, id=self.calc_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.update, id=self.update_ui.GetId())
+        self.Bind(wx.EVT_MENU, self.show_chart, id=self.gr_menu.GetId())
+        self.Bind(wx.EVT_MENU, self.change_method, id=self.eigen_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.suggest_repairs, id=self.repair_mi.GetId())
+        self.struct_view.Bind(wx.EVT_TREE_SEL_CHANGED, self.select_node)
+
+        self.Bind(wx.EVT_CLOSE, self.accept_close)
+
+        self.eigen_mi.Check(self.model.criteria_comparison.method is PriorityMethod.EIGENVECTOR)
+
+        self.update(None)
+
+    def Destroy(self):
+        self.scheduler.close()
+        return super().Destroy()
+
+    def calculate(self, event):
+        # Расчет идет по копии модели, чтобы правки во время расчета не мешали рабочему потоку.
+        model = copy.deepcopy(self.model)
+        self.scheduler.schedule("result", model.get_global_vector, self._show_result,
+                                lambda e: wx.MessageBox("Ошибка: {}.".format(e)))
+
+    def _show_result(self, gv: dict):
+        m_sizer = wx.BoxSizer(wx.VERTICAL)
+
+        glob_grid = wx.grid.Grid(self.result_win)
+        glob_grid.SetColLabelSize(0)
+        glob_grid.SetRowLabelSize(150)
+        glob_grid.CreateGrid(len(gv), 1)
+
+        max_ = max(gv.items(), key=operator.itemgetter(1))[0]
+
+        for i, alt in enumerate(gv):
+            glob_grid.SetRowLabelValue(i, alt)
+            glob_grid.SetCellValue(i, 0, str(gv[alt]))
+            glob_grid.SetReadOnly(i, 0)
+            if alt == max_:
+                glob_grid.SetCellBackgroundColour(i, 0, wx.Colour("red"))
+
+        m_sizer.Add(glob_grid)
+
+        c_btn = wx.Button(self.result_win, wx.ID_ANY, "График")
+        self.result_win.Bind(wx.EVT_BUTTON, lambda e: show_plot(gv.values()), c_btn)
+
+        label = wx.StaticText(self.result_win, wx.ID_ANY, "Лучшая альтернатива: {}".format(max_))
+        label.SetFont(wx.Font(wx.FontInfo(16).Bold().Italic()))
+
+        m_sizer.Add(label)
+        m_sizer.Add(c_btn)
+
+        if self.result_win.GetSizer():
+            self.result_win.GetSizer().Clear()
+
+        self.result_win.SetSizer(m_sizer)
+        self.result_win.FitInside()
+
+    def change_method(self, event):
+        if self.eigen_mi.IsChecked():
+            self.model.set_priority_method(PriorityMethod.EIGENVECTOR)
+        else:
+            self.model.set_priority_method(PriorityMethod.GEOMETRIC_MEAN)
+
+        if self.current_matrix is not None:
+            self.current_matrix.focus_gain(None)
+
+    def suggest_repairs(self, event):
+        if self.current_matrix is None:
+            return
+
+        edits = self.current_matrix.matrix.suggest_repairs()
+        if not edits:
+            wx.MessageBox("Исправления не требуются.")
+            return
+
+        text = "\n".join("{} / {}: {}".format(*it) for it in edits)
+        if wx.MessageDialog(self, "Предлагаемые изменения:\n{}\n\nПрименить?".format(text),
+                            style=wx.YES_NO).ShowModal() == wx.ID_YES:
+            for it in edits:
+                self.current_matrix.matrix.set(*it)
+            self.current_matrix.update()
+            self.current_matrix.focus_gain(None)
+            self.GetParent().proj_saved = False
+
+    def show_chart(self, event):
+        if self.current_matrix is not None:
+            show_plot(self.current_matrix.matrix.get_normalized_vector().values())
+
+    def edit_alternatives(self, event):
+        event.Skip()
+
+    def update(self, event):
+        if self.model is not None:
+            self._update_structure()
+            self._update_views()
+
+    def _update_views(self):
+        # Удаляются только виды матриц, которых больше нет в модели; остальные сверяют размер с матрицей.
+        nodes = self.model.get_nodes()
+        matrices = {id(node.matrix) for node in nodes}
+
+        for key in list(self.views):
+            if key in matrices:
+                self.views[key].update()
+                continue
+
+            view = self.views.pop(key)
+            if view is self.current_matrix:
+                self.current_matrix = None
+            view.Destroy()
+
+        if not any(node is self.current_node for node in nodes):
+            self.current_node = self.model.root
+        self.show_node(self.current_node)
+
+    def select_node(self, event):
+        if event.GetItem().IsOk():
+            node = self.struct_view.GetItemData(event.GetItem())
+            if isinstance(node, CriterionNode):
+                self.show_node(node)
+
+    def show_node(self, node: CriterionNode):
+        view = self.views.get(id(node.matrix))
+        if view is None:
+            view = CMatrixView(node.matrix, self.matrix_edit)
+            self.views[id(node.matrix)] = view
+            self.matrix_sizer.Add(view, 1, wx.ALL, 5)
+
+        for it in self.views.values():
+            it.Show(it is view)
+
+        if node is self.model.root:
+            self.matrix_title.SetLabel("Критерии")
+        elif node.is_leaf():
+            self.matrix_title.SetLabel("Сравнения альтернатив по критерию: {}".format(node.name))
+        else:
+            self.matrix_title.SetLabel("Подкритерии: {}".format(node.name))
+
+        self.current_node = node
+        self.matrix_edit.Layout()
+        self.matrix_edit.FitInside()
+        view.focus_gain(None)
+
+    def _update_structure(self):
+        self.struct_view.DeleteAllItems()
+        root: wx.TreeItemId = self.struct_view.AddRoot(self.model.name)
+        self.struct_view.AppendItem(root, self.model.target)
+
+        crit = self.struct_view.AppendItem(root, "Критерии")
+        self.struct_view.SetItemData(crit, self.model.root)
+        alt = self.struct_view.AppendItem(root, "Альтернативы")
+
+        self._append_criteria(crit, self.model.root)
+
+        for it in self.model.alternatives:
+            self.struct_view.AppendItem(alt, it)
+
+    def _append_criteria(self, parent: wx.TreeItemId, node: CriterionNode):
+        for it in node.matrix.items:
+            item = self.struct_view.AppendItem(parent, it, data=node.children[it])
+            if not node.children[it].is_leaf():
+                self._append_criteria(item, node.children[it])
+
+    def accept_close(self, event):
+        if self.GetParent():
+            self.GetParent().close(None)
+        else:
+            self.Destroy()
+
+    def show_props(self, matrix: ComparisonMatrix):
+        # Выбор ячеек без правок не запускает пересчет.
+        stamp = (id(matrix), matrix.version)
+        if stamp == self._props_stamp:
+            return
+        self._props_stamp = stamp
+
+        snapshot = matrix.copy()
+        self.scheduler.schedule("props", lambda: (snapshot.get_normalized_vector(),
+                                                  {"": snapshot.get_coherence_relation()}),
+                                lambda props: self.update_props(("Нормализованный вектор", "Согласованность"), props))
+
+    def update_props(self, names: tuple, props: tuple):
+        if len(names) != len(props): raise ValueError("Количество имен групп должно совпадать с количеством групп")
+
+        self.props.Clear()
+
+        for i, n in enumerate(names):
+            self.props.Append(wx.propgrid.PropertyCategory(n))
+            for p in props[i]:
+                self.props.Append(wx.propgrid.FloatProperty(p, value=props[i][p]))
+
+
+class ComparisonTable(wx.grid.GridTableBase):
+    # Виртуальная таблица: значения берутся из матрицы только для видимых ячеек.
+    def __init__(self, matrix: ComparisonMatrix):
+        super().__init__()
+        self.matrix = matrix
+        self.size = matrix.size
+        self.error = None
+
+        self.diagonal = wx.grid.GridCellAttr()
+        self.diagonal.SetReadOnly()
+        self.diagonal.SetBackgroundColour(wx.Colour("yellow"))
+
+    def GetNumberRows(self):
+        return self.matrix.size
+
+    def GetNumberCols(self):
+        return self.matrix.size
+
+    def GetRowLabelValue(self, row):
+        return self.matrix.items[row]
+
+    def GetColLabelValue(self, col):
+        return self.matrix.items[col]
+
+    def IsEmptyCell(self, row, col):
+        return False
+
+    def GetValue(self, row, col):
+        if row == col:
+            return "1"
+        return self.matrix.get(self.matrix.items[row], self.matrix.items[col])
+
+    def SetValue(self, row, col, value):
+        try:
+            self.matrix.set(self.matrix.items[row], self.matrix.items[col], value)
+            self.error = None
+        except (ValueError, ZeroDivisionError) as e:
+            # Ячейка останется со старым значением: оно снова читается из матрицы.
+            self.error = e
+
+    def GetAttr(self, row, col, kind):
+        if row == col:
+            self.diagonal.IncRef()
+            return self.diagonal
+        return None
+
+    def sync_size(self):
+        # Сообщает таблице об изменении числа элементов после add/remove.
+        grid = self.GetView()
+        if self.matrix.size > self.size:
+            for kind in (wx.grid.GRIDTABLE_NOTIFY_ROWS_APPENDED, wx.grid.GRIDTABLE_NOTIFY_COLS_APPENDED):
+                grid.ProcessTableMessage(wx.grid.GridTableMessage(self, kind, self.matrix.size - self.size))
+        elif self.matrix.size < self.size:
+            for kind in (wx.grid.GRIDTABLE_NOTIFY_ROWS_DELETED, wx.grid.GRIDTABLE_NOTIFY_COLS_DELETED):
+                grid.ProcessTableMessage(wx.grid.GridTableMessage(self, kind, self.matrix.size,
+                                                                  self.size - self.matrix.size))
+        self.size = self.matrix.size
+
+
+class CMatrixView(wx.grid.Grid):
+    def __init__(self, matrix: ComparisonMatrix, *args, **kw):
+        super().__init__(*args, **kw)
+        self.matrix = matrix
+        self.table = ComparisonTable(matrix)
+        self.GetParent().Bind(wx.grid.EVT_GRID_CELL_CHANGED, self.cell_changed, self)
+        self.GetParent().Bind(wx.grid.EVT_GRID_SELECT_CELL, self.focus_gain, self)
+        self.SetTable(self.table, True)
+        self.SetRowLabelSize(155)
+        self.SetDefaultColSize(155)
+
+    def update(self):
+        self.table.sync_size()
+        self.ForceRefresh()
+
+    def refresh_cells(self, cells):
+        # Перерисовываются только измененные ячейки, а не вся сетка.
+        for i, j in cells:
+            self.GetGridWindow().RefreshRect(self.BlockToDeviceRect(wx.grid.GridCellCoords(i, j),
+                                                                    wx.grid.GridCellCoords(i, j)))
+
+    def focus_gain(self, event):
+        if self.GetGrandParent().GetParent().current_matrix is not self:
+            self.GetGrandParent().GetParent().current_matrix = self
+
+        self.GetGrandParent().GetParent().show_props(self.matrix)
+
+    def cell_changed(self, event: wx.grid.GridEvent):
+        i, j = event.GetRow(), event.GetCol()
+        # Значение уже передано в матрицу через ComparisonTable.SetValue; обратная ячейка меняется вместе с ней.
+        self.refresh_cells(((i, j), (j, i)))
+        if self.table.error is None:
+            self.focus_gain(None)
+            self.GetGrandParent().GetParent().GetParent().proj_saved = False
@@ -0,0 +1,200 @@
+import wx
+import wx.grid
+
+from dss.core.knowledge import KnowledgeBase, Rule, read_facts, read_rules
+from dss.gui.markov import ResultTable
+from dss.gui.recompute import RecomputeScheduler
+
+RULE_FILES = "Правила (*.txt;*.rules)|*.txt;*.rules|Все файлы|*"
+FACT_FILES = "Факты (*.txt;*.csv)|*.txt;*.csv|Все файлы|*"
+
+
+class KnowledgeWindow(wx.Frame):
+
+    def __init__(self, parent, proj: KnowledgeBase):
+        self.model = proj
+        self.facts = []
+
+        wx.Frame.__init__(self, parent, id=wx.ID_ANY, title="База знаний", pos=wx.DefaultPosition,
+                          size=wx.Size(1000, 700), style=wx.DEFAULT_FRAME_STYLE | wx.TAB_TRAVERSAL)
+
+        self.SetSizeHints(wx.DefaultSize, wx.DefaultSize)
+
+        self.main_menu = wx.MenuBar(0)
+        self.edit_menu = wx.Menu()
+        self.load_rules_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Загрузить правила...")
+        self.edit_menu.Append(self.load_rules_mi)
+        self.load_facts_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Загрузить факты...")
+        self.edit_menu.Append(self.load_facts_mi)
+        self.edit_menu.AppendSeparator()
+        self.add_rule_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Добавить правило")
+        self.edit_menu.Append(self.add_rule_mi)
+        self.add_fact_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Добавить факт")
+        self.edit_menu.Append(self.add_fact_mi)
+        self.retract_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Удалить факт")
+        self.edit_menu.Append(self.retract_mi)
+
+        self.calc_menu = wx.Menu()
+        self.query_mi = wx.MenuItem(self.calc_menu, wx.ID_ANY, "Запрос")
+        self.calc_menu.Append(self.query_mi)
+        self.explain_mi = wx.MenuItem(self.calc_menu, wx.ID_ANY, "Объяснение вывода")
+        self.calc_menu.Append(self.explain_mi)
+
+        self.main_menu.Append(self.edit_menu, "Правка")
+        self.main_menu.Append(self.calc_menu, "Расчеты")
+        self.SetMenuBar(self.main_menu)
+
+        bSizer2 = wx.BoxSizer(wx.VERTICAL)
+
+        self.nb = wx.Notebook(self, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize, 0)
+        self.facts_grid = wx.grid.Grid(self.nb, wx.ID_ANY)
+        self.facts_grid.SetRowLabelSize(80)
+        self.facts_grid.SetDefaultColSize(120)
+        self.nb.AddPage(self.facts_grid, u"Факты", True)
+
+        self.rules_grid = wx.grid.Grid(self.nb, wx.ID_ANY)
+        self.rules_grid.SetRowLabelSize(120)
+        self.rules_grid.SetDefaultColSize(800)
+        self.nb.AddPage(self.rules_grid, u"Правила", False)
+
+        self.query_grid = wx.grid.Grid(self.nb, wx.ID_ANY)
+        self.query_grid.SetRowLabelSize(80)
+        self.query_grid.SetDefaultColSize(120)
+        self.nb.AddPage(self.query_grid, u"Запрос", False)
+
+        bSizer2.Add(self.nb, 1, wx.EXPAND | wx.ALL, 0)
+
+        self.status = wx.StaticText(self, wx.ID_ANY, str(self.model))
+        bSizer2.Add(self.status, 0, wx.ALL, 5)
+
+        self.SetSizer(bSizer2)
+        self.Layout()
+        self.Centre(wx.BOTH)
+
+        self.scheduler = RecomputeScheduler()
+
+        self.Bind(wx.EVT_MENU, self.load_rules, id=self.load_rules_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.load_facts, id=self.load_facts_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.add_rule, id=self.add_rule_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.add_fact, id=self.add_fact_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.retract_fact, id=self.retract_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.query, id=self.query_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.explain, id=self.explain_mi.GetId())
+        self.Bind(wx.EVT_CLOSE, self.accept_close)
+
+        self.update()
+
+    def Destroy(self):
+        self.scheduler.close()
+        return super().Destroy()
+
+    def _changed(self):
+        self.update()
+        if self.GetParent():
+            self.GetParent().proj_saved = False
+
+    def update(self):
+        # Таблицы строятся по снимку: сеть меняется только в потоке интерфейса.
+        self.facts = self.model.get_facts()
+        width = max((len(it) for it in self.facts), default=0)
+        columns = [("", [it[i] if i < len(it) else "" for it in self.facts]) for i in range(width)]
+        columns.append(("Вид", ["задан" if it in self.model.explicit else "выведен" for it in self.facts]))
+        self.facts_table = ResultTable([str(i + 1) for i in range(len(self.facts))], columns)
+        self.facts_grid.SetTable(self.facts_table, True)
+        self.facts_grid.ForceRefresh()
+
+        self.rules_table = ResultTable([it.name for it in self.model.rules],
+                                       [("Правило", [str(it) for it in self.model.rules])])
+        self.rules_grid.SetTable(self.rules_table, True)
+        self.rules_grid.ForceRefresh()
+
+        self.status.SetLabel(str(self.model))
+
+    def _apply(self, func, arg):
+        try:
+            func(arg)
+        except (TypeError, ValueError) as e:
+            wx.MessageBox("Ошибка: {}.".format(e))
+        self._changed()
+
+    def _load(self, title: str, wildcard: str, read, apply):
+        # Файл разбирается в рабочем потоке, а сеть меняется в потоке интерфейса.
+        dlg = wx.FileDialog(self, title, wildcard=wildcard, style=wx.FD_OPEN)
+        if dlg.ShowModal() == wx.ID_OK and dlg.GetPath():
+            path = dlg.GetPath()
+            self.status.SetLabel("Загрузка...")
+            self.scheduler.schedule("load", lambda: read(path), lambda items: self._apply(apply, items),
+                                    self._error)
+
+    def _error(self, e):
+        self.status.SetLabel(str(self.model))
+        wx.MessageBox("Ошибка: {}.".format(e))
+
+    def load_rules(self, event):
+        self._load("Правила", RULE_FILES, read_rules, self.model.add_rules)
+
+    def load_facts(self, event):
+        self._load("Факты", FACT_FILES, read_facts, self.model.assert_facts)
+
+    def add_rule(self, event):
+        line = wx.GetTextFromUser("rule <имя>: <условия через &> => <выводы через &>", "Добавить правило",
+                                  parent=self)
+        if line:
+            try:
+                rule = Rule.parse(line)
+            except ValueError as e:
+                wx.MessageBox("Ошибка: {}.".format(e))
+                return
+            self._apply(self.model.add_rule, rule)
+
+    def add_fact(self, event):
+        line = wx.GetTextFromUser("Слова факта через пробел", "Добавить факт", parent=self)
+        if line:
+            self._apply(self.model.assert_fact, line)
+
+    def _selected_fact(self):
+        row = self.facts_grid.GetGridCursorRow()
+        if 0 <= row < len(self.facts):
+            return self.facts[row]
+        wx.MessageBox("Выберите факт в таблице.")
+        return None
+
+    def retract_fact(self, event):
+        fact = self._selected_fact()
+        if fact is None:
+            return
+        try:
+            self.model.retract_fact(fact)
+        except IndexError:
+            wx.MessageBox("Выведенный факт удаляется вместе с фактами, из которых он выведен.")
+            return
+        self._changed()
+
+    def query(self, event):
+        pattern = wx.GetTextFromUser("Образец, например: диагноз ?p ?d", "Запрос", parent=self)
+        if not pattern:
+            return
+        result = self.model.query(pattern)
+        names = sorted({k for it in result for k in it})
+        self.query_table = ResultTable([str(i + 1) for i in range(len(result))],
+                                       [(k, [it[k] for it in result]) for k in names])
+        self.query_grid.SetTable(self.query_table, True)
+        self.query_grid.ForceRefresh()
+        self.nb.SetSelection(self.nb.FindPage(self.query_grid))
+        self.status.SetLabel("Найдено: {}.".format(len(result)))
+
+    def explain(self, event):
+        fact = self._selected_fact()
+        if fact is None:
+            return
+        lines = ["{}: {}".format(name, "; ".join(" ".join(it) for it in token))
+                 for name, token in self.model.explain(fact)]
+        if fact in self.model.explicit:
+            lines.insert(0, "задан явно")
+        wx.MessageBox("\n".join(lines), " ".join(fact))
+
+    def accept_close(self, event):
+        if self.GetParent():
+            self.GetParent().close(None)
+        else:
+            self.Destroy()
@@ -0,0 +1,717 @@
+import copy
+
+import numpy as np
+import wx
+import wx.grid
+
+from dss.core.markov import MarkovProject
+from dss.core.mdp import MarkovDecisionProject
+from dss.gui.ahp import show_plot
+from dss.gui.recompute import RecomputeScheduler
+
+
+class MarkovDialog(wx.Dialog):
+
+    def __init__(self, parent, with_actions: bool = False):
+        wx.Dialog.__init__(self, parent, id=wx.ID_ANY, title=u"Создание проэкта", pos=wx.DefaultPosition,
+                           size=wx.Size(330, 600 if with_actions else 384), style=wx.DEFAULT_DIALOG_STYLE)
+
+        self.SetSizeHints(wx.DefaultSize, wx.DefaultSize)
+        self.csv_path = None
+        self.with_actions = with_actions
+
+        bSizer3 = wx.BoxSizer(wx.VERTICAL)
+
+        fgSizer1 = wx.FlexGridSizer(0, 2, 0, 0)
+        fgSizer1.SetFlexibleDirection(wx.BOTH)
+        fgSizer1.SetNonFlexibleGrowMode(wx.FLEX_GROWMODE_SPECIFIED)
+
+        self.m_staticText2 = wx.StaticText(self, wx.ID_ANY, u"Имя", wx.DefaultPosition, wx.DefaultSize, 0)
+        self.m_staticText2.Wrap(-1)
+        fgSizer1.Add(self.m_staticText2, 0, wx.ALL, 5)
+
+        self.name_ed = wx.TextCtrl(self, wx.ID_ANY, u"untitled", wx.DefaultPosition, wx.Size(160, -1), 0)
+        fgSizer1.Add(self.name_ed, 0, wx.ALL, 5)
+
+        self.m_staticText4 = wx.StaticText(self, wx.ID_ANY, u"Состояния", wx.DefaultPosition, wx.DefaultSize, 0)
+        self.m_staticText4.Wrap(-1)
+        fgSizer1.Add(self.m_staticText4, 0, wx.ALL, 5)
+
+        self.states_grid = wx.grid.Grid(self, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize, 0)
+        self.states_grid.CreateGrid(3, 1)
+        self.states_grid.SetColSize(0, 129)
+        self.states_grid.SetColLabelValue(0, u"Name")
+        self.states_grid.SetRowLabelSize(30)
+        self.states_grid.SetMinSize(wx.Size(-1, 200))
+        fgSizer1.Add(self.states_grid, 0, wx.ALL, 5)
+
+        fgSizer1.AddSpacer(0)
+
+        fgSizer3 = wx.FlexGridSizer(0, 2, 0, 0)
+        self.add_btn = wx.Button(self, wx.ID_ANY, u"+", wx.DefaultPosition, wx.Size(70, -1), 0)
+        fgSizer3.Add(self.add_btn, 0, wx.ALL, 5)
+        self.del_btn = wx.Button(self, wx.ID_ANY, u"-", wx.DefaultPosition, wx.Size(70, -1), 0)
+        fgSizer3.Add(self.del_btn, 0, wx.ALL, 5)
+        fgSizer1.Add(fgSizer3, 1, wx.EXPAND, 5)
+
+        if with_actions:
+            # Для процесса принятия решений: действия и коэффициент дисконтирования, переходы задаются в окне проекта.
+            self.m_staticText5 = wx.StaticText(self, wx.ID_ANY, u"Действия", wx.DefaultPosition, wx.DefaultSize, 0)
+            self.m_staticText5.Wrap(-1)
+            fgSizer1.Add(self.m_staticText5, 0, wx.ALL, 5)
+
+            self.actions_grid = wx.grid.Grid(self, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize, 0)
+            self.actions_grid.CreateGrid(2, 1)
+            self.actions_grid.SetColSize(0, 129)
+            self.actions_grid.SetColLabelValue(0, u"Name")
+            self.actions_grid.SetRowLabelSize(30)
+            self.actions_grid.SetMinSize(wx.Size(-1, 150))
+            fgSizer1.Add(self.actions_grid, 0, wx.ALL, 5)
+
+            fgSizer1.AddSpacer(0)
+
+            fgSizer4 = wx.FlexGridSizer(0, 2, 0, 0)
+            self.add_action_btn = wx.Button(self, wx.ID_ANY, u"+", wx.DefaultPosition, wx.Size(70, -1), 0)
+            fgSizer4.Add(self.add_action_btn, 0, wx.ALL, 5)
+            self.del_action_btn = wx.Button(self, wx.ID_ANY, u"-", wx.DefaultPosition, wx.Size(70, -1), 0)
+            fgSizer4.Add(self.del_action_btn, 0, wx.ALL, 5)
+            fgSizer1.Add(fgSizer4, 1, wx.EXPAND, 5)
+
+            self.m_staticText6 = wx.StaticText(self, wx.ID_ANY, u"Дисконт", wx.DefaultPosition, wx.DefaultSize, 0)
+            self.m_staticText6.Wrap(-1)
+            fgSizer1.Add(self.m_staticText6, 0, wx.ALL, 5)
+
+            self.discount_ed = wx.TextCtrl(self, wx.ID_ANY, u"0.95", wx.DefaultPosition, wx.Size(160, -1), 0)
+            fgSizer1.Add(self.discount_ed, 0, wx.ALL, 5)
+        else:
+            fgSizer1.AddSpacer(0)
+
+            self.import_btn = wx.Button(self, wx.ID_ANY, u"Загрузить переходы из CSV...", wx.DefaultPosition,
+                                        wx.DefaultSize, 0)
+            fgSizer1.Add(self.import_btn, 0, wx.ALL, 5)
+
+        bSizer3.Add(fgSizer1, 1, wx.EXPAND, 5)
+
+        m_sdbSizer4 = wx.StdDialogButtonSizer()
+        self.m_sdbSizer4OK = wx.Button(self, wx.ID_OK)
+        m_sdbSizer4.AddButton(self.m_sdbSizer4OK)
+        self.m_sdbSizer4Cancel = wx.Button(self, wx.ID_CANCEL)
+        m_sdbSizer4.AddButton(self.m_sdbSizer4Cancel)
+        m_sdbSizer4.Realize()
+
+        bSizer3.Add(m_sdbSizer4, 0, wx.EXPAND, 5)
+
+        self.SetSizer(bSizer3)
+        self.Layout()
+
+        self.Centre(wx.BOTH)
+
+        self.add_btn.Bind(wx.EVT_BUTTON, self.add_state)
+        self.del_btn.Bind(wx.EVT_BUTTON, self.del_state)
+        if with_actions:
+            self.add_action_btn.Bind(wx.EVT_BUTTON, self.add_action)
+            self.del_action_btn.Bind(wx.EVT_BUTTON, self.del_action)
+        else:
+            self.import_btn.Bind(wx.EVT_BUTTON, self.import_csv)
+        self.m_sdbSizer4OK.Bind(wx.EVT_BUTTON, self.submit)
+
+    def add_state(self, event):
+        self.states_grid.InsertRows(pos=self.states_grid.GetNumberRows())
+
+    def del_state(self, event):
+        if self.states_grid.GetNumberRows() > 1:
+            if self.states_grid.GetSelectedRows():
+                self.states_grid.DeleteRows(self.states_grid.GetSelectedRows()[0])
+            else:
+                self.states_grid.DeleteRows(pos=self.states_grid.GetNumberRows() - 1)
+
+    def add_action(self, event):
+        self.actions_grid.InsertRows(pos=self.actions_grid.GetNumberRows())
+
+    def del_action(self, event):
+        if self.actions_grid.GetNumberRows() > 1:
+            if self.actions_grid.GetSelectedRows():
+                self.actions_grid.DeleteRows(self.actions_grid.GetSelectedRows()[0])
+            else:
+                self.actions_grid.DeleteRows(pos=self.actions_grid.GetNumberRows() - 1)
+
+    def import_csv(self, event):
+        # Большие модели задаются файлом переходов "из,в,вероятность", состояния берутся из него же.
+        dlg = wx.FileDialog(self, "Файл переходов", wildcard="CSV (*.csv)|*.csv|Все файлы|*", style=wx.FD_OPEN)
+        if dlg.ShowModal() == wx.ID_OK and dlg.GetPath():
+            self.csv_path = dlg.GetPath()
+            self.submit(None)
+
+    def submit(self, event):
+        if self.name_ed.IsEmpty():
+            wx.MessageBox("Поле 'имя' не может быть пустым.")
+            self.name_ed.SetFocus()
+            return
+
+        self.proj_name = self.name_ed.GetValue()[:15]
+        self.states = []
+        for i in range(self.states_grid.GetNumberRows()):
+            val = self.states_grid.GetCellValue(i, 0)
+            self.states.append(val[:15] if val else "Состояние {}".format(i))
+
+        if self.with_actions:
+            try:
+                self.discount = float(self.discount_ed.GetValue())
+            except ValueError:
+                self.discount = 0
+            if not 0 < self.discount < 1:
+                wx.MessageBox("Коэффициент дисконтирования должен быть в интервале (0, 1).")
+                self.discount_ed.SetFocus()
+                return
+
+            self.actions = []
+            for i in range(self.actions_grid.GetNumberRows()):
+                val = self.actions_grid.GetCellValue(i, 0)
+                self.actions.append(val[:15] if val else "Действие {}".format(i))
+
+        self.EndModal(wx.ID_OK)
+
+
+class TransitionTable(wx.grid.GridTableBase):
+    # Виртуальная таблица переходов: ячейки читаются из CSR только для видимой части, последний столбец - сумма строки.
+    def __init__(self, model: MarkovProject):
+        super().__init__()
+        self.model = model
+        self.size = model.size
+        self._sums = None
+        self._version = None
+
+        self.read_only = wx.grid.GridCellAttr()
+        self.read_only.SetReadOnly()
+        self.invalid = wx.grid.GridCellAttr()
+        self.invalid.SetReadOnly()
+        self.invalid.SetBackgroundColour(wx.Colour("pink"))
+
+    def GetNumberRows(self):
+        return self.model.size
+
+    def GetNumberCols(self):
+        return self.model.size + 1
+
+    def GetRowLabelValue(self, row):
+        return self.model.states[row]
+
+    def GetColLabelValue(self, col):
+        if col == self.model.size:
+            return "Сумма"
+        return self.model.states[col]
+
+    def IsEmptyCell(self, row, col):
+        return False
+
+    def _get_sums(self) -> np.ndarray:
+        if self._version != self.model.version:
+            self._sums = np.asarray(self.model.get_matrix().sum(axis=1)).ravel()
+            self._version = self.model.version
+        return self._sums
+
+    def GetValue(self, row, col):
+        if col == self.model.size:
+            return "{:g}".format(self._get_sums()[row])
+
+        p = self.model.get(self.model.states[row], self.model.states[col])
+        return "{:g}".format(p) if p else ""
+
+    def SetValue(self, row, col, value):
+        try:
+            self.model.set(self.model.states[row], self.model.states[col], value or 0)
+        except ValueError:
+            pass
+
+    def GetAttr(self, row, col, kind):
+        if col != self.model.size:
+            return None
+
+        attr = self.read_only if abs(self._get_sums()[row] - 1) <= self.model.tolerance else self.invalid
+        attr.IncRef()
+        return attr
+
+    def sync_size(self):
+        grid = self.GetView()
+        if self.model.size > self.size:
+            for kind in (wx.grid.GRIDTABLE_NOTIFY_ROWS_APPENDED, wx.grid.GRIDTABLE_NOTIFY_COLS_APPENDED):
+                grid.ProcessTableMessage(wx.grid.GridTableMessage(self, kind, self.model.size - self.size))
+        self.size = self.model.size
+
+
+class ResultTable(wx.grid.GridTableBase):
+    # Таблица результатов поверх массивов: десятки тысяч строк не копируются в ячейки сетки.
+    def __init__(self, rows: list, columns: list):
+        super().__init__()
+        self.rows = rows
+        self.columns = columns
+
+        self.read_only = wx.grid.GridCellAttr()
+        self.read_only.SetReadOnly()
+
+    def GetNumberRows(self):
+        return len(self.rows)
+
+    def GetNumberCols(self):
+        return len(self.columns)
+
+    def GetRowLabelValue(self, row):
+        return self.rows[row]
+
+    def GetColLabelValue(self, col):
+        return self.columns[col][0]
+
+    def IsEmptyCell(self, row, col):
+        return False
+
+    def GetValue(self, row, col):
+        value = self.columns[col][1][row]
+        return value if isinstance(value, str) else "{:.6g}".format(value)
+
+    def SetValue(self, row, col, value):
+        pass
+
+    def GetAttr(self, row, col, kind):
+        self.read_only.IncRef()
+        return self.read_only
+
+
+class MarkovWindow(wx.Frame):
+
+    def __init__(self, parent, proj: MarkovProject):
+        self.model = proj
+
+        wx.Frame.__init__(self, parent, id=wx.ID_ANY, title="Марковский процесс", pos=wx.DefaultPosition,
+                          size=wx.Size(1000, 700), style=wx.DEFAULT_FRAME_STYLE | wx.TAB_TRAVERSAL)
+
+        self.SetSizeHints(wx.DefaultSize, wx.DefaultSize)
+
+        self.main_menu = wx.MenuBar(0)
+        self.edit_menu = wx.Menu()
+        self.import_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Импорт переходов (CSV)")
+        self.edit_menu.Append(self.import_mi)
+        self.add_state_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Добавить состояние")
+        self.edit_menu.Append(self.add_state_mi)
+
+        self.calc_menu = wx.Menu()
+        self.stationary_mi = wx.MenuItem(self.calc_menu, wx.ID_ANY, "Стационарное распределение")
+        self.calc_menu.Append(self.stationary_mi)
+        self.distribution_mi = wx.MenuItem(self.calc_menu, wx.ID_ANY, "Распределение через n шагов")
+        self.calc_menu.Append(self.distribution_mi)
+        self.absorption_mi = wx.MenuItem(self.calc_menu, wx.ID_ANY, "Анализ поглощения")
+        self.calc_menu.Append(self.absorption_mi)
+
+        self.main_menu.Append(self.edit_menu, "Правка")
+        self.main_menu.Append(self.calc_menu, "Расчеты")
+        self.SetMenuBar(self.main_menu)
+
+        bSizer2 = wx.BoxSizer(wx.VERTICAL)
+
+        self.nb = wx.Notebook(self, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize, 0)
+        self.transitions = wx.grid.Grid(self.nb, wx.ID_ANY)
+        self.table = TransitionTable(self.model)
+        self.transitions.SetTable(self.table, True)
+        self.transitions.SetRowLabelSize(120)
+        self.nb.AddPage(self.transitions, u"Матрица переходов", True)
+
+        self.result_grid = wx.grid.Grid(self.nb, wx.ID_ANY)
+        self.result_grid.SetRowLabelSize(120)
+        self.result_grid.SetDefaultColSize(140)
+        self.nb.AddPage(self.result_grid, u"Отчет", False)
+
+        bSizer2.Add(self.nb, 1, wx.EXPAND | wx.ALL, 0)
+
+        self.status = wx.StaticText(self, wx.ID_ANY, str(self.model))
+        bSizer2.Add(self.status, 0, wx.ALL, 5)
+
+        self.SetSizer(bSizer2)
+        self.Layout()
+        self.Centre(wx.BOTH)
+
+        self.scheduler = RecomputeScheduler()
+
+        self.Bind(wx.EVT_MENU, self.import_csv, id=self.import_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.add_state, id=self.add_state_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.stationary, id=self.stationary_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.distribution, id=self.distribution_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.absorption, id=self.absorption_mi.GetId())
+        self.transitions.Bind(wx.grid.EVT_GRID_CELL_CHANGED, self.cell_changed)
+        self.Bind(wx.EVT_CLOSE, self.accept_close)
+
+    def Destroy(self):
+        self.scheduler.close()
+        return super().Destroy()
+
+    def cell_changed(self, event):
+        # Меняются ячейка и сумма ее строки.
+        row = event.GetRow()
+        self.transitions.GetGridWindow().RefreshRect(self.transitions.BlockToDeviceRect(
+            wx.grid.GridCellCoords(row, 0), wx.grid.GridCellCoords(row, self.transitions.GetNumberCols() - 1)))
+        self._changed()
+
+    def _changed(self):
+        self.status.SetLabel(str(self.model))
+        if self.GetParent():
+            self.GetParent().proj_saved = False
+
+    def update(self):
+        self.table.sync_size()
+        self.transitions.ForceRefresh()
+        self.status.SetLabel(str(self.model))
+
+    def import_csv(self, event):
+        dlg = wx.FileDialog(self, "Файл переходов", wildcard="CSV (*.csv)|*.csv|Все файлы|*", style=wx.FD_OPEN)
+        if dlg.ShowModal() == wx.ID_CANCEL or not dlg.GetPath():
+            return
+
+        try:
+            self.model.merge(MarkovProject.from_csv(self.model.name, dlg.GetPath(), self.model.tolerance))
+        except (OSError, ValueError) as e:
+            wx.MessageBox("Ошибка импорта: {}.".format(e))
+            return
+
+        self.update()
+        self._changed()
+
+    def add_state(self, event):
+        name = wx.GetTextFromUser("Имя состояния", "Добавить состояние", parent=self)
+        if name:
+            try:
+                self.model.add_state(name[:15])
+            except ValueError as e:
+                wx.MessageBox("Ошибка: {}.".format(e))
+                return
+
+            self.update()
+            self._changed()
+
+    def _run(self, key, func, show):
+        # Расчет идет по копии модели в рабочем потоке.
+        model = copy.deepcopy(self.model)
+        self.status.SetLabel("Расчет...")
+        self.scheduler.schedule(key, lambda: func(model), lambda result: self._show(*show(model, result)),
+                                self._error)
+
+    def _error(self, e):
+        self.status.SetLabel(str(self.model))
+        wx.MessageBox("Ошибка: {}.".format(e))
+
+    def _show(self, rows: list, columns: list):
+        self.result_table = ResultTable(rows, columns)
+        self.result_grid.SetTable(self.result_table, True)
+        self.result_grid.ForceRefresh()
+        self.nb.SetSelection(self.nb.FindPage(self.result_grid))
+        self.status.SetLabel(str(self.model))
+
+    def stationary(self, event):
+        self._run("result", lambda m: m.stationary_distribution(),
+                  lambda m, pi: (m.states, [("Вероятность", pi)]))
+
+    def distribution(self, event):
+        steps = wx.GetNumberFromUser("Число шагов", "n", "Распределение через n шагов", 10, 0, 2 ** 31 - 1, self)
+        if steps < 0:
+            return
+        initial = wx.GetTextFromUser("Начальное состояние", "Распределение через n шагов", self.model.states[0],
+                                     parent=self)
+        if not initial:
+            return
+
+        self._run("result", lambda m: m.distribution(initial, steps),
+                  lambda m, vector: (m.states, [("Вероятность", vector)]))
+
+    def absorption(self, event):
+        def columns(m, res):
+            result = [("Ожидаемое число шагов", res["expected_steps"]), ("Дисперсия", res["variance"])]
+            result += [("P({})".format(it), res["probabilities"][:, k]) for k, it in enumerate(res["absorbing"])]
+            return res["transient"], result
+
+        self._run("result", lambda m: m.absorption_analysis(), columns)
+
+    def accept_close(self, event):
+        if self.GetParent():
+            self.GetParent().close(None)
+        else:
+            self.Destroy()
+
+
+class RewardTable(wx.grid.GridTableBase):
+    # Вознаграждения: строки - состояния, столбцы - действия. "-" запрещает действие в состоянии.
+    def __init__(self, model: MarkovDecisionProject):
+        super().__init__()
+        self.model = model
+        self.shape = model.rewards.shape
+
+        self.forbidden = wx.grid.GridCellAttr()
+        self.forbidden.SetBackgroundColour(wx.Colour("light grey"))
+
+    def GetNumberRows(self):
+        return self.model.size
+
+    def GetNumberCols(self):
+        return len(self.model.actions)
+
+    def GetRowLabelValue(self, row):
+        return self.model.states[row]
+
+    def GetColLabelValue(self, col):
+        return self.model.actions[col]
+
+    def IsEmptyCell(self, row, col):
+        return False
+
+    def GetValue(self, row, col):
+        if not self.model.allowed[col, row]:
+            return "-"
+        return "{:g}".format(self.model.rewards[col, row])
+
+    def SetValue(self, row, col, value):
+        action, state = self.model.actions[col], self.model.states[row]
+        if value.strip() == "-":
+            self.model.set_allowed(action, state, False)
+            return
+
+        try:
+            self.model.set_reward(action, state, value or 0)
+        except ValueError:
+            return
+        self.model.set_allowed(action, state, True)
+
+    def GetAttr(self, row, col, kind):
+        if self.model.allowed[col, row]:
+            return None
+
+        self.forbidden.IncRef()
+        return self.forbidden
+
+    def sync_size(self):
+        grid = self.GetView()
+        actions, states = self.model.rewards.shape
+        if states > self.shape[1]:
+            grid.ProcessTableMessage(wx.grid.GridTableMessage(self, wx.grid.GRIDTABLE_NOTIFY_ROWS_APPENDED,
+                                                              states - self.shape[1]))
+        if actions > self.shape[0]:
+            grid.ProcessTableMessage(wx.grid.GridTableMessage(self, wx.grid.GRIDTABLE_NOTIFY_COLS_APPENDED,
+                                                              actions - self.shape[0]))
+        self.shape = self.model.rewards.shape
+
+
+class MDPWindow(wx.Frame):
+
+    def __init__(self, parent, proj: MarkovDecisionProject):
+        self.model = proj
+        self.action = proj.actions[0]
+        self.tables = {}
+        self.trace = None
+
+        wx.Frame.__init__(self, parent, id=wx.ID_ANY, title="Марковский процесс принятия решений",
+                          pos=wx.DefaultPosition, size=wx.Size(1000, 700),
+                          style=wx.DEFAULT_FRAME_STYLE | wx.TAB_TRAVERSAL)
+
+        self.SetSizeHints(wx.DefaultSize, wx.DefaultSize)
+
+        self.main_menu = wx.MenuBar(0)
+        self.edit_menu = wx.Menu()
+        self.import_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Импорт переходов действия (CSV)")
+        self.edit_menu.Append(self.import_mi)
+        self.add_state_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Добавить состояние")
+        self.edit_menu.Append(self.add_state_mi)
+        self.add_action_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Добавить действие")
+        self.edit_menu.Append(self.add_action_mi)
+        self.discount_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Коэффициент дисконтирования")
+        self.edit_menu.Append(self.discount_mi)
+
+        self.calc_menu = wx.Menu()
+        self.value_mi = wx.MenuItem(self.calc_menu, wx.ID_ANY, "Итерация по ценности")
+        self.calc_menu.Append(self.value_mi)
+        self.policy_mi = wx.MenuItem(self.calc_menu, wx.ID_ANY, "Итерация по стратегиям")
+        self.calc_menu.Append(self.policy_mi)
+        self.modified_mi = wx.MenuItem(self.calc_menu, wx.ID_ANY, "Модифицированная итерация по стратегиям")
+        self.calc_menu.Append(self.modified_mi)
+        self.calc_menu.AppendSeparator()
+        self.trace_mi = wx.MenuItem(self.calc_menu, wx.ID_ANY, "График сходимости")
+        self.calc_menu.Append(self.trace_mi)
+
+        self.main_menu.Append(self.edit_menu, "Правка")
+        self.main_menu.Append(self.calc_menu, "Расчеты")
+        self.SetMenuBar(self.main_menu)
+
+        bSizer2 = wx.BoxSizer(wx.VERTICAL)
+
+        self.nb = wx.Notebook(self, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize, 0)
+
+        self.transitions_panel = wx.Panel(self.nb, wx.ID_ANY)
+        bSizer3 = wx.BoxSizer(wx.VERTICAL)
+        self.action_choice = wx.Choice(self.transitions_panel, wx.ID_ANY, choices=self.model.actions)
+        self.action_choice.SetSelection(0)
+        bSizer3.Add(self.action_choice, 0, wx.ALL, 5)
+        self.transitions = wx.grid.Grid(self.transitions_panel, wx.ID_ANY)
+        # Таблицы переходов создаются при первом выборе действия и хранятся окном, поэтому сетке не передаются.
+        self.transitions.SetTable(self._get_table(self.action), False)
+        self.transitions.SetRowLabelSize(120)
+        bSizer3.Add(self.transitions, 1, wx.EXPAND | wx.ALL, 0)
+        self.transitions_panel.SetSizer(bSizer3)
+        self.nb.AddPage(self.transitions_panel, u"Матрицы переходов", True)
+
+        self.rewards = wx.grid.Grid(self.nb, wx.ID_ANY)
+        self.reward_table = RewardTable(self.model)
+        self.rewards.SetTable(self.reward_table, True)
+        self.rewards.SetRowLabelSize(120)
+        self.nb.AddPage(self.rewards, u"Вознаграждения", False)
+
+        self.result_grid = wx.grid.Grid(self.nb, wx.ID_ANY)
+        self.result_grid.SetRowLabelSize(120)
+        self.result_grid.SetDefaultColSize(140)
+        self.nb.AddPage(self.result_grid, u"Отчет", False)
+
+        bSizer2.Add(self.nb, 1, wx.EXPAND | wx.ALL, 0)
+
+        self.status = wx.StaticText(self, wx.ID_ANY, str(self.model))
+        bSizer2.Add(self.status, 0, wx.ALL, 5)
+
+        self.SetSizer(bSizer2)
+        self.Layout()
+        self.Centre(wx.BOTH)
+
+        self.scheduler = RecomputeScheduler()
+
+        self.Bind(wx.EVT_MENU, self.import_csv, id=self.import_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.add_state, id=self.add_state_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.add_action, id=self.add_action_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.set_discount, id=self.discount_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.value_iteration, id=self.value_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.policy_iteration, id=self.policy_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.modified_policy_iteration, id=self.modified_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.show_trace, id=self.trace_mi.GetId())
+        self.action_choice.Bind(wx.EVT_CHOICE, self.select_action)
+        self.transitions.Bind(wx.grid.EVT_GRID_CELL_CHANGED, self.cell_changed)
+        self.rewards.Bind(wx.grid.EVT_GRID_CELL_CHANGED, lambda e: self._changed())
+        self.Bind(wx.EVT_CLOSE, self.accept_close)
+
+    def Destroy(self):
+        self.scheduler.close()
+        return super().Destroy()
+
+    def _get_table(self, action: str) -> TransitionTable:
+        if action not in self.tables:
+            self.tables[action] = TransitionTable(self.model.get_chain(action))
+        return self.tables[action]
+
+    def select_action(self, event):
+        self.action = self.model.actions[self.action_choice.GetSelection()]
+        table = self._get_table(self.action)
+        table.size = table.model.size
+        self.transitions.SetTable(table, False)
+        self.transitions.ForceRefresh()
+
+    def cell_changed(self, event):
+        row = event.GetRow()
+        self.transitions.GetGridWindow().RefreshRect(self.transitions.BlockToDeviceRect(
+            wx.grid.GridCellCoords(row, 0), wx.grid.GridCellCoords(row, self.transitions.GetNumberCols() - 1)))
+        self._changed()
+
+    def _changed(self):
+        self.status.SetLabel(str(self.model))
+        if self.GetParent():
+            self.GetParent().proj_saved = False
+
+    def update(self):
+        self.tables[self.action].sync_size()
+        self.reward_table.sync_size()
+        self.transitions.ForceRefresh()
+        self.rewards.ForceRefresh()
+        self.status.SetLabel(str(self.model))
+        self._changed()
+
+    def import_csv(self, event):
+        # Файл "из,в,вероятность" задает переходы выбранного действия; новые состояния добавляются во все действия.
+        dlg = wx.FileDialog(self, "Файл переходов", wildcard="CSV (*.csv)|*.csv|Все файлы|*", style=wx.FD_OPEN)
+        if dlg.ShowModal() == wx.ID_CANCEL or not dlg.GetPath():
+            return
+
+        try:
+            other = MarkovProject.from_csv(self.action, dlg.GetPath(), self.model.tolerance)
+            for it in other.states:
+                if it not in self.model.states:
+                    self.model.add_state(it)
+            self.model.get_chain(self.action).merge(other)
+        except (OSError, ValueError) as e:
+            wx.MessageBox("Ошибка импорта: {}.".format(e))
+            return
+
+        self.update()
+
+    def add_state(self, event):
+        name = wx.GetTextFromUser("Имя состояния", "Добавить состояние", parent=self)
+        if name:
+            try:
+                self.model.add_state(name[:15])
+            except ValueError as e:
+                wx.MessageBox("Ошибка: {}.".format(e))
+                return
+
+            self.update()
+
+    def add_action(self, event):
+        name = wx.GetTextFromUser("Имя действия", "Добавить действие", parent=self)
+        if name:
+            try:
+                self.model.add_action(name[:15])
+            except ValueError as e:
+                wx.MessageBox("Ошибка: {}.".format(e))
+                return
+
+            self.action_choice.Append(self.model.actions[-1])
+            self.update()
+
+    def set_discount(self, event):
+        value = wx.GetTextFromUser("Коэффициент дисконтирования", "Дисконт", str(self.model.discount), parent=self)
+        if value:
+            try:
+                self.model.set_discount(float(value))
+            except ValueError as e:
+                wx.MessageBox("Ошибка: {}.".format(e))
+                return
+
+            self._changed()
+
+    def _run(self, func):
+        # Расчет идет по копии модели в рабочем потоке.
+        model = copy.deepcopy(self.model)
+        self.status.SetLabel("Расчет...")
+        self.scheduler.schedule("result", lambda: func(model), lambda result: self._show(model, result),
+                                self._error)
+
+    def _error(self, e):
+        self.status.SetLabel(str(self.model))
+        wx.MessageBox("Ошибка: {}.".format(e))
+
+    def _show(self, model: MarkovDecisionProject, result: dict):
+        self.trace = result["trace"]
+        self.result_table = ResultTable(model.states, [("Ценность", result["values"]),
+                                                       ("Действие", result["policy"])])
+        self.result_grid.SetTable(self.result_table, True)
+        self.result_grid.ForceRefresh()
+        self.nb.SetSelection(self.nb.FindPage(self.result_grid))
+        self.status.SetLabel("{}; итераций: {}, невязка: {:.3g}".format(self.model, result["iterations"],
+                                                                         self.trace[-1]))
+
+    def value_iteration(self, event):
+        self._run(lambda m: m.value_iteration())
+
+    def policy_iteration(self, event):
+        self._run(lambda m: m.policy_iteration())
+
+    def modified_policy_iteration(self, event):
+        self._run(lambda m: m.modified_policy_iteration())
+
+    def show_trace(self, event):
+        if self.trace is None:
+            wx.MessageBox("Сначала выполните расчет.")
+            return
+        show_plot(self.trace)
+
+    def accept_close(self, event):
+        if self.GetParent():
+            self.GetParent().close(None)
+        else:
+            self.Destroy()
@@ -0,0 +1,81 @@
+import threading
+import time
+
+import wx
+
+# Задержка перед пересчетом, с: серия правок подряд дает один пересчет.
+DEBOUNCE_DELAY = 0.15
+
+
+class RecomputeScheduler(object):
+    # Пересчеты выполняются в рабочем потоке, результаты возвращаются в поток интерфейса через wx.CallAfter.
+    # У каждого ключа хранится только последний запрос; результат устаревшего запроса отбрасывается.
+    def __init__(self, delay: float = DEBOUNCE_DELAY, post=None):
+        self.delay = delay
+        self.post = post or wx.CallAfter
+        self._pending = {}
+        self._generations = {}
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="dss-recompute", daemon=True)
+        self._thread.start()
+
+    def schedule(self, key, func, callback, errback=None) -> None:
+        # func выполняется в рабочем потоке и не должна обращаться к объектам, которые меняет интерфейс.
+        with self._cond:
+            generation = self._generations.get(key, 0) + 1
+            self._generations[key] = generation
+            self._pending[key] = (time.monotonic() + self.delay, generation, func, callback, errback)
+            self._cond.notify()
+
+    def cancel(self, key) -> None:
+        with self._cond:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._pending.pop(key, None)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._pending.clear()
+            self._cond.notify()
+
+    def _is_current(self, key, generation: int) -> bool:
+        with self._cond:
+            return not self._closed and self._generations.get(key) == generation
+
+    def _next(self):
+        with self._cond:
+            while not self._closed:
+                now = time.monotonic()
+                if self._pending:
+                    key = min(self._pending, key=lambda k: self._pending[k][0])
+                    due = self._pending[key][0]
+                    if due <= now:
+                        return (key,) + self._pending.pop(key)[1:]
+                    self._cond.wait(due - now)
+                else:
+                    self._cond.wait()
+
+        return None
+
+    def _run(self):
+        while True:
+            task = self._next()
+            if task is None:
+                return
+
+            key, generation, func, callback, errback = task
+            try:
+                result = func()
+            except Exception as e:
+                if errback is not None and self._is_current(key, generation):
+                    self.post(self._deliver, key, generation, errback, e)
+                continue
+
+            if self._is_current(key, generation):
+                self.post(self._deliver, key, generation, callback, result)
+
+    def _deliver(self, key, generation: int, callback, result):
+        # Между публикацией и вызовом могли прийти новые правки.
+        if self._is_current(key, generation):
+            callback(result)
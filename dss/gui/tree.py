@@ -0,0 +1,401 @@
+import copy
+
+import numpy as np
+import wx
+import wx.grid
+
+from dss.core.tree import DecisionTree, NodeKind, TreeNode
+from dss.gui.recompute import RecomputeScheduler
+
+KIND_NAMES = {NodeKind.DECISION: "решение", NodeKind.CHANCE: "случай", NodeKind.TERMINAL: "исход"}
+# Число точек в расчете чувствительности.
+SENSITIVITY_POINTS = 21
+
+
+def show_curve(x, y, xlabel: str, step: bool = False) -> None:
+    # matplotlib загружается только при первом построении графика.
+    from matplotlib import pyplot
+
+    if step:
+        pyplot.step(x, y, where="post")
+    else:
+        pyplot.plot(x, y)
+    pyplot.xlabel(xlabel)
+    pyplot.show()
+
+
+class BranchTable(wx.grid.GridTableBase):
+    # Ветви выбранного узла; у конечного узла - одна строка с выигрышем.
+    def __init__(self, model: DecisionTree, node: TreeNode):
+        super().__init__()
+        self.model = model
+        self.node = node
+        if node.is_leaf():
+            self.columns = ["Выигрыш"]
+        elif node.kind == NodeKind.CHANCE:
+            self.columns = ["Вероятность", "Выплата", "Узел", "Ожидаемое значение"]
+        else:
+            self.columns = ["Выплата", "Узел", "Ожидаемое значение"]
+
+        self.read_only = wx.grid.GridCellAttr()
+        self.read_only.SetReadOnly()
+        self.chosen = wx.grid.GridCellAttr()
+        self.chosen.SetReadOnly()
+        self.chosen.SetBackgroundColour(wx.Colour("light green"))
+
+    def GetNumberRows(self):
+        return 1 if self.node.is_leaf() else len(self.node.children)
+
+    def GetNumberCols(self):
+        return len(self.columns)
+
+    def GetRowLabelValue(self, row):
+        return self.node.name if self.node.is_leaf() else self.node.labels[row]
+
+    def GetColLabelValue(self, col):
+        return self.columns[col]
+
+    def IsEmptyCell(self, row, col):
+        return False
+
+    def _get_branch_values(self) -> list:
+        try:
+            return self.model.get_branch_values(self.node)
+        except ValueError:
+            return [np.nan] * len(self.node.children)
+
+    def GetValue(self, row, col):
+        column = self.columns[col]
+        if column == "Выигрыш":
+            return "{:g}".format(self.node.value)
+        elif column == "Вероятность":
+            return "{:g}".format(self.node.probabilities[row])
+        elif column == "Выплата":
+            return "{:g}".format(self.node.cash[row])
+        elif column == "Узел":
+            child = self.node.children[row]
+            return "{} ({})".format(child.name, KIND_NAMES[child.kind])
+        return "{:.6g}".format(self._get_branch_values()[row])
+
+    def SetValue(self, row, col, value):
+        column = self.columns[col]
+        try:
+            if column == "Выигрыш":
+                self.model.set_value(self.node, value or 0)
+            elif column == "Вероятность":
+                self.model.set_probability(self.node, row, value or 0)
+            elif column == "Выплата":
+                self.model.set_cash(self.node, row, value or 0)
+        except ValueError:
+            pass
+
+    def GetAttr(self, row, col, kind):
+        column = self.columns[col]
+        if column in ("Выигрыш", "Вероятность", "Выплата"):
+            return None
+
+        attr = self.read_only
+        if self.node.kind == NodeKind.DECISION and column == "Ожидаемое значение":
+            try:
+                if self.model.get_choice(self.node) == row:
+                    attr = self.chosen
+            except ValueError:
+                pass
+        attr.IncRef()
+        return attr
+
+
+class TreeWindow(wx.Frame):
+
+    def __init__(self, parent, proj: DecisionTree):
+        self.model = proj
+        self.current = None
+
+        wx.Frame.__init__(self, parent, id=wx.ID_ANY, title="Дерево принятия решений", pos=wx.DefaultPosition,
+                          size=wx.Size(1000, 700), style=wx.DEFAULT_FRAME_STYLE | wx.TAB_TRAVERSAL)
+
+        self.SetSizeHints(wx.DefaultSize, wx.DefaultSize)
+
+        self.main_menu = wx.MenuBar(0)
+        self.edit_menu = wx.Menu()
+        self.add_decision_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Добавить узел решения")
+        self.edit_menu.Append(self.add_decision_mi)
+        self.add_chance_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Добавить узел случая")
+        self.edit_menu.Append(self.add_chance_mi)
+        self.add_terminal_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Добавить конечный узел")
+        self.edit_menu.Append(self.add_terminal_mi)
+        self.remove_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Удалить ветвь")
+        self.edit_menu.Append(self.remove_mi)
+        self.event_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Событие узла случая")
+        self.edit_menu.Append(self.event_mi)
+        self.edit_menu.AppendSeparator()
+        self.share_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Объединить одинаковые поддеревья")
+        self.edit_menu.Append(self.share_mi)
+
+        self.calc_menu = wx.Menu()
+        self.rollback_mi = wx.MenuItem(self.calc_menu, wx.ID_ANY, "Свертка дерева")
+        self.calc_menu.Append(self.rollback_mi)
+        self.evpi_mi = wx.MenuItem(self.calc_menu, wx.ID_ANY, "Ценность полной информации (EVPI)")
+        self.calc_menu.Append(self.evpi_mi)
+        self.evsi_mi = wx.MenuItem(self.calc_menu, wx.ID_ANY, "Ценность выборочной информации (EVSI)")
+        self.calc_menu.Append(self.evsi_mi)
+        self.profile_mi = wx.MenuItem(self.calc_menu, wx.ID_ANY, "Профиль риска")
+        self.calc_menu.Append(self.profile_mi)
+        self.sensitivity_mi = wx.MenuItem(self.calc_menu, wx.ID_ANY, "Чувствительность")
+        self.calc_menu.Append(self.sensitivity_mi)
+
+        self.main_menu.Append(self.edit_menu, "Правка")
+        self.main_menu.Append(self.calc_menu, "Расчеты")
+        self.SetMenuBar(self.main_menu)
+
+        bSizer2 = wx.BoxSizer(wx.VERTICAL)
+
+        self.splitter = wx.SplitterWindow(self, wx.ID_ANY, style=wx.SP_3D)
+        self.tree = wx.TreeCtrl(self.splitter, wx.ID_ANY, style=wx.TR_DEFAULT_STYLE)
+        self.branches = wx.grid.Grid(self.splitter, wx.ID_ANY)
+        self.branches.SetRowLabelSize(120)
+        self.branches.SetDefaultColSize(140)
+        self.splitter.SplitVertically(self.tree, self.branches, 400)
+        bSizer2.Add(self.splitter, 1, wx.EXPAND | wx.ALL, 0)
+
+        self.status = wx.StaticText(self, wx.ID_ANY, str(self.model))
+        bSizer2.Add(self.status, 0, wx.ALL, 5)
+
+        self.SetSizer(bSizer2)
+        self.Layout()
+        self.Centre(wx.BOTH)
+
+        self.scheduler = RecomputeScheduler()
+
+        self.Bind(wx.EVT_MENU, lambda e: self.add_node(NodeKind.DECISION), id=self.add_decision_mi.GetId())
+        self.Bind(wx.EVT_MENU, lambda e: self.add_node(NodeKind.CHANCE), id=self.add_chance_mi.GetId())
+        self.Bind(wx.EVT_MENU, lambda e: self.add_node(NodeKind.TERMINAL), id=self.add_terminal_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.remove_branch, id=self.remove_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.set_event, id=self.event_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.share, id=self.share_mi.GetId())
+        self.Bind(wx.EVT_MENU, lambda e: self.rollback(), id=self.rollback_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.evpi, id=self.evpi_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.evsi, id=self.evsi_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.risk_profile, id=self.profile_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.sensitivity, id=self.sensitivity_mi.GetId())
+        self.tree.Bind(wx.EVT_TREE_ITEM_EXPANDING, self.expand_item)
+        self.tree.Bind(wx.EVT_TREE_SEL_CHANGED, self.select_item)
+        self.branches.Bind(wx.grid.EVT_GRID_CELL_CHANGED, lambda e: self._changed())
+        self.Bind(wx.EVT_CLOSE, self.accept_close)
+
+        self.update()
+
+    def Destroy(self):
+        self.scheduler.close()
+        return super().Destroy()
+
+    def _item_text(self, node: TreeNode, label: str = None) -> str:
+        try:
+            value = "{:.6g}".format(self.model.get_value(node))
+        except ValueError:
+            value = "?"
+        text = "{} ({}) = {}".format(node.name, KIND_NAMES[node.kind], value)
+        return text if label is None else "{}: {}".format(label, text)
+
+    def _add_item(self, parent, node: TreeNode, owner: TreeNode = None, branch: int = None):
+        # Общие поддеревья DAG показываются в каждом месте, поэтому элементы создаются только при раскрытии.
+        label = None if owner is None else owner.labels[branch]
+        if parent is None:
+            item = self.tree.AddRoot(self._item_text(node, label))
+        else:
+            item = self.tree.AppendItem(parent, self._item_text(node, label))
+        self.tree.SetItemData(item, (node, owner, branch))
+        if node.children:
+            self.tree.SetItemHasChildren(item, True)
+        return item
+
+    def expand_item(self, event):
+        item = event.GetItem()
+        if self.tree.GetChildrenCount(item, False):
+            return
+
+        node = self.tree.GetItemData(item)[0]
+        for k, child in enumerate(node.children):
+            self._add_item(item, child, node, k)
+
+    def _refresh_items(self, item) -> None:
+        node, owner, branch = self.tree.GetItemData(item)
+        self.tree.SetItemText(item, self._item_text(node, None if owner is None else owner.labels[branch]))
+        child, cookie = self.tree.GetFirstChild(item)
+        while child.IsOk():
+            self._refresh_items(child)
+            child, cookie = self.tree.GetNextChild(item, cookie)
+
+    def update(self):
+        # Полная перестройка после изменения структуры: раскрывается только корень.
+        self.tree.DeleteAllItems()
+        self._add_item(None, self.model.root)
+        self.tree.Expand(self.tree.GetRootItem())
+        self.tree.SelectItem(self.tree.GetRootItem())
+        self.show_node(self.model.root)
+        self.rollback()
+
+    def show_node(self, node: TreeNode):
+        self.current = node
+        self.branch_table = BranchTable(self.model, node)
+        self.branches.SetTable(self.branch_table, True)
+        self.branches.ForceRefresh()
+
+    def select_item(self, event):
+        item = event.GetItem()
+        if item.IsOk() and self.tree.GetItemData(item) is not None:
+            self.show_node(self.tree.GetItemData(item)[0])
+
+    def _selected(self) -> tuple:
+        item = self.tree.GetSelection()
+        if not item.IsOk():
+            return None, None, None, None
+        return (item,) + self.tree.GetItemData(item)
+
+    def _changed(self):
+        self.rollback()
+        if self.GetParent():
+            self.GetParent().proj_saved = False
+
+    def rollback(self):
+        # Свертка после правки пересчитывает только путь от измененных узлов к корню.
+        try:
+            value = self.model.rollback()
+        except ValueError as e:
+            self.status.SetLabel("{}; ошибка: {}".format(self.model, e))
+        else:
+            self.status.SetLabel("{}; путей: {}, ожидаемое значение: {:.6g}".format(
+                self.model, self.model.count_paths(), value))
+
+        self._refresh_items(self.tree.GetRootItem())
+        self.branches.ForceRefresh()
+
+    def add_node(self, kind: NodeKind):
+        item, node, _, _ = self._selected()
+        if node is None or node.is_leaf():
+            wx.MessageBox("Выберите узел решения или случая.")
+            return
+
+        label = wx.GetTextFromUser("Метка ветви", "Новая ветвь", parent=self)
+        if not label:
+            return
+        name = wx.GetTextFromUser("Имя узла", "Новая ветвь", label, parent=self) or label
+
+        self.model.add_branch(node, label[:30], self.model.new_node(kind, name[:30]))
+
+        # Узел мог встречаться в нескольких местах дерева: элементы перестраиваются.
+        self.update()
+        self._changed()
+
+    def remove_branch(self, event):
+        item, node, owner, branch = self._selected()
+        if owner is None:
+            wx.MessageBox("Выберите ветвь.")
+            return
+
+        self.model.remove_branch(owner, branch)
+        self.update()
+        self._changed()
+
+    def set_event(self, event):
+        item, node, _, _ = self._selected()
+        if node is None or node.kind != NodeKind.CHANCE:
+            wx.MessageBox("Выберите узел случая.")
+            return
+
+        name = wx.GetTextFromUser("Имя события (узлы одного события описывают одну неопределенность)", "Событие",
+                                  node.event or "", parent=self)
+        self.model.set_event(node, name[:30])
+        self._changed()
+
+    def share(self, event):
+        removed = self.model.share()
+        self.update()
+        self._changed()
+        wx.MessageBox("Объединено узлов: {}.".format(removed))
+
+    def _run(self, func, show):
+        # Расчет идет по копии модели в рабочем потоке.
+        model = copy.deepcopy(self.model)
+        self.status.SetLabel("Расчет...")
+        self.scheduler.schedule("result", lambda: func(model), show, self._error)
+
+    def _error(self, e):
+        self.rollback()
+        wx.MessageBox("Ошибка: {}.".format(e))
+
+    def _choose_event(self):
+        events = self.model.get_events()
+        if not events:
+            wx.MessageBox("В дереве нет узлов случая с заданным событием.")
+            return None
+        return wx.GetSingleChoice("Событие", "Выбор события", events, self) or None
+
+    def _show_value(self, title: str):
+        def show(value):
+            self.rollback()
+            wx.MessageBox("{}: {:.6g}".format(title, value))
+        return show
+
+    def evpi(self, event):
+        name = self._choose_event()
+        if name:
+            self._run(lambda m: m.evpi(name), self._show_value("EVPI ({})".format(name)))
+
+    def evsi(self, event):
+        # Исследование с одинаковой точностью для всех исходов: сигнал совпадает с исходом с вероятностью q.
+        name = self._choose_event()
+        if not name:
+            return
+        value = wx.GetTextFromUser("Точность исследования (0-1)", "EVSI", "0.8", parent=self)
+        try:
+            accuracy = float(value)
+            outcomes = list(self.model.get_event_probabilities(name))
+        except ValueError as e:
+            wx.MessageBox("Ошибка: {}.".format(e))
+            return
+
+        miss = (1 - accuracy) / (len(outcomes) - 1) if len(outcomes) > 1 else 0.
+        likelihoods = {s: {o: accuracy if s == o else miss for o in outcomes} for s in outcomes}
+        self._run(lambda m: m.evsi(name, likelihoods), self._show_value("EVSI ({})".format(name)))
+
+    def risk_profile(self, event):
+        def show(result):
+            self.rollback()
+            values, probabilities = result
+            show_curve(values, np.cumsum(probabilities), "Выигрыш", step=True)
+
+        self._run(lambda m: m.risk_profile(), show)
+
+    def sensitivity(self, event):
+        node = self.current
+        if node is None:
+            return
+        branch = None
+        if not node.is_leaf():
+            branch = self.branches.GetGridCursorRow()
+            if branch < 0 or branch >= len(node.children):
+                wx.MessageBox("Выберите ветвь в таблице.")
+                return
+
+        low = wx.GetTextFromUser("Наименьшее значение параметра", "Чувствительность", "0", parent=self)
+        high = wx.GetTextFromUser("Наибольшее значение параметра", "Чувствительность", "1", parent=self)
+        try:
+            x = np.linspace(float(low), float(high), SENSITIVITY_POINTS)
+        except ValueError:
+            return
+
+        # Узел в копии модели имеет тот же индекс.
+        index = node.index
+
+        def show(y):
+            self.rollback()
+            show_curve(x, y, "Параметр")
+
+        self._run(lambda m: m.sensitivity(m.nodes[index], x, branch), show)
+
+    def accept_close(self, event):
+        if self.GetParent():
+            self.GetParent().close(None)
+        else:
+            self.Destroy()
@@ -0,0 +1,326 @@
+import wx
+import wx.grid
+
+from dss.core.uncertainty import CRITERIA, UncertaintyProject, best_index
+from dss.gui.markov import ResultTable
+from dss.gui.recompute import RecomputeScheduler
+from dss.gui.tree import show_curve
+
+CRITERIA_NAMES = {"wald": "Вальд", "maximax": "Максимакс", "savage": "Сэвидж", "hurwicz": "Гурвиц",
+                  "laplace": "Лаплас"}
+
+
+class UncertaintyDialog(wx.Dialog):
+
+    def __init__(self, parent):
+        wx.Dialog.__init__(self, parent, id=wx.ID_ANY, title=u"Создание проэкта", pos=wx.DefaultPosition,
+                           size=wx.Size(330, 560), style=wx.DEFAULT_DIALOG_STYLE)
+
+        self.SetSizeHints(wx.DefaultSize, wx.DefaultSize)
+        self.csv_path = None
+
+        bSizer3 = wx.BoxSizer(wx.VERTICAL)
+
+        fgSizer1 = wx.FlexGridSizer(0, 2, 0, 0)
+        fgSizer1.SetFlexibleDirection(wx.BOTH)
+        fgSizer1.SetNonFlexibleGrowMode(wx.FLEX_GROWMODE_SPECIFIED)
+
+        self.m_staticText2 = wx.StaticText(self, wx.ID_ANY, u"Имя", wx.DefaultPosition, wx.DefaultSize, 0)
+        self.m_staticText2.Wrap(-1)
+        fgSizer1.Add(self.m_staticText2, 0, wx.ALL, 5)
+
+        self.name_ed = wx.TextCtrl(self, wx.ID_ANY, u"untitled", wx.DefaultPosition, wx.Size(160, -1), 0)
+        fgSizer1.Add(self.name_ed, 0, wx.ALL, 5)
+
+        self.grids = {}
+        for key, title in (("alternatives", u"Альтернативы"), ("scenarios", u"Сценарии")):
+            label = wx.StaticText(self, wx.ID_ANY, title, wx.DefaultPosition, wx.DefaultSize, 0)
+            label.Wrap(-1)
+            fgSizer1.Add(label, 0, wx.ALL, 5)
+
+            grid = wx.grid.Grid(self, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize, 0)
+            grid.CreateGrid(3, 1)
+            grid.SetColSize(0, 129)
+            grid.SetColLabelValue(0, u"Name")
+            grid.SetRowLabelSize(30)
+            grid.SetMinSize(wx.Size(-1, 150))
+            fgSizer1.Add(grid, 0, wx.ALL, 5)
+            self.grids[key] = grid
+
+            fgSizer1.AddSpacer(0)
+
+            fgSizer3 = wx.FlexGridSizer(0, 2, 0, 0)
+            add_btn = wx.Button(self, wx.ID_ANY, u"+", wx.DefaultPosition, wx.Size(70, -1), 0)
+            fgSizer3.Add(add_btn, 0, wx.ALL, 5)
+            del_btn = wx.Button(self, wx.ID_ANY, u"-", wx.DefaultPosition, wx.Size(70, -1), 0)
+            fgSizer3.Add(del_btn, 0, wx.ALL, 5)
+            fgSizer1.Add(fgSizer3, 1, wx.EXPAND, 5)
+
+            add_btn.Bind(wx.EVT_BUTTON, lambda e, g=grid: g.InsertRows(pos=g.GetNumberRows()))
+            del_btn.Bind(wx.EVT_BUTTON, lambda e, g=grid: self.del_row(g))
+
+        fgSizer1.AddSpacer(0)
+
+        self.import_btn = wx.Button(self, wx.ID_ANY, u"Загрузить таблицу из CSV...", wx.DefaultPosition,
+                                    wx.DefaultSize, 0)
+        fgSizer1.Add(self.import_btn, 0, wx.ALL, 5)
+
+        bSizer3.Add(fgSizer1, 1, wx.EXPAND, 5)
+
+        m_sdbSizer4 = wx.StdDialogButtonSizer()
+        self.m_sdbSizer4OK = wx.Button(self, wx.ID_OK)
+        m_sdbSizer4.AddButton(self.m_sdbSizer4OK)
+        self.m_sdbSizer4Cancel = wx.Button(self, wx.ID_CANCEL)
+        m_sdbSizer4.AddButton(self.m_sdbSizer4Cancel)
+        m_sdbSizer4.Realize()
+
+        bSizer3.Add(m_sdbSizer4, 0, wx.EXPAND, 5)
+
+        self.SetSizer(bSizer3)
+        self.Layout()
+
+        self.Centre(wx.BOTH)
+
+        self.import_btn.Bind(wx.EVT_BUTTON, self.import_csv)
+        self.m_sdbSizer4OK.Bind(wx.EVT_BUTTON, self.submit)
+
+    def del_row(self, grid):
+        if grid.GetNumberRows() > 1:
+            if grid.GetSelectedRows():
+                grid.DeleteRows(grid.GetSelectedRows()[0])
+            else:
+                grid.DeleteRows(pos=grid.GetNumberRows() - 1)
+
+    def import_csv(self, event):
+        # Таблица "сценарий,альтернатива 1,..." со строкой на сценарий; альтернативы и сценарии берутся из нее же.
+        dlg = wx.FileDialog(self, "Таблица выигрышей", wildcard="CSV (*.csv)|*.csv|Все файлы|*", style=wx.FD_OPEN)
+        if dlg.ShowModal() == wx.ID_OK and dlg.GetPath():
+            self.csv_path = dlg.GetPath()
+            self.submit(None)
+
+    def submit(self, event):
+        if self.name_ed.IsEmpty():
+            wx.MessageBox("Поле 'имя' не может быть пустым.")
+            self.name_ed.SetFocus()
+            return
+
+        self.proj_name = self.name_ed.GetValue()[:15]
+        self.alternatives = self._get_names(self.grids["alternatives"], "Альтернатива {}")
+        self.scenarios = self._get_names(self.grids["scenarios"], "Сценарий {}")
+
+        self.EndModal(wx.ID_OK)
+
+    @staticmethod
+    def _get_names(grid, default: str) -> list:
+        result = []
+        for i in range(grid.GetNumberRows()):
+            val = grid.GetCellValue(i, 0)
+            result.append(val[:15] if val else default.format(i))
+        return result
+
+
+class PayoffTable(wx.grid.GridTableBase):
+    # Виртуальная таблица: для 10^3 x 10^5 читаются только видимые ячейки.
+    def __init__(self, model: UncertaintyProject):
+        super().__init__()
+        self.model = model
+        self.shape = model.shape
+
+    def GetNumberRows(self):
+        return len(self.model.alternatives)
+
+    def GetNumberCols(self):
+        return len(self.model.scenarios)
+
+    def GetRowLabelValue(self, row):
+        return self.model.alternatives[row]
+
+    def GetColLabelValue(self, col):
+        return self.model.scenarios[col]
+
+    def IsEmptyCell(self, row, col):
+        return False
+
+    def GetValue(self, row, col):
+        return "{:g}".format(self.model.payoffs[row, col])
+
+    def SetValue(self, row, col, value):
+        try:
+            self.model.set(self.model.alternatives[row], self.model.scenarios[col], value or 0)
+        except ValueError:
+            pass
+
+    def sync_size(self):
+        grid = self.GetView()
+        rows, cols = self.model.shape
+        if rows > self.shape[0]:
+            grid.ProcessTableMessage(wx.grid.GridTableMessage(self, wx.grid.GRIDTABLE_NOTIFY_ROWS_APPENDED,
+                                                              rows - self.shape[0]))
+        if cols > self.shape[1]:
+            grid.ProcessTableMessage(wx.grid.GridTableMessage(self, wx.grid.GRIDTABLE_NOTIFY_COLS_APPENDED,
+                                                              cols - self.shape[1]))
+        self.shape = self.model.shape
+
+
+class UncertaintyWindow(wx.Frame):
+
+    def __init__(self, parent, proj: UncertaintyProject):
+        self.model = proj
+        self.sweep = None
+
+        wx.Frame.__init__(self, parent, id=wx.ID_ANY, title="Решение при неопределенности", pos=wx.DefaultPosition,
+                          size=wx.Size(1000, 700), style=wx.DEFAULT_FRAME_STYLE | wx.TAB_TRAVERSAL)
+
+        self.SetSizeHints(wx.DefaultSize, wx.DefaultSize)
+
+        self.main_menu = wx.MenuBar(0)
+        self.edit_menu = wx.Menu()
+        self.add_alt_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Добавить альтернативу")
+        self.edit_menu.Append(self.add_alt_mi)
+        self.add_scenario_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Добавить сценарий")
+        self.edit_menu.Append(self.add_scenario_mi)
+        self.alpha_mi = wx.MenuItem(self.edit_menu, wx.ID_ANY, "Коэффициент оптимизма (Гурвиц)")
+        self.edit_menu.Append(self.alpha_mi)
+
+        self.calc_menu = wx.Menu()
+        self.sweep_mi = wx.MenuItem(self.calc_menu, wx.ID_ANY, "Анализ коэффициента оптимизма")
+        self.calc_menu.Append(self.sweep_mi)
+        self.plot_mi = wx.MenuItem(self.calc_menu, wx.ID_ANY, "График критерия Гурвица")
+        self.calc_menu.Append(self.plot_mi)
+
+        self.main_menu.Append(self.edit_menu, "Правка")
+        self.main_menu.Append(self.calc_menu, "Расчеты")
+        self.SetMenuBar(self.main_menu)
+
+        bSizer2 = wx.BoxSizer(wx.VERTICAL)
+
+        self.nb = wx.Notebook(self, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize, 0)
+        self.payoffs = wx.grid.Grid(self.nb, wx.ID_ANY)
+        self.table = PayoffTable(self.model)
+        self.payoffs.SetTable(self.table, True)
+        self.payoffs.SetRowLabelSize(120)
+        self.nb.AddPage(self.payoffs, u"Матрица выигрышей", True)
+
+        self.result_grid = wx.grid.Grid(self.nb, wx.ID_ANY)
+        self.result_grid.SetRowLabelSize(120)
+        self.result_grid.SetDefaultColSize(120)
+        self.nb.AddPage(self.result_grid, u"Критерии", False)
+
+        self.sweep_grid = wx.grid.Grid(self.nb, wx.ID_ANY)
+        self.sweep_grid.SetRowLabelSize(80)
+        self.sweep_grid.SetDefaultColSize(160)
+        self.nb.AddPage(self.sweep_grid, u"Анализ α", False)
+
+        bSizer2.Add(self.nb, 1, wx.EXPAND | wx.ALL, 0)
+
+        self.best = wx.StaticText(self, wx.ID_ANY, "")
+        bSizer2.Add(self.best, 0, wx.ALL, 5)
+        self.status = wx.StaticText(self, wx.ID_ANY, str(self.model))
+        bSizer2.Add(self.status, 0, wx.ALL, 5)
+
+        self.SetSizer(bSizer2)
+        self.Layout()
+        self.Centre(wx.BOTH)
+
+        self.scheduler = RecomputeScheduler()
+
+        self.Bind(wx.EVT_MENU, self.add_alternative, id=self.add_alt_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.add_scenario, id=self.add_scenario_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.set_alpha, id=self.alpha_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.show_sweep, id=self.sweep_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.plot_sweep, id=self.plot_mi.GetId())
+        self.payoffs.Bind(wx.grid.EVT_GRID_CELL_CHANGED, lambda e: self._changed())
+        self.Bind(wx.EVT_CLOSE, self.accept_close)
+
+        self.calculate()
+
+    def Destroy(self):
+        self.scheduler.close()
+        return super().Destroy()
+
+    def _changed(self):
+        self.calculate()
+        if self.GetParent():
+            self.GetParent().proj_saved = False
+
+    def update(self):
+        self.table.sync_size()
+        self.payoffs.ForceRefresh()
+        self._changed()
+
+    def calculate(self):
+        # Модель не копируется (матрица может занимать гигабайты): расчет читает ее в рабочем потоке,
+        # а правка, сделанная во время расчета, планирует новый расчет, и устаревший результат отбрасывается.
+        model, alpha = self.model, self.model.alpha
+        self.status.SetLabel("Расчет...")
+        self.scheduler.schedule("result", lambda: (model.evaluate(alpha), model.hurwicz_sweep()), self._show,
+                                self._error)
+
+    def _error(self, e):
+        self.status.SetLabel(str(self.model))
+        self.best.SetLabel("Ошибка: {}.".format(e))
+
+    def _show(self, result):
+        scores, self.sweep = result
+        columns = [("{} (α={:g})".format(CRITERIA_NAMES[k], self.model.alpha) if k == "hurwicz" else CRITERIA_NAMES[k],
+                    scores[k]) for k in CRITERIA]
+        self.result_table = ResultTable(self.model.alternatives, columns)
+        self.result_grid.SetTable(self.result_table, True)
+        self.result_grid.ForceRefresh()
+
+        alphas, values, best = self.sweep
+        self.sweep_table = ResultTable(["{:.2f}".format(it) for it in alphas],
+                                       [("Лучшая альтернатива", [self.model.alternatives[i] for i in best]),
+                                        ("Значение", values[range(len(alphas)), best])])
+        self.sweep_grid.SetTable(self.sweep_table, True)
+        self.sweep_grid.ForceRefresh()
+
+        self.best.SetLabel("Лучшие: " + "; ".join("{} - {}".format(CRITERIA_NAMES[k], self.model.alternatives[
+            best_index(k, scores[k])]) for k in CRITERIA))
+        self.status.SetLabel(str(self.model))
+
+    def add_alternative(self, event):
+        name = wx.GetTextFromUser("Имя альтернативы", "Добавить альтернативу", parent=self)
+        if name:
+            try:
+                self.model.add_alternative(name[:15])
+            except ValueError as e:
+                wx.MessageBox("Ошибка: {}.".format(e))
+                return
+            self.update()
+
+    def add_scenario(self, event):
+        name = wx.GetTextFromUser("Имя сценария", "Добавить сценарий", parent=self)
+        if name:
+            try:
+                self.model.add_scenario(name[:15])
+            except ValueError as e:
+                wx.MessageBox("Ошибка: {}.".format(e))
+                return
+            self.update()
+
+    def set_alpha(self, event):
+        value = wx.GetTextFromUser("Коэффициент оптимизма α (0-1)", "Критерий Гурвица", str(self.model.alpha),
+                                   parent=self)
+        if value:
+            try:
+                self.model.set_alpha(float(value))
+            except ValueError as e:
+                wx.MessageBox("Ошибка: {}.".format(e))
+                return
+            self._changed()
+
+    def show_sweep(self, event):
+        self.nb.SetSelection(self.nb.FindPage(self.sweep_grid))
+
+    def plot_sweep(self, event):
+        if self.sweep is None:
+            return
+        alphas, values, best = self.sweep
+        show_curve(alphas, values.max(axis=1), "α")
+
+    def accept_close(self, event):
+        if self.GetParent():
+            self.GetParent().close(None)
+        else:
+            self.Destroy()
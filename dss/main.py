@@ -1,11 +1,26 @@
 import os
-import pickle
 
 import wx
 
-from ahpproject import AHPDialog, AHPWindow, AHPProject
-
-from dss.expertproject import AlternativesMaster, ExpertDialog, ExpertProject, ExpertWindow
+from dss.core.ahp import AHPProject
+from dss.core.expert import ExpertProject
+from dss.core.journal import JOURNALED_TYPES, Journal, discard_recovery, has_journal, journal_path, recover, \
+    snapshot_path
+from dss.core.knowledge import KnowledgeBase
+from dss.core.markov import MarkovProject
+from dss.core.mdp import MarkovDecisionProject
+from dss.core.storage import load_project, save_project
+from dss.core.tree import DecisionTree, NodeKind
+from dss.core.uncertainty import UncertaintyProject
+from dss.gui.ahp import AHPDialog, AHPWindow
+from dss.gui.expert import AlternativesMaster, ExpertDialog, ExpertWindow
+from dss.gui.knowledge import KnowledgeWindow
+from dss.gui.markov import MarkovDialog, MarkovWindow, MDPWindow
+from dss.gui.tree import TreeWindow
+from dss.gui.uncertainty import UncertaintyDialog, UncertaintyWindow
+
+# Период автосохранения журнала изменений, мс.
+AUTOSAVE_INTERVAL = 30000
 
 
 class MainFrame(wx.Frame):
@@ -29,6 +44,10 @@ class MainFrame(wx.Frame):
         self.markov_mi = wx.MenuItem(self.m_menu2, wx.ID_ANY, "Марковский процесс", wx.EmptyString, wx.ITEM_NORMAL)
         self.m_menu2.Append(self.markov_mi)
 
+        self.mdp_mi = wx.MenuItem(self.m_menu2, wx.ID_ANY, "Марковский процесс принятия решений", wx.EmptyString,
+                                  wx.ITEM_NORMAL)
+        self.m_menu2.Append(self.mdp_mi)
+
         self.tree_mi = wx.MenuItem(self.m_menu2, wx.ID_ANY, "Дерево принятия решений", wx.EmptyString, wx.ITEM_NORMAL)
         self.m_menu2.Append(self.tree_mi)
 
@@ -73,6 +92,7 @@ class MainFrame(wx.Frame):
         self.Bind(wx.EVT_MENU, self.new_ahp, id=self.ahp_mi.GetId())
         self.Bind(wx.EVT_MENU, self.new_expert, id=self.expert_mi.GetId())
         self.Bind(wx.EVT_MENU, self.layout_markov, id=self.markov_mi.GetId())
+        self.Bind(wx.EVT_MENU, self.layout_mdp, id=self.mdp_mi.GetId())
         self.Bind(wx.EVT_MENU, self.layout_tree, id=self.tree_mi.GetId())
         self.Bind(wx.EVT_MENU, self.layout_uncertainty, id=self.uncertainty_des_mi.GetId())
         self.Bind(wx.EVT_MENU, self.layout_know_base, id=self.know_base.GetId())
@@ -101,6 +121,13 @@ class MainFrame(wx.Frame):
         self.proj_saved = True
         self.proj = None
         self.proj_win = None
+        self.saved_filename = None
+        self.journal = None
+
+        self.autosave_failed = False
+        self.autosave_timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.autosave, self.autosave_timer)
+        self.autosave_timer.Start(AUTOSAVE_INTERVAL)
 
     def new_ahp(self, event):
         self.close(None)
@@ -139,16 +166,93 @@ class MainFrame(wx.Frame):
         self.proj_win.Show()
 
     def layout_markov(self, event):
-        event.Skip()
+        self.close(None)
+
+        dlg = MarkovDialog(self)
+        if dlg.ShowModal() == wx.ID_CANCEL:
+            return
+
+        try:
+            if dlg.csv_path:
+                self.proj = MarkovProject.from_csv(dlg.proj_name, dlg.csv_path)
+            else:
+                self.proj = MarkovProject(dlg.proj_name, dlg.states)
+        except (OSError, ValueError) as e:
+            wx.MessageBox("Ошибка: {}.".format(e))
+            return
+
+        self.proj_win = MarkovWindow(self, self.proj)
+        self.proj_opened = True
+        self.proj_saved = False
+        self.proj_win.Show()
+
+    def layout_mdp(self, event):
+        self.close(None)
+
+        dlg = MarkovDialog(self, with_actions=True)
+        if dlg.ShowModal() == wx.ID_CANCEL:
+            return
+
+        try:
+            self.proj = MarkovDecisionProject(dlg.proj_name, dlg.states, dlg.actions, dlg.discount)
+        except ValueError as e:
+            wx.MessageBox("Ошибка: {}.".format(e))
+            return
+
+        self.proj_win = MDPWindow(self, self.proj)
+        self.proj_opened = True
+        self.proj_saved = False
+        self.proj_win.Show()
 
     def layout_tree(self, event):
-        event.Skip()
+        self.close(None)
+
+        name = wx.GetTextFromUser("Имя проекта", "Дерево принятия решений", "untitled", parent=self)
+        if not name:
+            return
+
+        self.proj = DecisionTree(name[:15])
+        self.proj.set_root(self.proj.new_node(NodeKind.DECISION, "Решение"))
+
+        self.proj_win = TreeWindow(self, self.proj)
+        self.proj_opened = True
+        self.proj_saved = False
+        self.proj_win.Show()
 
     def layout_uncertainty(self, event):
-        event.Skip()
+        self.close(None)
+
+        dlg = UncertaintyDialog(self)
+        if dlg.ShowModal() == wx.ID_CANCEL:
+            return
+
+        try:
+            if dlg.csv_path:
+                self.proj = UncertaintyProject.from_csv(dlg.proj_name, dlg.csv_path)
+            else:
+                self.proj = UncertaintyProject(dlg.proj_name, dlg.alternatives, dlg.scenarios)
+        except (OSError, ValueError) as e:
+            wx.MessageBox("Ошибка: {}.".format(e))
+            return
+
+        self.proj_win = UncertaintyWindow(self, self.proj)
+        self.proj_opened = True
+        self.proj_saved = False
+        self.proj_win.Show()
 
     def layout_know_base(self, event):
-        event.Skip()
+        self.close(None)
+
+        name = wx.GetTextFromUser("Имя проекта", "База знаний", "untitled", parent=self)
+        if not name:
+            return
+
+        self.proj = KnowledgeBase(name[:15])
+
+        self.proj_win = KnowledgeWindow(self, self.proj)
+        self.proj_opened = True
+        self.proj_saved = False
+        self.proj_win.Show()
 
     def open(self, event):
         self.close(None)
@@ -157,21 +261,58 @@ class MainFrame(wx.Frame):
             return
         try:
             if dlg.GetPath():
-                f = open(dlg.GetPath(), "rb")
-                proj = pickle.load(f)
-                f.close()
+                proj, recovered = self._recover(load_project(dlg.GetPath()), dlg.GetPath())
 
                 if type(proj) == AHPProject:
                     self.proj = proj
                     self.proj_win = AHPWindow(self, self.proj)
                     self.proj_opened = True
-                    self.proj_saved = True
+                    self.proj_saved = not recovered
+                    self.saved_filename = dlg.GetPath()
+                    self.journal = self._start_journal(recovered)
                     self.proj_win.Show()
                 elif type(proj) == ExpertProject:
                     self.proj = proj
                     self.proj_win = ExpertWindow(self, self.proj)
                     self.proj_opened = True
+                    self.proj_saved = not recovered
+                    self.saved_filename = dlg.GetPath()
+                    self.journal = self._start_journal(recovered)
+                    self.proj_win.Show()
+                elif type(proj) == MarkovProject:
+                    self.proj = proj
+                    self.proj_win = MarkovWindow(self, self.proj)
+                    self.proj_opened = True
+                    self.proj_saved = True
+                    self.saved_filename = dlg.GetPath()
+                    self.proj_win.Show()
+                elif type(proj) == MarkovDecisionProject:
+                    self.proj = proj
+                    self.proj_win = MDPWindow(self, self.proj)
+                    self.proj_opened = True
                     self.proj_saved = True
+                    self.saved_filename = dlg.GetPath()
+                    self.proj_win.Show()
+                elif type(proj) == UncertaintyProject:
+                    self.proj = proj
+                    self.proj_win = UncertaintyWindow(self, self.proj)
+                    self.proj_opened = True
+                    self.proj_saved = True
+                    self.saved_filename = dlg.GetPath()
+                    self.proj_win.Show()
+                elif type(proj) == KnowledgeBase:
+                    self.proj = proj
+                    self.proj_win = KnowledgeWindow(self, self.proj)
+                    self.proj_opened = True
+                    self.proj_saved = True
+                    self.saved_filename = dlg.GetPath()
+                    self.proj_win.Show()
+                elif type(proj) == DecisionTree and proj.root is not None:
+                    self.proj = proj
+                    self.proj_win = TreeWindow(self, self.proj)
+                    self.proj_opened = True
+                    self.proj_saved = True
+                    self.saved_filename = dlg.GetPath()
                     self.proj_win.Show()
                 else:
                     wx.MessageBox("Неверный формат файла.")
@@ -181,10 +322,15 @@ class MainFrame(wx.Frame):
 
     def save(self, event):
         if self.proj is not None:
-            if self.proj_saved:
-                f = open(self.saved_filename, "wb")
-                pickle.dump(self.proj, f, 3)
-                self.proj_saved = True
+            if self.saved_filename:
+                try:
+                    if self.journal is not None:
+                        self.journal.save()
+                    else:
+                        save_project(self.proj, self.saved_filename)
+                    self.proj_saved = True
+                except Exception as e:
+                    wx.MessageBox("Ошибка сохранения: {}.".format(e), style=wx.OK | wx.CENTRE | wx.ICON_ERROR)
             else:
                 dlg = wx.FileDialog(self, "Сохранение проэкта", style=wx.FD_SAVE, defaultFile=self.proj.name + ".ds")
 
@@ -192,26 +338,73 @@ class MainFrame(wx.Frame):
                     return
                 try:
                     if dlg.GetPath():
-                        f = open(dlg.GetPath(), "wb")
-                        pickle.dump(self.proj, f, 3)
+                        save_project(self.proj, dlg.GetPath())
                         self.proj_saved = True
                         self.saved_filename = dlg.GetPath()
+                        self.journal = self._start_journal()
                 except:
                     wx.MessageBox("Ошибка сохранения.", style=wx.OK | wx.CENTRE | wx.ICON_ERROR)
 
     def close(self, event):
         if self.proj_opened:
             self._accept_save()
+            self._close_journal()
             self.proj_win.Destroy()
             self.proj_win = None
             self.proj = None
             self.proj_opened = False
             self.proj_saved = True
+            self.saved_filename = None
 
     def exit(self, event):
         self._accept_save()
+        self._close_journal()
         self.Destroy()
 
+    def autosave(self, event):
+        if self.journal is not None:
+            try:
+                self.journal.tick()
+            except Exception as e:
+                # Журнал продолжает вестись, сжатие повторится по таймеру; об ошибке сообщаем один раз подряд.
+                if not self.autosave_failed:
+                    self.autosave_failed = True
+                    wx.MessageBox("Ошибка автосохранения: {}.".format(e), style=wx.OK | wx.CENTRE | wx.ICON_ERROR)
+                return
+            self.autosave_failed = False
+
+    def _recover(self, proj, path) -> tuple:
+        # Возвращает (проект, восстановлены ли несохраненные изменения).
+        if not os.path.exists(journal_path(path)) and not os.path.exists(snapshot_path(path)):
+            return proj, False
+
+        if has_journal(path) and wx.MessageDialog(self, "Найдены несохраненные изменения проекта. Восстановить?",
+                                                  style=wx.YES_NO).ShowModal() == wx.ID_YES:
+            recovered, count = recover(path, proj)
+            if recovered is not None and (count > 0 or recovered is not proj):
+                return recovered, True
+
+        discard_recovery(path)
+        return proj, False
+
+    def _start_journal(self, recovered: bool = False):
+        # Журнал ведется для проектов, правки которых сводятся к отдельным ячейкам.
+        if isinstance(self.proj, JOURNALED_TYPES):
+            journal = Journal(self.proj, self.saved_filename)
+            if recovered:
+                # Восстановленное состояние сразу переносится в снимок: новые записи журнала начнутся с него.
+                journal.compact()
+            return journal
+        return None
+
+    def _close_journal(self):
+        # Отказ от сохранения отменяет и изменения, записанные в журнал.
+        if self.journal is not None:
+            if not self.proj_saved:
+                self.journal.discard()
+            self.journal.close()
+            self.journal = None
+
     def show_author(self, event):
         event.Skip()
 
@@ -226,6 +419,8 @@ class MainFrame(wx.Frame):
 
     def accept_exit(self, event):
         self._accept_save()
+        self._close_journal()
+        self.autosave_timer.Stop()
         if self.proj_win:
             self.proj_win.Destroy()
         self.Destroy()
@@ -0,0 +1,13 @@
+from dss.core.markov import MarkovProject
+from dss.core.mdp import MarkovDecisionProject
+
+# Окна загружаются по требованию: импорт модели не должен тянуть wx.
+_GUI_NAMES = ("MarkovDialog", "MarkovWindow", "MDPWindow", "ResultTable", "TransitionTable")
+
+
+def __getattr__(name):
+    if name in _GUI_NAMES:
+        from dss.gui import markov
+        return getattr(markov, name)
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
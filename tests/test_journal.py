@@ -0,0 +1,182 @@
+import os
+
+import pytest
+
+from dss.core import journal
+from dss.core.ahp import AHPProject
+from dss.core.expert import Degree, Expert, ExpertProject, Position
+from dss.core.journal import Journal, has_journal, has_snapshot, journal_path, recover, snapshot_path
+from dss.core.storage import load_project, save_project
+
+
+def read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def make_project(path: str) -> AHPProject:
+    save_project(AHPProject("ahp", "target", ["c1", "c2", "c3"], ["a1", "a2", "a3"]), path)
+    return load_project(path)
+
+
+def cells(proj: AHPProject) -> list:
+    matrix = proj.get_nodes()[0].matrix
+    return [matrix.get(*it) for it in (("c1", "c2"), ("c1", "c3"), ("c2", "c3"))]
+
+
+def test_replay_after_crash(tmp_path):
+    path = str(tmp_path / "p.ds")
+    proj = make_project(path)
+    j = Journal(proj, path)
+    proj.get_nodes()[0].matrix.set("c1", "c2", 3)
+    proj.get_nodes()[0].matrix.set("c2", "c3", "1/7")
+    j.tick()
+    j.close()  # "сбой": проект не сохранен
+
+    assert has_journal(path) and not has_snapshot(path)
+    restored, count = recover(path, load_project(path))
+    assert count == 2
+    assert cells(restored) == ["3", "1", "1/7"]
+
+
+def test_compaction_keeps_project_file(tmp_path):
+    # Изменение структуры сжимает журнал в снимок; файл пользователя меняется только явным сохранением.
+    path = str(tmp_path / "p.ds")
+    proj = make_project(path)
+    before = read(path)
+
+    j = Journal(proj, path)
+    proj.add_alternative("a4")
+    assert j.needs_compaction()
+    assert j.tick()
+    proj.get_nodes()[0].matrix.set("c1", "c3", 5)
+    j.close()
+
+    assert read(path) == before
+    assert has_snapshot(path)
+    restored, count = recover(path, load_project(path))
+    assert count == 1
+    assert restored.alternatives == ["a1", "a2", "a3", "a4"]
+    assert cells(restored) == ["1", "5", "1"]
+
+
+def test_compact_every(tmp_path):
+    path = str(tmp_path / "p.ds")
+    proj = make_project(path)
+    j = Journal(proj, path, compact_every=2)
+    matrix = proj.get_nodes()[0].matrix
+
+    matrix.set("c1", "c2", 3)
+    assert not j.tick()
+    matrix.set("c1", "c3", 5)
+    assert j.tick()
+    assert j.count == 0 and has_snapshot(path)
+    j.close()
+
+
+def test_save_and_discard(tmp_path):
+    path = str(tmp_path / "p.ds")
+    proj = make_project(path)
+    before = read(path)
+
+    j = Journal(proj, path)
+    proj.add_alternative("a4")
+    j.tick()
+    j.discard()
+    assert read(path) == before
+    assert not os.path.exists(journal_path(path)) and not os.path.exists(snapshot_path(path))
+    assert recover(path) == (None, 0)
+
+    proj.get_nodes()[0].matrix.set("c1", "c2", 9)
+    j.save()
+    j.close()
+    assert not os.path.exists(journal_path(path)) and not os.path.exists(snapshot_path(path))
+    assert cells(load_project(path)) == ["9", "1", "1"]
+
+
+def test_journal_of_other_file_is_ignored(tmp_path):
+    path = str(tmp_path / "p.ds")
+    proj = make_project(path)
+    j = Journal(proj, path)
+    proj.get_nodes()[0].matrix.set("c1", "c2", 3)
+    j.close()
+
+    # Файл проекта перезаписан в обход журнала: записи к нему уже не относятся.
+    save_project(AHPProject("ahp", "target", ["c1", "c2", "c3"], ["b1", "b2", "b3"]), path)
+    assert not has_journal(path)
+    assert recover(path, load_project(path)) == (None, 0)
+
+
+def test_truncated_record(tmp_path):
+    path = str(tmp_path / "p.ds")
+    proj = make_project(path)
+    j = Journal(proj, path)
+    proj.get_nodes()[0].matrix.set("c1", "c2", 3)
+    proj.get_nodes()[0].matrix.set("c1", "c3", 5)
+    j.close()
+
+    with open(journal_path(path), "rb+") as f:
+        f.truncate(os.path.getsize(journal_path(path)) - 4)
+    restored, count = recover(path, load_project(path))
+    assert count == 1
+    assert cells(restored) == ["3", "1", "1"]
+
+
+def test_failed_save_resumes_journal(tmp_path, monkeypatch):
+    path = str(tmp_path / "p.ds")
+    proj = make_project(path)
+    before = read(path)
+    j = Journal(proj, path, compact_every=2)
+    matrix = proj.get_nodes()[0].matrix
+    matrix.set("c1", "c2", 3)
+    matrix.set("c1", "c3", 5)
+    j.tick()
+    matrix.set("c2", "c3", 7)
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(journal, "save_project", fail)
+    for method in (j.compact, j.save):
+        with pytest.raises(OSError):
+            method()
+
+    # Журнал продолжает писаться, а файл проекта и снимок не тронуты.
+    matrix.set("c1", "c2", 9)
+    monkeypatch.undo()
+    j.close()
+
+    assert read(path) == before
+    restored, count = recover(path, load_project(path))
+    assert count == 2
+    assert cells(restored) == ["9", "5", "7"]
+
+
+def test_replay_votes(tmp_path):
+    # Голоса пачкой пишутся одной записью; бюджеты экспертов восстанавливаются вместе с голосами.
+    path = str(tmp_path / "e.ds")
+    experts = [Expert("e{0}".format(i), Position.SECTOR_HEAD, Degree.PhD) for i in range(3)]
+    save_project(ExpertProject(["a", "b"], experts, "expert", "target"), path)
+    proj = load_project(path)
+    before = read(path)
+
+    j = Journal(proj, path)
+    experts = proj.get_experts()
+    proj.set_votes([[60, 40], [10, 20]], experts[1:])
+    proj.vote(experts[0], "a", 30)
+    assert not j.needs_compaction()
+    j.tick()
+    j.close()
+
+    assert read(path) == before
+    restored, count = recover(path, load_project(path))
+    assert count == 2
+    assert restored.get_votes().tolist() == [[30, 0], [60, 40], [10, 20]]
+    assert [it.rate_count for it in restored.get_experts()] == [it.rate_count for it in experts]
+
+
+def test_unsupported_type(tmp_path):
+    from dss.core.tree import DecisionTree
+
+    with pytest.raises(TypeError):
+        Journal(DecisionTree("tree"), str(tmp_path / "t.ds"))
@@ -0,0 +1,159 @@
+import pickle
+import random
+
+import pytest
+
+from dss.core.knowledge import KnowledgeBase, Rule, parse_rules
+
+RULES = """
+# грипп
+rule flu: symptom ?p fever & symptom ?p cough & not vaccinated ?p => diagnosis ?p flu
+rule contagious: diagnosis ?p flu & contact ?p ?q => risk ?q high
+rule twin: pair ?x ?x => twin ?x
+rule anc1: parent ?a ?b => anc ?a ?b
+rule anc2: parent ?a ?b & anc ?b ?c => anc ?a ?c
+rule alone: person ?p & not contact ?p ? => alone ?p
+""".splitlines()
+
+
+def naive(rules: list, facts: set) -> set:
+    # Вывод перебором всех фактов до неподвижной точки: эталон для правил без отрицания.
+    def match(conditions, bindings, known):
+        if not conditions:
+            yield bindings
+            return
+        pattern = conditions[0][1]
+        for fact in known:
+            if len(fact) != len(pattern):
+                continue
+            current = dict(bindings)
+            for token, value in zip(pattern, fact):
+                if token == "?":
+                    continue
+                if token.startswith("?") and current.setdefault(token, value) != value or \
+                        not token.startswith("?") and token != value:
+                    break
+            else:
+                yield from match(conditions[1:], current, known)
+
+    known = set(facts)
+    while True:
+        new = {tuple(bindings.get(it, it) for it in pattern)
+               for rule in rules for bindings in match(rule.conditions, {}, known) for pattern in rule.conclusions}
+        if new <= known:
+            return known
+        known |= new
+
+
+def random_rules(rng: random.Random, count: int) -> list:
+    rules = []
+    for k in range(count):
+        conditions = [(False, (rng.choice("pqr"), rng.choice(["?a", "?b", "?c", "1", "2"]),
+                               rng.choice(["?a", "?b", "?c", "1"]))) for _ in range(rng.randint(1, 3))]
+        bound = sorted({it for _, pattern in conditions for it in pattern if it.startswith("?")}) or ["1"]
+        rules.append(Rule("r{0}".format(k), conditions, [(rng.choice("pqrs"), rng.choice(bound), rng.choice(bound))]))
+    return rules
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_matches_naive_inference(seed):
+    # Сеть после серии добавлений и удалений фактов и позднего добавления правил выводит то же, что и перебор.
+    rng = random.Random(seed)
+    rules, facts = random_rules(rng, 6), set()
+    split = rng.randint(0, len(rules))
+
+    kb = KnowledgeBase("kb")
+    kb.add_rules(rules[:split])
+    for step in range(25):
+        fact = (rng.choice("pqr"), rng.choice("123"), rng.choice("123"))
+        if fact in facts and rng.random() < .5:
+            facts.discard(fact)
+            kb.retract_fact(fact)
+        elif fact not in facts:
+            facts.add(fact)
+            kb.assert_fact(fact)
+        if step == 12:
+            kb.add_rules(rules[split:])
+    assert set(kb.get_facts()) == naive(rules, facts)
+
+    # Сеть после pickle продолжает работать так же.
+    copy = pickle.loads(pickle.dumps(kb))
+    assert copy.get_facts() == kb.get_facts()
+    fact = (rng.choice("pqr"), rng.choice("123"), rng.choice("123"))
+    if fact not in facts:
+        facts.add(fact)
+        copy.assert_fact(fact)
+        assert set(copy.get_facts()) == naive(rules, facts)
+
+
+def test_negation():
+    kb = KnowledgeBase("kb")
+    kb.add_rules(parse_rules(RULES))
+    kb.assert_facts(["symptom ann fever", "symptom ann cough", "contact ann bob", "person ann", "person bob"])
+    assert kb.get_derived() == [("alone", "bob"), ("diagnosis", "ann", "flu"), ("risk", "bob", "high")]
+
+    kb.assert_fact("vaccinated ann")
+    assert kb.get_derived() == [("alone", "bob")]
+
+    kb.retract_fact("vaccinated ann")
+    kb.retract_fact("contact ann bob")
+    assert kb.get_derived() == [("alone", "ann"), ("alone", "bob"), ("diagnosis", "ann", "flu")]
+
+
+def test_cycle_is_retracted():
+    # Факты, поддерживающие друг друга только по кругу, удаляются вместе с исходным фактом.
+    kb = KnowledgeBase("kb")
+    kb.add_rules(parse_rules(["rule a: p ?x => q ?x", "rule b: q ?x => p ?x"]))
+    kb.assert_fact("p 1")
+    assert kb.get_facts() == [("p", "1"), ("q", "1")]
+
+    kb.retract_fact("p 1")
+    assert kb.get_facts() == []
+
+
+def test_explicit_and_derived_fact():
+    kb = KnowledgeBase("kb")
+    kb.add_rules(parse_rules(["rule a: p ?x => q ?x"]))
+    kb.assert_facts(["p 1", "q 1"])
+    kb.retract_fact("q 1")
+    assert "q 1" in kb and kb.is_derived("q 1")
+
+    kb.retract_fact("p 1")
+    assert "q 1" not in kb
+    with pytest.raises(IndexError):
+        kb.retract_fact("p 1")
+
+
+def test_explain_and_query():
+    kb = KnowledgeBase("kb")
+    kb.add_rules(parse_rules(RULES))
+    kb.assert_facts("parent {0} {1}".format(i, i + 1) for i in range(10))
+    kb.assert_fact("pair z z")
+
+    assert kb.explain("anc 0 2") == [("anc2", (("parent", "0", "1"), ("anc", "1", "2")))]
+    assert kb.explain("twin z") == [("twin", (("pair", "z", "z"),))]
+    assert len(kb.query("anc 0 ?x")) == 10
+    assert kb.query("anc ?x ?x") == []
+    assert kb.query("pair ?x ?x") == [{"?x": "z"}]
+
+    kb.retract_fact("parent 4 5")
+    assert len(kb.query("anc 0 ?x")) == 4
+
+
+def test_rule_errors():
+    with pytest.raises(ValueError):
+        Rule.parse("rule r: p ?x => q ?y")
+    with pytest.raises(ValueError):
+        Rule.parse("rule r: p ?x")
+
+    kb = KnowledgeBase("kb")
+    kb.add_rules(parse_rules(["rule r: p ?x => q ?x"]))
+    with pytest.raises(ValueError):
+        kb.add_rule(Rule.parse("rule r: q ?x => p ?x"))
+    with pytest.raises(ValueError):
+        kb.assert_fact("p ?x")
+
+
+def test_rule_text_round_trip():
+    for rule in parse_rules(RULES + ['rule quoted: name ?x "Иван Петров" => known ?x']):
+        assert str(Rule.parse(str(rule))) == str(rule)
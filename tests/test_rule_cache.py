@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from dss.core import knowledge
+from dss.core.cache import CACHE_DIR_ENV
+from dss.core.knowledge import KnowledgeBase, compile_rules, parse_rules
+
+# Условие каждого правила общее с соседним: сеть - длинная цепочка связанных узлов.
+CHAIN = ["rule r{0}: s{0} ?x & s{1} ?x => t{0} ?x".format(i, i + 1) for i in range(3000)]
+FACTS = ["s0 a", "s1 a", "s2 b", "s2999 a", "s3000 a"]
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    path = tmp_path / "cache"
+    monkeypatch.setenv(CACHE_DIR_ENV, str(path))
+    return path
+
+
+def write_rules(path, lines: list) -> str:
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def cached_files(cache_dir) -> list:
+    return [it for it in os.listdir(str(cache_dir)) if it.startswith("rules-")]
+
+
+def test_large_network_is_cached(tmp_path, cache_dir, monkeypatch):
+    # Большая сеть сохраняется без упора в предел рекурсии и загружается из кэша без разбора правил.
+    path = write_rules(tmp_path / "chain.rules", CHAIN)
+    compile_rules(path)
+    assert len(cached_files(cache_dir)) == 1
+
+    def fail(lines):
+        raise AssertionError("rules parsed again")
+
+    monkeypatch.setattr(knowledge, "parse_rules", fail)
+    kb = compile_rules(path)
+    kb.assert_facts(FACTS)
+
+    expected = KnowledgeBase("expected")
+    expected.add_rules(parse_rules(CHAIN))
+    expected.assert_facts(FACTS)
+    assert kb.get_facts() == expected.get_facts()
+    assert kb.explain("t0 a") == expected.explain("t0 a")
+
+
+def test_changed_rules_are_recompiled(tmp_path, cache_dir):
+    path = write_rules(tmp_path / "kb.rules", ["rule a: p ?x => q ?x"])
+    compile_rules(path)
+    write_rules(tmp_path / "kb.rules", ["rule a: p ?x => r ?x"])
+
+    kb = compile_rules(path)
+    kb.assert_fact("p 1")
+    assert kb.get_derived() == [("r", "1")]
+    assert len(cached_files(cache_dir)) == 2
+
+
+def test_broken_cache_is_ignored(tmp_path, cache_dir):
+    path = write_rules(tmp_path / "kb.rules", ["rule a: p ?x => q ?x"])
+    compile_rules(path)
+    for it in cached_files(cache_dir):
+        (cache_dir / it).write_bytes(b"broken")
+
+    kb = compile_rules(path)
+    kb.assert_fact("p 1")
+    assert kb.get_derived() == [("q", "1")]
@@ -0,0 +1,184 @@
+import os
+
+import numpy as np
+import pytest
+
+from dss.core import storage
+from dss.core.ahp import AHPProject
+from dss.core.expert import Degree, Expert, ExpertProject, Position
+from dss.core.knowledge import KnowledgeBase, parse_rules
+from dss.core.markov import MarkovProject
+from dss.core.mdp import MarkovDecisionProject
+from dss.core.storage import _is_mapped, load_project, save_project
+from dss.core.tree import DecisionTree
+from dss.core.uncertainty import UncertaintyProject
+
+
+def make_ahp() -> AHPProject:
+    proj = AHPProject("ahp", "target", ["c1", "c2", "c3"], ["a1", "a2", "a3"])
+    matrix = proj.get_nodes()[0].matrix
+    matrix.set("c1", "c2", 3)
+    matrix.set("c1", "c3", "1/5")
+    matrix.set("c2", "c3", 7)
+    return proj
+
+
+def make_tree() -> DecisionTree:
+    tree = DecisionTree("tree")
+    win, loss = tree.add_terminal("win", 100.), tree.add_terminal("loss", -20.)
+    risk = tree.add_chance("risk", ["up", "down"], [win, loss], [.3, .7], event="market")
+    tree.set_root(tree.add_decision("choice", ["go", "stop"], [risk, tree.add_terminal("zero")], [-5., 0.]))
+    return tree
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_ahp_round_trip(tmp_path, mmap):
+    proj, path = make_ahp(), str(tmp_path / "ahp.ds")
+    save_project(proj, path)
+
+    loaded = load_project(path, mmap)
+    assert loaded.alternatives == proj.alternatives
+    assert loaded.get_nodes()[0].matrix.get("c1", "c3") == "1/5"
+    assert loaded.get_global_vector() == pytest.approx(proj.get_global_vector())
+
+
+def test_expert_round_trip(tmp_path):
+    experts = [Expert("e{0}".format(i), Position.SECTOR_HEAD, Degree.PhD) for i in range(3)]
+    proj, path = ExpertProject(["a", "b", "c"], experts, "expert", "target"), str(tmp_path / "expert.ds")
+    proj.set_votes([[50, 30, 20], [10, 0, 90]], experts[1:])
+    save_project(proj, path)
+
+    loaded = load_project(path)
+    assert [it.name for it in loaded.get_experts()] == ["e0", "e1", "e2"]
+    assert [it.rate_count for it in loaded.get_experts()] == [it.rate_count for it in experts]
+    assert loaded.get_votes().tolist() == proj.get_votes().tolist()
+
+
+def test_markov_round_trip(tmp_path):
+    proj, path = MarkovProject("m", ["x", "y", "z"], [[.5, .5, 0], [.2, .7, .1], [0, 0, 1]]), str(tmp_path / "m.ds")
+    save_project(proj, path)
+
+    loaded = load_project(path)
+    assert loaded.states == proj.states
+    assert np.array_equal(loaded.get_matrix().toarray(), proj.get_matrix().toarray())
+    assert _is_mapped(loaded.get_matrix().data, path)
+
+
+def test_mdp_round_trip(tmp_path):
+    proj, path = MarkovDecisionProject("mdp", ["s1", "s2"], ["wait", "move"], .9), str(tmp_path / "mdp.ds")
+    proj.set_transitions("wait", [[1, 0], [0, 1]])
+    proj.set_transitions("move", [[.2, .8], [.8, .2]])
+    proj.set_rewards("wait", [0, 1])
+    proj.set_reward("move", "s1", 2)
+    save_project(proj, path)
+
+    loaded = load_project(path)
+    assert loaded.actions == proj.actions and loaded.discount == proj.discount
+    expected, result = proj.value_iteration(), loaded.value_iteration()
+    assert result["policy"] == expected["policy"]
+    assert np.allclose(result["values"], expected["values"])
+
+
+def test_tree_round_trip(tmp_path):
+    tree, path = make_tree(), str(tmp_path / "tree.ds")
+    save_project(tree, path)
+
+    loaded = load_project(path)
+    assert loaded.rollback() == pytest.approx(tree.rollback())
+    assert [(node.name, label) for node, label in loaded.get_policy()] == [("choice", "go")]
+    assert loaded.evpi("market") == pytest.approx(tree.evpi("market"))
+
+
+def test_empty_tree_round_trip(tmp_path):
+    path = str(tmp_path / "empty.ds")
+    save_project(DecisionTree("empty"), path)
+    assert load_project(path).root is None
+
+
+def test_uncertainty_round_trip(tmp_path):
+    payoffs = np.arange(12.).reshape(3, 4)
+    proj, path = UncertaintyProject("u", ["a", "b", "c"], ["s1", "s2", "s3", "s4"], payoffs, .3), str(tmp_path / "u.ds")
+    save_project(proj, path)
+
+    loaded = load_project(path)
+    assert loaded.alpha == .3
+    assert np.array_equal(loaded.payoffs, payoffs)
+    assert loaded.best() == proj.best()
+
+
+def test_knowledge_round_trip(tmp_path):
+    kb, path = KnowledgeBase("kb"), str(tmp_path / "kb.ds")
+    kb.add_rules(parse_rules(["rule r1: parent ?x ?y => ancestor ?x ?y",
+                              "rule r2: parent ?x ?y & ancestor ?y ?z => ancestor ?x ?z"]))
+    kb.assert_facts(["parent a b", "parent b c"])
+    save_project(kb, path)
+
+    loaded = load_project(path)
+    assert loaded.get_facts() == kb.get_facts()
+    assert [str(it) for it in loaded.rules] == [str(it) for it in kb.rules]
+
+
+def test_legacy_pickle_is_converted(tmp_path):
+    import pickle
+
+    src, dst = str(tmp_path / "old.ds"), str(tmp_path / "new.ds")
+    with open(src, "wb") as f:
+        pickle.dump(make_ahp(), f)
+
+    assert storage.is_legacy(src)
+    assert storage.convert_pickle(src, dst)
+    assert not storage.is_legacy(dst)
+    assert load_project(dst).get_global_vector() == pytest.approx(make_ahp().get_global_vector())
+
+
+def test_save_as_keeps_mapping(tmp_path):
+    # "Сохранить как" не трогает массивы, отображенные из исходного файла.
+    path, other = str(tmp_path / "u.ds"), str(tmp_path / "copy.ds")
+    save_project(UncertaintyProject("u", ["a", "b"], ["s1", "s2"], [[1, 2], [3, 4]]), path)
+
+    proj = load_project(path)
+    save_project(proj, other)
+    assert _is_mapped(proj.payoffs, path)
+
+    # Перезапись своего же файла отвязывает массивы от него.
+    proj.set("a", "s1", 10)
+    save_project(proj, path)
+    assert not _is_mapped(proj.payoffs)
+    assert load_project(path).payoffs.tolist() == [[10, 2], [3, 4]]
+    assert load_project(other).payoffs.tolist() == [[1, 2], [3, 4]]
+
+
+def test_overwrite_mapped_ahp(tmp_path):
+    path = str(tmp_path / "ahp.ds")
+    save_project(make_ahp(), path)
+
+    proj = load_project(path)
+    proj.get_nodes()[0].matrix.set("c1", "c2", 9)
+    save_project(proj, path)
+    assert load_project(path).get_nodes()[0].matrix.get("c1", "c2") == "9"
+
+
+def test_failed_save_keeps_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "ahp.ds")
+    save_project(make_ahp(), path)
+    with open(path, "rb") as f:
+        before = f.read()
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(storage.np.lib.format, "write_array", fail)
+    proj = make_ahp()
+    proj.add_alternative("a4")
+    with pytest.raises(OSError):
+        save_project(proj, path)
+
+    # Ни временного файла, ни изменений в самом проекте.
+    assert os.listdir(str(tmp_path)) == ["ahp.ds"]
+    with open(path, "rb") as f:
+        assert f.read() == before
+
+
+def test_unsupported_type(tmp_path):
+    with pytest.raises(TypeError):
+        save_project(object(), str(tmp_path / "x.ds"))
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from dss.core.tree import DecisionTree
+
+
+def make_tree(probabilities: list) -> tuple:
+    tree = DecisionTree("tree")
+    outcomes = [tree.add_terminal("v{0}".format(k), value) for k, value in enumerate([100., 0., -50.])]
+    risk = tree.add_chance("risk", ["a", "b", "c"], outcomes, probabilities)
+    tree.set_root(tree.add_decision("choice", ["go", "stop"], [risk, tree.add_terminal("zero")]))
+    return tree, risk
+
+
+def test_sensitivity_scales_other_branches():
+    tree, risk = make_tree([.5, .3, .2])
+    before = tree.rollback()
+
+    result = tree.sensitivity(risk, [0, .5, 1], branch=0)
+    assert result == pytest.approx([max(0., (0 * .3 - 50 * .2) / .5), before, 100.])
+    assert tree.rollback() == before
+    assert risk.probabilities == [.5, .3, .2]
+
+
+def test_sensitivity_of_certain_branch():
+    # Ветвь с вероятностью 1: остаток делится между остальными ветвями поровну.
+    tree, risk = make_tree([1., 0., 0.])
+
+    result = tree.sensitivity(risk, [1, .5, 0], branch=0)
+    assert np.all(np.isfinite(result))
+    assert result == pytest.approx([100., 50 - 12.5, 0.])
+    assert risk.probabilities == [1., 0., 0.]
+
+
+def test_sensitivity_checks_values_first():
+    tree, risk = make_tree([.5, .3, .2])
+    with pytest.raises(ValueError):
+        tree.sensitivity(risk, [.5, 2], branch=0)
+    assert risk.probabilities == [.5, .3, .2]
+    assert tree.rollback() == pytest.approx(40.)